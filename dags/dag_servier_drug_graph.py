@@ -1,13 +1,16 @@
 import os
-from typing import Dict
+import re
+from typing import Dict, List
 
 from airflow.decorators import dag, task
 from airflow.exceptions import AirflowException
 from airflow.models.param import Param
 from airflow.operators.python import get_current_context
-from airflow.providers.cncf.kubernetes.operators.kubernetes_pod import \
-    KubernetesPodOperator
+from airflow.providers.cncf.kubernetes.operators.kubernetes_pod import (
+    KubernetesPodOperator,
+)
 from airflow.utils.dates import datetime, timedelta
+from kubernetes.client import models as k8s
 
 # Documentation
 doc_md_dag = """
@@ -19,6 +22,8 @@ The pipeline processes data from multiple sources:
 - clinical_trials.csv: Clinical trials data
 
 Generates a graph showing relationships between drugs, publications, and journals.
+The article files are split into NB_SHARDS shards, processed by parallel pods (dynamic task mapping),
+then their drug mentions are merged into the graph. The pods share their outputs folder through a persistent volume.
 
 Variables Used:
 - env: Environment (dev/prod)
@@ -26,6 +31,7 @@ Variables Used:
 - container_config: Docker container configuration
 
 v1.0.0 (2024-10-25): Initial version
+v1.1.0: Shard the graph generation over several pods
 """
 
 # Parameters
@@ -44,6 +50,15 @@ K8S_CONFIG = {
     "container_image": "drug-graph-app:latest",
 }
 
+# Volume shared by all the pods, mounted on their outputs folder : the merge pod reads the drug mentions
+# written by the shard pods, and the analysis pod the graph written by the merge pod.
+# The claim has to be ReadWriteMany, as the shard pods may run on different nodes
+OUTPUTS_VOLUME_CLAIM = "drug-graph-outputs"
+OUTPUTS_MOUNT_PATH = "/opt/outputs"
+# Folder of the shards on the shared volume, relative to the working directory of the pods.
+# Each DAG run writes in its own sub-folder, so the shards of previous runs are never merged
+SHARDS_PATH = "outputs/shards"
+
 MAX_ACTIVE_TASKS = 10
 MAX_ACTIVE_RUNS = 1
 
@@ -69,6 +84,12 @@ DEFAULT_PARAMS = {
         type="string",
         description="Docker image version",
     ),
+    "NB_SHARDS": Param(
+        default=4,
+        type="integer",
+        minimum=1,
+        description="Number of pods generating the drug mentions in parallel",
+    ),
 }
 
 
@@ -111,9 +132,27 @@ def get_kubernetes_config() -> Dict:
         "is_delete_operator_pod": True,
         "image_pull_policy": "Always",
         "get_logs": True,
+        "volumes": [
+            k8s.V1Volume(
+                name="outputs",
+                persistent_volume_claim=k8s.V1PersistentVolumeClaimVolumeSource(
+                    claim_name=OUTPUTS_VOLUME_CLAIM
+                ),
+            )
+        ],
+        "volume_mounts": [
+            k8s.V1VolumeMount(name="outputs", mount_path=OUTPUTS_MOUNT_PATH)
+        ],
     }
 
 
+def get_run_shards_path() -> str:
+    """Get the shards folder of the current DAG run, named after its run ID"""
+    run_id = get_current_context()["run_id"]
+
+    return os.path.join(SHARDS_PATH, re.sub(r"[^\w.-]", "_", run_id))
+
+
 def create_dag():
     @dag(
         dag_id=DAG_ID,
@@ -129,15 +168,44 @@ def create_dag():
     )
     def servier_drug_graph():
         @task()
-        def process_drug_mentions():
-            """Task to process drug mentions data using KubernetesPodOperator"""
+        def list_shards() -> List[str]:
+            """Task to list the shards of the article files, one mapped task each"""
+            nb_shards = get_current_context()["params"]["NB_SHARDS"]
+
+            return [f"{shard}/{nb_shards}" for shard in range(nb_shards)]
+
+        @task()
+        def process_drug_mentions_shard(shard: str):
+            """Task to process the drug mentions of one shard using KubernetesPodOperator"""
+            k8s_config = get_kubernetes_config()
+
+            return KubernetesPodOperator(
+                task_id="process_drug_mentions_shard",
+                name=f"drug-graph-process-{shard.replace('/', '-of-')}",
+                cmds=["poetry", "run", "python"],
+                arguments=[
+                    "app/main.py",
+                    "--action=generate_graph",
+                    f"--shard={shard}",
+                    f"--shards_path={get_run_shards_path()}",
+                ],
+                **k8s_config,
+            ).execute(get_current_context())
+
+        @task()
+        def merge_graph_shards():
+            """Task to merge the drug mentions of all the shards into the graph using KubernetesPodOperator"""
             k8s_config = get_kubernetes_config()
 
             return KubernetesPodOperator(
-                task_id="process_drug_mentions",
-                name="drug-graph-process",
+                task_id="merge_graph_shards",
+                name="drug-graph-merge",
                 cmds=["poetry", "run", "python"],
-                arguments=["app/main.py", "generate_graph"],
+                arguments=[
+                    "app/main.py",
+                    "--action=merge_graph_shards",
+                    f"--shards_path={get_run_shards_path()}",
+                ],
                 **k8s_config,
             ).execute(get_current_context())
 
@@ -150,11 +218,15 @@ def create_dag():
                 task_id="get_journal_with_most_drugs",
                 name="drug-graph-analysis",
                 cmds=["poetry", "run", "python"],
-                arguments=["app/main.py", "get_journal_with_most_drugs"],
+                arguments=["app/main.py", "--action=get_journal_with_most_drugs"],
                 **k8s_config,
             ).execute(get_current_context())
 
-        process_drug_mentions() >> get_journal_with_most_drugs()
+        (
+            process_drug_mentions_shard.expand(shard=list_shards())
+            >> merge_graph_shards()
+            >> get_journal_with_most_drugs()
+        )
 
     return servier_drug_graph()
 
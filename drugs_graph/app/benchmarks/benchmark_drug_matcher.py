@@ -0,0 +1,97 @@
+"""
+Compares the precompiled DrugMatcher to the per-title scan of the drugs DataFrame.
+
+Run from the drugs_graph folder :
+    python -m app.benchmarks.benchmark_drug_matcher --nb_drugs 1000 --nb_titles 500
+"""
+
+import argparse
+import logging
+import random
+import string
+import time
+from typing import List
+
+import pandas as pd
+from app.src.graph_link.drug_matcher import DrugMatcher
+from app.src.graph_link.journal_mentions import JournalMentions
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nb_drugs", type=int, default=1000)
+    parser.add_argument("--nb_titles", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def generate_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))).title()
+
+
+def generate_drugs_df(nb_drugs: int, rng: random.Random) -> pd.DataFrame:
+    # Roughly 10% of the drug names are made of two words, like "Insulin Glargine"
+    names = [
+        (
+            f"{generate_word(rng)} {generate_word(rng)}"
+            if rng.random() < 0.1
+            else generate_word(rng)
+        )
+        for _ in range(nb_drugs)
+    ]
+    ids = [f"D{position:06d}" for position in range(nb_drugs)]
+    return pd.DataFrame({"name": names}, index=pd.Index(ids, name="atccode"))
+
+
+def generate_titles(nb_titles: int, drug_names: List, rng: random.Random) -> List:
+    titles = []
+    for _ in range(nb_titles):
+        words = [generate_word(rng) for _ in range(rng.randint(8, 20))]
+        for drug_name in rng.sample(drug_names, k=rng.randint(0, 2)):
+            words.insert(rng.randint(0, len(words)), drug_name)
+        titles.append(" ".join(words))
+    return titles
+
+
+def time_extraction(journal_instance: JournalMentions, titles: List) -> List:
+    start = time.perf_counter()
+    results = [
+        journal_instance.extract_drug_from_publication_title(title) for title in titles
+    ]
+    return [time.perf_counter() - start, results]
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    logging.disable(logging.WARNING)  # Titles without drugs are expected here
+    rng = random.Random(args.seed)
+
+    drugs_df = generate_drugs_df(args.nb_drugs, rng)
+    titles = generate_titles(args.nb_titles, drugs_df["name"].tolist(), rng)
+    articles_df = pd.DataFrame()
+
+    scan_instance = JournalMentions("benchmark", drugs_df, articles_df)
+    scan_duration, scan_results = time_extraction(scan_instance, titles)
+
+    compile_start = time.perf_counter()
+    drug_matcher = DrugMatcher(drugs_dataFrame=drugs_df)
+    compile_duration = time.perf_counter() - compile_start
+
+    matcher_instance = JournalMentions(
+        "benchmark", drugs_df, articles_df, drug_matcher=drug_matcher
+    )
+    matcher_duration, matcher_results = time_extraction(matcher_instance, titles)
+
+    # The scan cannot see multi-word names, so only single-word mentions are compared
+    single_word_matcher_results = [
+        [drug for drug in mentioned_drugs if " " not in drug[1]]
+        for mentioned_drugs in matcher_results
+    ]
+    if single_word_matcher_results != scan_results:
+        raise AssertionError("The matcher and the scan found different drugs.")
+
+    print(f"Drugs: {args.nb_drugs}, titles: {args.nb_titles}")
+    print(f"iterrows scan   : {scan_duration:.3f}s")
+    print(f"matcher compile : {compile_duration:.3f}s")
+    print(f"matcher lookups : {matcher_duration:.3f}s")
+    print(f"speedup         : {scan_duration / max(matcher_duration, 1e-9):.0f}x")
@@ -0,0 +1,267 @@
+"""
+Benchmarks each stage of the graph generation on a synthetic corpus, and compares the results
+to the stored baseline of the same scale.
+
+Run from the drugs_graph folder :
+    python -m app.benchmarks.benchmark_pipeline --scale 100k --repeat 3
+    python -m app.benchmarks.benchmark_pipeline --scale 100k --repeat 3 --save_baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from app.benchmarks.synthetic_data import SyntheticCorpusConfig, write_synthetic_corpus
+
+APP_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_FOLDER = os.path.join(APP_FOLDER, "benchmarks", "baselines")
+
+# Number of articles and drugs of each scale
+SCALES = {
+    "10k": (10_000, 100),
+    "100k": (100_000, 1_000),
+    "1m": (1_000_000, 5_000),
+    "10m": (10_000_000, 10_000),
+}
+
+# Differences below this duration are considered as noise
+MIN_SIGNIFICANT_DIFFERENCE_S = 0.05
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=str, choices=list(SCALES), default="10k")
+    parser.add_argument(
+        "--graph_builder",
+        type=str,
+        choices=["vectorized", "journal"],
+        default="vectorized",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--data_folder",
+        type=str,
+        help="The folder where the synthetic corpora are generated once and reused",
+        default="benchmarks_data",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Relative slowdown of a stage reported as a regression. Default value : 0.2",
+        default=0.2,
+    )
+    parser.add_argument("--save_baseline", action="store_true")
+    parser.add_argument("--fail_on_regression", action="store_true")
+    parser.add_argument(
+        "--report_path", type=str, help="Write the comparison report to this json file"
+    )
+    return parser.parse_args()
+
+
+def get_corpus(data_folder: str, scale: str, seed: int) -> str:
+    """
+    Returns the absolute folder of the synthetic corpus of the scale, generating it the first time.
+    The pipeline runs from the app folder, so the path can't stay relative to the current folder.
+    """
+    corpus_path = os.path.abspath(os.path.join(data_folder, f"{scale}-seed{seed}"))
+    marker_path = os.path.join(corpus_path, "corpus.json")
+
+    if not os.path.exists(marker_path):
+        nb_articles, nb_drugs = SCALES[scale]
+        print(f"Generating the {scale} corpus in {corpus_path}...")
+        corpus_sizes = write_synthetic_corpus(
+            corpus_path,
+            SyntheticCorpusConfig(
+                nb_articles=nb_articles, nb_drugs=nb_drugs, seed=seed
+            ),
+        )
+        with open(marker_path, "w", encoding="utf-8") as hd:
+            json.dump(corpus_sizes, hd)
+
+    return corpus_path
+
+
+def run_pipeline(corpus_path: str, graph_builder: str) -> Dict:
+    """
+    Runs the graph generation in a new process, as in production, and returns its stages report.
+    """
+    env = dict(os.environ)
+    python_paths = [os.path.dirname(APP_FOLDER)]
+    if env.get("PYTHONPATH"):
+        python_paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(python_paths)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report_path = os.path.join(temp_dir, "report.json")
+        start = time.perf_counter()
+        completed_process = subprocess.run(
+            [
+                sys.executable,
+                os.path.join(APP_FOLDER, "main.py"),
+                "--action=generate_graph",
+                f"--data_path={corpus_path}",
+                f"--output_path={os.path.join(temp_dir, 'graph.json')}",
+                f"--graph_builder={graph_builder}",
+                f"--profile_report={report_path}",
+            ],
+            cwd=APP_FOLDER,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        total_wall_time = time.perf_counter() - start
+
+        if completed_process.returncode != 0:
+            raise RuntimeError(
+                f"The graph generation failed :\n{completed_process.stderr[-2000:]}"
+            )
+
+        with open(report_path, encoding="utf-8") as hd:
+            report = json.load(hd)
+
+    report["total_wall_time_s"] = total_wall_time
+    return report
+
+
+def aggregate_runs(reports: List[Dict]) -> Dict:
+    """
+    Keeps the median durations and the highest memory of each stage over the runs.
+    """
+    stages = {}
+    for stage_name in [stage["stage"] for stage in reports[0]["stages"]]:
+        runs = [
+            next(stage for stage in report["stages"] if stage["stage"] == stage_name)
+            for report in reports
+        ]
+        stages[stage_name] = {
+            "wall_time_s": statistics.median(run["wall_time_s"] for run in runs),
+            "cpu_time_s": statistics.median(run["cpu_time_s"] for run in runs),
+            "peak_rss_mb": max(run["peak_rss_mb"] or 0 for run in runs),
+            "rows_out": runs[0]["rows_out"],
+        }
+
+    stages["total"] = {
+        "wall_time_s": statistics.median(
+            report["total_wall_time_s"] for report in reports
+        ),
+        "cpu_time_s": None,
+        "peak_rss_mb": max(report["peak_rss_mb"] or 0 for report in reports),
+        "rows_out": None,
+    }
+    return stages
+
+
+def get_machine() -> Dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def get_baseline_path(scale: str, graph_builder: str) -> str:
+    return os.path.join(BASELINES_FOLDER, f"{scale}-{graph_builder}.json")
+
+
+def compare_to_baseline(stages: Dict, baseline: Dict, tolerance: float) -> List:
+    """
+    Returns one row per stage : its baseline and current durations, their ratio, and whether it regressed.
+    """
+    rows = []
+    for stage_name, stage in stages.items():
+        baseline_stage = baseline["stages"].get(stage_name)
+        baseline_time = baseline_stage["wall_time_s"] if baseline_stage else None
+        ratio = stage["wall_time_s"] / baseline_time if baseline_time else None
+
+        is_regression = (
+            ratio is not None
+            and ratio > 1 + tolerance
+            and stage["wall_time_s"] - baseline_time > MIN_SIGNIFICANT_DIFFERENCE_S
+        )
+        rows.append(
+            {
+                "stage": stage_name,
+                "baseline_wall_time_s": baseline_time,
+                "wall_time_s": stage["wall_time_s"],
+                "ratio": ratio,
+                "peak_rss_mb": stage["peak_rss_mb"],
+                "status": (
+                    "REGRESSION"
+                    if is_regression
+                    else ("new" if ratio is None else "ok")
+                ),
+            }
+        )
+
+    return rows
+
+
+def print_report(rows: List) -> None:
+    print(
+        f"{'stage':<24}{'baseline (s)':>14}{'current (s)':>14}{'ratio':>8}{'peak RSS (MB)':>15}  status"
+    )
+    for row in rows:
+        baseline = (
+            f"{row['baseline_wall_time_s']:.3f}"
+            if row["baseline_wall_time_s"] is not None
+            else "-"
+        )
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        print(
+            f"{row['stage']:<24}{baseline:>14}{row['wall_time_s']:>14.3f}{ratio:>8}"
+            f"{row['peak_rss_mb']:>15.1f}  {row['status']}"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    corpus_path = get_corpus(args.data_folder, args.scale, args.seed)
+    reports = [
+        run_pipeline(corpus_path, args.graph_builder) for _ in range(args.repeat)
+    ]
+    stages = aggregate_runs(reports)
+
+    baseline_path = get_baseline_path(args.scale, args.graph_builder)
+    if args.save_baseline:
+        os.makedirs(BASELINES_FOLDER, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as hd:
+            json.dump({"machine": get_machine(), "stages": stages}, hd, indent=4)
+            hd.write("\n")
+        print(f"Baseline saved to {baseline_path}")
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as hd:
+            baseline = json.load(hd)
+        if baseline["machine"] != get_machine():
+            print(
+                f"Warning : the baseline was measured on another machine {baseline['machine']}"
+            )
+    else:
+        print(
+            f"No baseline found for this scale ({baseline_path}), run with --save_baseline to store one."
+        )
+        baseline = {"stages": {}}
+
+    rows = compare_to_baseline(stages, baseline, args.tolerance)
+    print(
+        f"Scale: {args.scale}, graph builder: {args.graph_builder}, runs: {args.repeat}"
+    )
+    print_report(rows)
+
+    if args.report_path:
+        with open(args.report_path, "w", encoding="utf-8") as hd:
+            json.dump({"machine": get_machine(), "comparison": rows}, hd, indent=4)
+
+    if args.fail_on_regression and any(row["status"] == "REGRESSION" for row in rows):
+        sys.exit(1)
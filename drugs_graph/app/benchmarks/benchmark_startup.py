@@ -0,0 +1,106 @@
+"""
+Measures the startup and run time of each action of main.py, in a new process as in the DAG tasks,
+and whether the heavy dependencies (pandas, cloud logging client) were imported.
+
+Run from the drugs_graph folder :
+    python -m app.benchmarks.benchmark_startup --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+APP_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "google.cloud.logging"]
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def run_main(arguments: List) -> Dict:
+    """
+    Runs main.py with the arguments, and returns its duration and the heavy modules it imported.
+    """
+    env = dict(os.environ)
+    python_paths = [os.path.dirname(APP_FOLDER)]
+    if env.get("PYTHONPATH"):
+        python_paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(python_paths)
+
+    start = time.perf_counter()
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(APP_FOLDER, "main.py")]
+        + arguments,
+        cwd=APP_FOLDER,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    duration = time.perf_counter() - start
+
+    if completed_process.returncode != 0:
+        raise RuntimeError(
+            f"main.py {' '.join(arguments)} failed :\n{completed_process.stderr[-2000:]}"
+        )
+
+    # Each line of -X importtime ends with the name of the imported module
+    imported_modules = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in completed_process.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+    return {
+        "duration": duration,
+        "heavy_modules": [
+            module for module in HEAVY_MODULES if module in imported_modules
+        ],
+    }
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "graph.json")
+        actions = {
+            "--help": ["--help"],
+            "generate_graph": [
+                "--action=generate_graph",
+                f"--output_path={output_path}",
+            ],
+            "get_journal_with_most_drugs": [
+                "--action=get_journal_with_most_drugs",
+                f"--output_path={output_path}",
+            ],
+            "get_journals_citing_drug": [
+                "--action=get_journals_citing_drug",
+                "--drug=Atropine",
+                f"--output_path={output_path}",
+            ],
+            "get_drugs_co_mentioned_with": [
+                "--action=get_drugs_co_mentioned_with",
+                "--drug=Atropine",
+                f"--output_path={output_path}",
+            ],
+        }
+
+        print(
+            f"{'action':<30}{'median (s)':>12}{'min (s)':>10}  heavy modules imported"
+        )
+        for action, arguments in actions.items():
+            runs = [run_main(arguments) for _ in range(args.repeat)]
+            durations = [run["duration"] for run in runs]
+            print(
+                f"{action:<30}{statistics.median(durations):>12.3f}{min(durations):>10.3f}"
+                f"  {', '.join(runs[0]['heavy_modules']) or '-'}"
+            )
@@ -0,0 +1,296 @@
+"""
+Generates a synthetic corpus with the same layout and defects as the data folder : drugs, pubmed
+articles (csv and broken json) and clinical trials, at configurable scales.
+
+Run from the drugs_graph folder :
+    python -m app.benchmarks.synthetic_data --output_path benchmarks_data/100k --nb_articles 100000 --nb_drugs 1000
+"""
+
+import argparse
+import json
+import os
+import string
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Formats found in the real inputs, all handled by the cleaning
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d %B %Y"]
+# Escaped bytes left by a bad encoding, as in the real titles (e.g. "\xc3\xb1")
+ENCODING_ISSUES = ["\\xc3\\xb1", "\\xc3\\xa9", "\\xe2\\x84\\xa2"]
+VOCABULARY_SIZE = 5000
+
+
+@dataclass
+class SyntheticCorpusConfig:
+    nb_articles: int = 10_000
+    nb_drugs: int = 100
+    # Default : one journal per 50 articles
+    nb_journals: Optional[int] = None
+    clinical_trials_ratio: float = 0.2
+    # Share of the pubmed articles written in the json file
+    pubmed_json_ratio: float = 0.3
+    # Share of the titles mentioning a drug
+    mention_ratio: float = 0.6
+    # Zipf exponent : a few journals publish most of the articles
+    journal_skew: float = 1.2
+    # Share of each defect : missing values, duplicates, bad encodings
+    dirty_ratio: float = 0.05
+    chunk_size: int = 100_000
+    seed: int = 42
+
+    def get_nb_journals(self) -> int:
+        return self.nb_journals or max(10, self.nb_articles // 50)
+
+
+def generate_words(nb_words: int, rng: np.random.Generator) -> np.ndarray:
+    letters = np.array(list(string.ascii_lowercase))
+    lengths = rng.integers(4, 12, nb_words)
+    flat_letters = letters[rng.integers(0, len(letters), lengths.sum())]
+    words = np.split(flat_letters, np.cumsum(lengths)[:-1])
+
+    # Some random words could be drug names : a suffix that drugs never have keeps them apart
+    return np.array(["".join(word) + "o" for word in words], dtype=object)
+
+
+def generate_drugs_df(nb_drugs: int, rng: np.random.Generator) -> pd.DataFrame:
+    # Roughly 10% of the drug names are made of two words, like "INSULIN GLARGINE"
+    first_words = generate_words(nb_drugs, rng)
+    second_words = generate_words(nb_drugs, rng)
+    names = [
+        f"{first_word} {second_word}" if is_multi_word else first_word
+        for first_word, second_word, is_multi_word in zip(
+            first_words, second_words, rng.random(nb_drugs) < 0.1
+        )
+    ]
+
+    return pd.DataFrame(
+        {
+            "atccode": [
+                f"{chr(65 + position % 26)}{position:05d}"
+                for position in range(nb_drugs)
+            ],
+            "drug": [name[:-1].upper() + "INE" for name in names],
+        }
+    ).drop_duplicates(subset=["drug"])
+
+
+def generate_journals(nb_journals: int, rng: np.random.Generator) -> np.ndarray:
+    words = generate_words(nb_journals * 3, rng).reshape(nb_journals, 3)
+    return np.array(
+        [f"Journal of {first} {second} and {third}" for first, second, third in words],
+        dtype=object,
+    )
+
+
+def get_zipf_probabilities(nb_values: int, skew: float) -> np.ndarray:
+    weights = 1 / np.arange(1, nb_values + 1) ** skew
+    return weights / weights.sum()
+
+
+def generate_titles(
+    nb_titles: int,
+    vocabulary: np.ndarray,
+    drug_names: List,
+    config: SyntheticCorpusConfig,
+    rng: np.random.Generator,
+) -> List:
+    nb_words = rng.integers(6, 20, nb_titles)
+    title_words = np.split(
+        vocabulary[rng.integers(0, len(vocabulary), nb_words.sum())],
+        np.cumsum(nb_words)[:-1],
+    )
+
+    # Popular drugs are mentioned more often, with the case of the names varying
+    drug_probabilities = get_zipf_probabilities(len(drug_names), 1.0)
+    mentioned_drugs = rng.choice(len(drug_names), nb_titles, p=drug_probabilities)
+    mentions_drug = rng.random(nb_titles) < config.mention_ratio
+    insert_positions = (rng.random(nb_titles) * (nb_words + 1)).astype(int)
+    has_encoding_issue = rng.random(nb_titles) < config.dirty_ratio
+
+    titles = []
+    for position, title_word_array in enumerate(title_words):
+        words = list(title_word_array)
+        words[0] = words[0].capitalize()
+
+        if mentions_drug[position]:
+            drug_name = drug_names[mentioned_drugs[position]]
+            drug_name = drug_name.lower() if position % 3 else drug_name.title()
+            words.insert(insert_positions[position], drug_name)
+
+        if has_encoding_issue[position]:
+            words.append(ENCODING_ISSUES[position % len(ENCODING_ISSUES)])
+
+        titles.append(" ".join(words) + ".")
+
+    return titles
+
+
+def iter_articles_chunks(
+    nb_articles: int,
+    id_prefix: str,
+    first_id: int,
+    vocabulary: np.ndarray,
+    journals: np.ndarray,
+    drug_names: List,
+    config: SyntheticCorpusConfig,
+    rng: np.random.Generator,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the articles by chunks, with the defects found in the real inputs : mixed date formats,
+    missing IDs, dates and journals, blank titles, and duplicates of the same article.
+    """
+    journal_probabilities = get_zipf_probabilities(len(journals), config.journal_skew)
+    start_date = np.datetime64("2018-01-01")
+
+    for chunk_start in range(0, nb_articles, config.chunk_size):
+        nb_rows = min(config.chunk_size, nb_articles - chunk_start)
+
+        dates = pd.Series(
+            start_date + rng.integers(0, 3 * 365, nb_rows).astype("timedelta64[D]")
+        )
+        date_formats = rng.integers(0, len(DATE_FORMATS), nb_rows)
+        formatted_dates = np.empty(nb_rows, dtype=object)
+        for format_position, date_format in enumerate(DATE_FORMATS):
+            is_format = date_formats == format_position
+            formatted_dates[is_format] = (
+                dates[is_format].dt.strftime(date_format).to_numpy()
+            )
+
+        chunk_df = pd.DataFrame(
+            {
+                # Object IDs, so that the missing ones don't turn the others into floats
+                "id": pd.Series(
+                    [
+                        f"{id_prefix}{article_id}" if id_prefix else article_id
+                        for article_id in range(
+                            first_id + chunk_start, first_id + chunk_start + nb_rows
+                        )
+                    ],
+                    dtype=object,
+                ),
+                "title": generate_titles(nb_rows, vocabulary, drug_names, config, rng),
+                "date": formatted_dates,
+                "journal": journals[
+                    rng.choice(len(journals), nb_rows, p=journal_probabilities)
+                ],
+            }
+        )
+
+        # Copies of rows of the chunk with some of their columns missing, to be merged back.
+        # Only the pubmed IDs can be missing, as they are the only ones that can be interpolated
+        nb_duplicates = int(nb_rows * config.dirty_ratio)
+        duplicates_df = chunk_df.iloc[rng.integers(0, nb_rows, nb_duplicates)]
+        duplicates_df = duplicates_df.reset_index(drop=True)
+        for column in ["journal"] if id_prefix else ["id", "journal"]:
+            duplicates_df.loc[rng.random(nb_duplicates) < 0.5, column] = None
+        chunk_df = pd.concat([chunk_df, duplicates_df], ignore_index=True)
+
+        for column, missing_value in [("date", None), ("title", "  ")]:
+            is_missing = rng.random(len(chunk_df)) < config.dirty_ratio / 5
+            chunk_df.loc[is_missing, column] = missing_value
+
+        yield chunk_df
+
+
+def write_json_records_with_trailing_comma(
+    filepath: str, chunks: Iterator[pd.DataFrame]
+) -> None:
+    with open(filepath, "w", encoding="utf-8") as hd:
+        hd.write("[\n")
+        for chunk_df in chunks:
+            for record in chunk_df.to_dict("records"):
+                hd.write(f"  {json.dumps(record, ensure_ascii=False)},\n")
+
+        # The trailing comma of the last record makes the file invalid, as in the real input
+        hd.write("]\n")
+
+
+def write_csv_chunks(filepath: str, chunks: Iterator[pd.DataFrame]) -> None:
+    for chunk_position, chunk_df in enumerate(chunks):
+        chunk_df.to_csv(
+            filepath,
+            mode="w" if chunk_position == 0 else "a",
+            header=chunk_position == 0,
+            index=False,
+        )
+
+
+def write_synthetic_corpus(output_path: str, config: SyntheticCorpusConfig) -> Dict:
+    """
+    Writes the drugs, pubmed and clinical_trials folders of a synthetic data folder.
+    The same configuration always generates the same files.
+    """
+    rng = np.random.default_rng(config.seed)
+    vocabulary = generate_words(VOCABULARY_SIZE, rng)
+    journals = generate_journals(config.get_nb_journals(), rng)
+    drugs_df = generate_drugs_df(config.nb_drugs, rng)
+    drug_names = drugs_df["drug"].tolist()
+
+    nb_clinical_trials = int(config.nb_articles * config.clinical_trials_ratio)
+    nb_pubmed = config.nb_articles - nb_clinical_trials
+    nb_pubmed_json = int(nb_pubmed * config.pubmed_json_ratio)
+
+    for folder in ["drugs", "pubmed", "clinical_trials"]:
+        os.makedirs(os.path.join(output_path, folder), exist_ok=True)
+
+    drugs_df.to_csv(os.path.join(output_path, "drugs", "drugs.csv"), index=False)
+
+    articles_args = (vocabulary, journals, drug_names, config, rng)
+    write_csv_chunks(
+        os.path.join(output_path, "pubmed", "pubmed.csv"),
+        iter_articles_chunks(nb_pubmed - nb_pubmed_json, "", 1, *articles_args),
+    )
+    write_json_records_with_trailing_comma(
+        os.path.join(output_path, "pubmed", "pubmed.json"),
+        iter_articles_chunks(
+            nb_pubmed_json, "", nb_pubmed - nb_pubmed_json + 1, *articles_args
+        ),
+    )
+    write_csv_chunks(
+        os.path.join(output_path, "clinical_trials", "clinical_trials.csv"),
+        (
+            chunk_df.rename(columns={"title": "scientific_title"})
+            for chunk_df in iter_articles_chunks(
+                nb_clinical_trials, "NCT", 1, *articles_args
+            )
+        ),
+    )
+
+    return {
+        "drugs": len(drugs_df),
+        "journals": len(journals),
+        "pubmed": nb_pubmed,
+        "clinical_trials": nb_clinical_trials,
+    }
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output_path", type=str, required=True)
+    parser.add_argument("--nb_articles", type=int, default=10_000)
+    parser.add_argument("--nb_drugs", type=int, default=100)
+    parser.add_argument("--nb_journals", type=int)
+    parser.add_argument("--journal_skew", type=float, default=1.2)
+    parser.add_argument("--dirty_ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    corpus_sizes = write_synthetic_corpus(
+        args.output_path,
+        SyntheticCorpusConfig(
+            nb_articles=args.nb_articles,
+            nb_drugs=args.nb_drugs,
+            nb_journals=args.nb_journals,
+            journal_skew=args.journal_skew,
+            dirty_ratio=args.dirty_ratio,
+            seed=args.seed,
+        ),
+    )
+    print(f"Synthetic corpus written to {args.output_path} : {corpus_sizes}")
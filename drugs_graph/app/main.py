@@ -1,24 +1,47 @@
 import argparse
+import cProfile
 import logging
 import os
-from typing import List
+import pstats
+from typing import Dict, List, Tuple
 
+# Only the light, pandas free modules are imported here : the graph generation pipeline and
+# the cloud logging client are loaded by the actions that need them, to keep the startup fast
+import app.src.ad_hoc.graph_index as G
 import app.src.ad_hoc.json_processing as A
-import app.src.data_processing.load as L
-import app.src.data_processing.preprocess as C
-import app.src.data_processing.transform as T
 import app.src.files_processing.files_processing as U
-import pandas as pd
-from google.cloud import logging as cloud_logging
 
-# LOGGING
-LOGGING_GCP_PROJECT_ID = os.getenv("LOGGING_GCP_PROJECT_ID", "")
-logging_client = cloud_logging.Client(project=LOGGING_GCP_PROJECT_ID)
-logger = logging_client.logger("servier-drugs-graph")
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+OUTPUT_FORMATS = ["json", "parquet", "arrow"]
+ENGINES = ["pandas", "duckdb"]
+CSV_ENGINES = ["c", "python", "pyarrow"]
+# Actions running the stages of the pipeline, profiled and logged to cloud logging
+PIPELINE_ACTIONS = ["generate_graph", "update_graph_drugs", "merge_graph_shards"]
+# Actions querying the graph about one drug, given with --drug
+DRUG_ACTIONS = ["get_journals_citing_drug", "get_drugs_co_mentioned_with"]
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parses a shard given as "i/N", the i-th (from 0) of N shards.
+    """
+    try:
+        shard_position, nb_shards = map(int, shard.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid shard {shard}, expected i/N, e.g. 0/4"
+        )
+
+    if not 0 <= shard_position < nb_shards:
+        raise argparse.ArgumentTypeError(
+            f"Invalid shard {shard}, i has to be between 0 and N - 1"
+        )
+
+    return shard_position, nb_shards
+
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
@@ -26,7 +49,14 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument(
         "--action",
         type=str,
-        choices=["generate_graph", "get_journal_with_most_drugs"],
+        choices=[
+            "generate_graph",
+            "update_graph_drugs",
+            "merge_graph_shards",
+            "get_journal_with_most_drugs",
+            "get_journals_citing_drug",
+            "get_drugs_co_mentioned_with",
+        ],
         help="Action to perform",
         required=True,
     )
@@ -45,136 +75,171 @@ def parse_arguments() -> argparse.Namespace:
         default="outputs/graph.json",
     )
 
-    return parser.parse_args()
-
+    parser.add_argument(
+        "--drug",
+        type=str,
+        help="The ID or name of the drug queried by get_journals_citing_drug and get_drugs_co_mentioned_with",
+    )
 
-def clean_dataframes(
-    clinical_df: pd.DataFrame, pubmed_df: pd.DataFrame, drugs_df: pd.DataFrame
-) -> List:
-    """
-    This function is simply used to orchestrate the different cleaning steps in the correct order.
-    Check the docstring of each function or the in-line comments for more details.
-    """
-    # Standardize column names
-    clinical_df = C.rename_column(clinical_df, {"scientific_title": "title"})
-    drugs_df = C.rename_column(drugs_df, {"drug": "name"})
-    logging.info("[Cleaning] - Successfully renamed columns.")
+    parser.add_argument(
+        "--graph_builder",
+        type=str,
+        choices=["vectorized", "journal"],
+        help="vectorized : single pass over all the articles, journal : one pass per journal. Default value : vectorized",
+        default="vectorized",
+    )
 
-    # Standardize the Date format (into %Y-%m-%d)
-    clinical_df = C.normalize_dates_format(clinical_df, "date", "%Y-%m-%d")
-    pubmed_df = C.normalize_dates_format(pubmed_df, "date", "%Y-%m-%d")
-    logging.info("[Cleaning] - Successfully standardized date formats.")
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=ENGINES,
+        help="pandas : DataFrames in memory, duckdb : the articles are scanned, cleaned and matched in SQL by an in-process DuckDB, multi-threaded, the cleaned articles and mentions then being loaded in memory (requires duckdb). Default value : pandas",
+        default="pandas",
+    )
 
-    # Merge duplicate rows together, filling in missing columns based on other rows
-    clinical_articles_group = clinical_df.groupby(["title", "date"], group_keys=False)[
-        clinical_df.columns.tolist()
-    ]
-    clinical_df = clinical_articles_group.apply(T.merge_rows).reset_index(drop=True)
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        help="json : nested graph of the journals, parquet / arrow : flat table of the drug mentions, partitioned by year, written in the output path without its .json extension. Default value : json",
+        default="json",
+    )
 
-    pubmed_articles_group = pubmed_df.groupby(["title", "date"], group_keys=False)[
-        clinical_df.columns.tolist()
-    ]
-    pubmed_df = pubmed_articles_group.apply(T.merge_rows).reset_index(drop=True)
-    logging.info("[Cleaning] - Successfully filled in missing data.")
+    parser.add_argument(
+        "--compact_output",
+        action="store_true",
+        help="Write the output json without indentation",
+    )
 
-    # Fill in missing IDs
-    pubmed_df = C.fill_in_missing_ids_int(pubmed_df, "id")
-    logging.info("[Cleaning] - Successfully interpolated missingIDs.")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Load the articles by chunks of this number of rows, only keeping the ones mentioning drugs. Journals without any mention are then left out of the graph. Default value : 0 (no chunking)",
+        default=0,
+    )
 
-    # Clean titles and names
-    pubmed_df["title"] = pubmed_df["title"].apply(C.clean_titles)
-    pubmed_df["journal"] = pubmed_df["journal"].apply(C.clean_titles)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes used to generate the graph of the journals. Default value : 1",
+        default=1,
+    )
 
-    clinical_df["title"] = clinical_df["title"].apply(C.clean_titles)
-    clinical_df["journal"] = clinical_df["journal"].apply(C.clean_titles)
+    parser.add_argument(
+        "--load_workers",
+        type=int,
+        help="Number of threads loading the input files of all the sources in parallel. Default value : 1",
+        default=1,
+    )
 
-    drugs_df["name"] = drugs_df["name"].apply(C.clean_titles)
-    logging.info("[Cleaning] - Successfully cleaned all titles and names.")
+    parser.add_argument(
+        "--csv_engine",
+        type=str,
+        choices=CSV_ENGINES,
+        help="Parser of the csv input files, pyarrow being multi-threaded (requires pyarrow). Default value : c",
+        default="c",
+    )
 
-    # Standardize the type of IDs used (string)
-    pubmed_df = C.cast_id_as_string(pubmed_df, "id")
-    clinical_df = C.cast_id_as_string(clinical_df, "id")
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="Only process the article files of the shard i/N (from 0), writing their drug mentions in the shards path. The graph is then written by merge_graph_shards",
+    )
 
-    return clinical_df, pubmed_df, drugs_df
+    parser.add_argument(
+        "--shards_path",
+        type=str,
+        help="The folder where the shards write their drug mentions, shared by all of them. Default value : outputs/shards",
+        default="outputs/shards",
+    )
 
+    parser.add_argument(
+        "--title_index",
+        action="store_true",
+        help="Also write the inverted index of the article titles next to the graph (e.g. outputs/graph.titles.json), used by update_graph_drugs to patch the graph when the drugs change",
+    )
 
-def generate_graph(data_path: str, output_path: str) -> None:
-    # Define the paths to the data
-    clinical_trials_path = U.list_files_in_folder(
-        f"{data_path}/clinical_trials", file_types=["csv", "json"]
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process the article files that are new or changed since the previous run",
     )
-    pubmed_path = U.list_files_in_folder(
-        f"{data_path}/pubmed", file_types=["csv", "json"]
+
+    parser.add_argument(
+        "--state_path",
+        type=str,
+        help="The folder where the incremental mode keeps the fingerprints and mentions of the input files. Default value : outputs/state",
+        default="outputs/state",
     )
-    drugs_path = U.list_files_in_folder(
-        f"{data_path}/drugs", file_types=["csv", "json"]
+
+    parser.add_argument(
+        "--cache_path",
+        type=str,
+        help="The folder where the cleaned input dataframes are cached (requires pyarrow), reused as long as their input files don't change, along with the cleaned journals and drug names, reused for any input file. Default value : no cache",
     )
 
-    # Load Data
-    clinical_df = L.load_input_data(clinical_trials_path)
-    pubmed_df = L.load_input_data(pubmed_path)
-    drugs_df = L.load_input_data(drugs_path)
+    parser.add_argument(
+        "--profile_report",
+        type=str,
+        help="Write the durations, peak memory, memory delta and rows in / out of each stage of the graph generation, update or merge to this json file",
+    )
 
-    # Clean dataframes
-    clinical_df_cleaned, pubmed_df_cleaned, drugs_df_cleaned = clean_dataframes(
-        clinical_df, pubmed_df, drugs_df
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run the action under cProfile, printing the most expensive functions and writing the stats next to the output (e.g. outputs/graph.prof)",
     )
 
-    # Enrich the dataframes with the types of articles, before merging
-    pubmed_df_cleaned["article_type"] = "PubMed"
-    clinical_df_cleaned["article_type"] = "ClinicalTrial"
+    args = parser.parse_args()
+    if args.action in DRUG_ACTIONS and not args.drug:
+        parser.error(f"--drug is required by the {args.action} action")
 
-    # Merge the articles dataframes into one
-    all_articles_df = T.merge_dataframes([pubmed_df_cleaned, clinical_df_cleaned])
-    logging.info(
-        "[Transform] - Successfully merged the pubmed and clinical trials dataframes."
-    )
+    return args
+
+
+def load_graph_index(output_path: str) -> Dict:
+    """
+    Loads the index of the graph, (re)building it from the full graph if it is missing, older than the graph
+    or written by another version.
+    """
+    index_path = G.get_index_path(output_path)
 
-    # Remove empty strings
-    all_articles_df_cleaned = C.drop_empty_titles_and_journals(all_articles_df)
-    logging.info("[Cleaning] - Successfully droped rows with empty titles and names.")
+    if G.is_index_up_to_date(output_path):
+        graph_index = U.import_json_file_as_dict(index_path)
+        if graph_index.get("version") == G.INDEX_VERSION:
+            return graph_index
 
-    # Drop duplicate IDs and index dataframes
-    drugs_df_cleaned, all_articles_df_cleaned = C.drop_duplicate_ids_then_index(
-        drugs_df_cleaned, all_articles_df_cleaned
+    logging.warning(
+        f"No up to date index found for {output_path}. Building it from the full graph."
     )
-    logging.info("[Cleaning] - Successfully droped rows with duplicate IDs.")
+    graph_index_builder = G.GraphIndexBuilder()
+    for journal_object in A.iter_graph_journals(output_path):
+        graph_index_builder.add_journal(journal_object)
+
+    graph_index = graph_index_builder.to_dict()
+    U.write_dict_to_file(index_path, graph_index, indent=None)
 
-    # Finally, generate the graph as json file
-    output_graph = T.build_link_graph_from_df(all_articles_df_cleaned, drugs_df_cleaned)
-    U.write_dict_to_file(output_path, output_graph)
-    logging.info(f"[Transform] - Link graph successfully written to {output_path}.")
+    return graph_index
 
 
 def get_journal_with_most_drugs(output_path: str) -> List:
     """
     Returns a list of the name(s) of the journal(s) that has mentioned most unique drugs.
     In the case of a tie, all the tied journal are returned.
+    Without an up to date index, the journals are read from the graph one at a time instead,
+    so the memory used doesn't grow with the graph.
     """
-    graph_dict = U.import_json_file_as_dict(output_path)
-
-    unique_mentions_mapping = {}
-
-    for journal_object in graph_dict["journals"]:
-        (
-            curr_pubmed_articles,
-            curr_clinical_trials_articles,
-        ) = A.get_all_articles_from_journal(journal_object)
-
-        set_curr_mentioned_drugs = A.get_drugs_mentioned_by_journal(
-            pubmed_of_journal=curr_pubmed_articles,
-            clinical_trials_of_journal=curr_clinical_trials_articles,
-            return_drug_names=False,  # Use IDs to be more accurate
+    # Drugs are counted with their IDs, to be more accurate
+    if G.is_index_up_to_date(output_path):
+        journals_with_most_drugs, max_nb_unique_mentions = (
+            G.get_journals_with_most_drugs(
+                U.import_json_file_as_dict(G.get_index_path(output_path))
+            )
+        )
+    else:
+        journals_with_most_drugs, max_nb_unique_mentions = (
+            A.get_journals_with_most_drugs(A.iter_graph_journals(output_path))
         )
-
-        unique_mentions_mapping[journal_object["title"]] = len(set_curr_mentioned_drugs)
-
-    max_nb_unique_mentions = max(unique_mentions_mapping.values())
-    journals_with_most_drugs = [
-        key
-        for key, value in unique_mentions_mapping.items()
-        if value == max_nb_unique_mentions
-    ]
 
     logging.info(
         f"The journal(s) {', '.join(journals_with_most_drugs)} has mentioned {max_nb_unique_mentions} unique drugs"
@@ -183,18 +248,111 @@ def get_journal_with_most_drugs(output_path: str) -> List:
     return journals_with_most_drugs
 
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def run_action(args: argparse.Namespace) -> None:
+    if args.action in PIPELINE_ACTIONS:
+        import app.src.data_processing.pipeline as P
+        from app.src.monitoring.cloud_logger import get_cloud_logger
+
+        P.profiler.cloud_logger = get_cloud_logger()
 
     if args.action == "generate_graph":
-        generate_graph(
+        if args.engine == "duckdb" and (
+            args.shard
+            or args.incremental
+            or args.workers != 1
+            or args.graph_builder != "vectorized"
+            or args.load_workers != 1
+            or args.csv_engine != "c"
+        ):
+            raise ValueError(
+                "The duckdb engine reads all the articles itself, and can't be used with shard, incremental, workers, graph_builder, load_workers or csv_engine."
+            )
+
+        if args.shard:
+            P.generate_graph_shard(
+                data_path=args.data_path,
+                shards_path=args.shards_path,
+                shard=args.shard[0],
+                nb_shards=args.shard[1],
+                load_workers=args.load_workers,
+                csv_engine=args.csv_engine,
+            )
+        elif args.incremental:
+            P.generate_graph_incremental(
+                data_path=args.data_path,
+                output_path=args.output_path,
+                state_path=args.state_path,
+                compact_output=args.compact_output,
+                output_format=args.output_format,
+                load_workers=args.load_workers,
+                csv_engine=args.csv_engine,
+            )
+        else:
+            P.generate_graph(
+                data_path=args.data_path,
+                output_path=args.output_path,
+                graph_builder=args.graph_builder,
+                compact_output=args.compact_output,
+                chunksize=args.chunksize,
+                workers=args.workers,
+                output_format=args.output_format,
+                cache_path=args.cache_path,
+                load_workers=args.load_workers,
+                csv_engine=args.csv_engine,
+                title_index=args.title_index,
+                engine=args.engine,
+            )
+
+    elif args.action == "update_graph_drugs":
+        P.update_graph_drugs(
             data_path=args.data_path,
             output_path=args.output_path,
+            compact_output=args.compact_output,
+        )
+
+    elif args.action == "merge_graph_shards":
+        P.merge_graph_shards(
+            shards_path=args.shards_path,
+            output_path=args.output_path,
+            compact_output=args.compact_output,
+            output_format=args.output_format,
         )
 
     elif args.action == "get_journal_with_most_drugs":
         journals_with_most_drugs = get_journal_with_most_drugs(args.output_path)
         print(journals_with_most_drugs)
 
+    elif args.action in DRUG_ACTIONS:
+        get_drug_results = (
+            G.get_journals_citing_drug
+            if args.action == "get_journals_citing_drug"
+            else G.get_drugs_co_mentioned_with
+        )
+        try:
+            print(get_drug_results(load_graph_index(args.output_path), args.drug))
+        except KeyError as error:
+            # An unknown drug isn't mentioned by any journal nor with any other drug
+            logging.warning(error.args[0])
+            print([])
+
     else:
         raise ValueError("Invalid action")
+
+    if args.action in PIPELINE_ACTIONS and args.profile_report:
+        P.profiler.write_report(args.profile_report)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if args.profile:
+        run_profile = cProfile.Profile()
+        run_profile.runcall(run_action, args)
+
+        profile_path = f"{os.path.splitext(args.output_path)[0]}.prof"
+        U.create_folders_if_not_exist(profile_path)
+        run_profile.dump_stats(profile_path)
+        pstats.Stats(run_profile).sort_stats("cumulative").print_stats(30)
+        logging.info(f"[Profiling] - cProfile stats written to {profile_path}.")
+    else:
+        run_action(args)
@@ -0,0 +1,150 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List
+
+import app.src.ad_hoc.json_processing as A
+
+# Bumped whenever the content of the index changes, to rebuild the outdated ones
+INDEX_VERSION = 2
+
+
+def get_index_path(graph_path: str) -> str:
+    """
+    Returns the path of the index written alongside the graph, e.g. outputs/graph.index.json
+    """
+    return f"{os.path.splitext(graph_path)[0]}.index.json"
+
+
+def is_index_up_to_date(graph_path: str) -> bool:
+    index_path = get_index_path(graph_path)
+
+    return os.path.exists(index_path) and os.path.getmtime(
+        index_path
+    ) >= os.path.getmtime(graph_path)
+
+
+@dataclass
+class GraphIndexBuilder:
+    """
+    Builds a compact index of the graph while its journals are written :
+    drugs and journals are stored once, and referenced by their position everywhere else.
+    """
+
+    drugs: Dict = field(default_factory=dict)  # Drug ID -> position
+    drug_names: List = field(default_factory=list)
+    journals: List = field(default_factory=list)
+    journal_drugs: List = field(default_factory=list)
+    drug_journals: List = field(default_factory=list)
+    drug_articles: List = field(default_factory=list)
+
+    def get_drug_position(self, drug_id: str, drug_name: str) -> int:
+        if drug_id not in self.drugs:
+            self.drugs[drug_id] = len(self.drugs)
+            self.drug_names.append(drug_name)
+            self.drug_journals.append([])
+            self.drug_articles.append([])
+
+        return self.drugs[drug_id]
+
+    def add_journal(self, journal_dict: Dict) -> None:
+        journal_position = len(self.journals)
+        self.journals.append(journal_dict["title"])
+
+        journal_drug_positions = set()
+        for article_list in A.get_all_articles_from_journal(journal_dict):
+            for article_object in article_list:
+                drug_position = self.get_drug_position(
+                    article_object["mentioned_drug_id"],
+                    article_object["mentioned_drug_name"],
+                )
+                journal_drug_positions.add(drug_position)
+                self.drug_articles[drug_position].append(article_object["article_id"])
+
+        for drug_position in journal_drug_positions:
+            self.drug_journals[drug_position].append(journal_position)
+
+        self.journal_drugs.append(sorted(journal_drug_positions))
+
+    def index_journals(self, journals: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Indexes each journal right before yielding it, so it can wrap the journals being written.
+        """
+        for journal_dict in journals:
+            self.add_journal(journal_dict)
+            yield journal_dict
+
+    def to_dict(self) -> Dict:
+        # A name shared by several drugs refers to the first one
+        drug_name_positions: Dict[str, int] = {}
+        for drug_position, drug_name in enumerate(self.drug_names):
+            drug_name_positions.setdefault(drug_name.lower(), drug_position)
+
+        return {
+            "version": INDEX_VERSION,
+            "drugs": list(self.drugs),
+            "drug_positions": self.drugs,
+            "drug_name_positions": drug_name_positions,
+            "drug_names": self.drug_names,
+            "journals": self.journals,
+            "journal_drugs": self.journal_drugs,
+            "drug_journals": self.drug_journals,
+            "drug_articles": [
+                sorted(set(article_ids)) for article_ids in self.drug_articles
+            ],
+        }
+
+
+def get_drug_position(graph_index: Dict, drug: str) -> int:
+    """
+    Finds a drug in the index from its ID or its name (case insensitive).
+    """
+    if drug in graph_index["drug_positions"]:
+        return graph_index["drug_positions"][drug]
+
+    if drug.lower() in graph_index["drug_name_positions"]:
+        return graph_index["drug_name_positions"][drug.lower()]
+
+    raise KeyError(f"The drug {drug} is not mentioned in the graph.")
+
+
+def get_journals_with_most_drugs(graph_index: Dict) -> List:
+    """
+    Returns the journal(s) that mentioned the most unique drugs, and that number of drugs
+    (no journal and 0 for an empty graph).
+    """
+    nb_drugs_by_journal = [
+        len(drug_positions) for drug_positions in graph_index["journal_drugs"]
+    ]
+    max_nb_unique_mentions = max(nb_drugs_by_journal, default=0)
+
+    journals_with_most_drugs = [
+        journal
+        for journal, nb_drugs in zip(graph_index["journals"], nb_drugs_by_journal)
+        if nb_drugs == max_nb_unique_mentions
+    ]
+
+    return [journals_with_most_drugs, max_nb_unique_mentions]
+
+
+def get_journals_citing_drug(graph_index: Dict, drug: str) -> List:
+    drug_position = get_drug_position(graph_index, drug)
+
+    return [
+        graph_index["journals"][journal_position]
+        for journal_position in graph_index["drug_journals"][drug_position]
+    ]
+
+
+def get_drugs_co_mentioned_with(graph_index: Dict, drug: str) -> List:
+    """
+    Returns the names of the other drugs mentioned in at least one of the articles mentioning the drug.
+    """
+    drug_position = get_drug_position(graph_index, drug)
+    articles_of_drug = set(graph_index["drug_articles"][drug_position])
+
+    return [
+        graph_index["drug_names"][other_position]
+        for other_position, other_articles in enumerate(graph_index["drug_articles"])
+        if other_position != drug_position
+        and not articles_of_drug.isdisjoint(other_articles)
+    ]
@@ -1,5 +1,7 @@
-import logging
-from typing import Dict, List, Set
+import itertools
+from typing import Dict, Iterable, Iterator, List, Set
+
+import app.src.files_processing.files_processing as U
 
 
 def get_all_articles_from_journal(journal_dict: Dict) -> List:
@@ -29,12 +31,43 @@ def get_drugs_mentioned_by_journal(
     """
     Extracts all drugs mentioned in a journal"""
     mentioned_drugs_no_duplicates = set()
-    all_articles = pubmed_of_journal + clinical_trials_of_journal
 
-    for article_object in all_articles:
+    for article_object in itertools.chain(
+        pubmed_of_journal, clinical_trials_of_journal
+    ):
         if return_drug_names:
             mentioned_drugs_no_duplicates.add(article_object["mentioned_drug_name"])
         else:
             mentioned_drugs_no_duplicates.add(article_object["mentioned_drug_id"])
 
     return mentioned_drugs_no_duplicates
+
+
+def iter_graph_journals(graph_path: str) -> Iterator[Dict]:
+    """
+    Yields the journals of a graph file one at a time, so a query holds a single journal in memory
+    whatever the size of the graph.
+    """
+    yield from U.iter_json_file_array(graph_path, "journals")
+
+
+def get_journals_with_most_drugs(journals: Iterable[Dict]) -> List:
+    """
+    Returns the journal(s) that mentioned the most unique drugs, and that number of drugs,
+    going through the journals only once.
+    """
+    journals_with_most_drugs = []
+    max_nb_unique_mentions = 0
+
+    for journal_dict in journals:
+        nb_unique_mentions = len(
+            get_drugs_mentioned_by_journal(*get_all_articles_from_journal(journal_dict))
+        )
+
+        if nb_unique_mentions > max_nb_unique_mentions:
+            journals_with_most_drugs = [journal_dict["title"]]
+            max_nb_unique_mentions = nb_unique_mentions
+        elif nb_unique_mentions == max_nb_unique_mentions:
+            journals_with_most_drugs.append(journal_dict["title"])
+
+    return [journals_with_most_drugs, max_nb_unique_mentions]
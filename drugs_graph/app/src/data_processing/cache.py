@@ -0,0 +1,211 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import app.src.files_processing.files_processing as P
+import pandas as pd
+
+# Bumped whenever the cleaning steps change, to invalidate the cached DataFrames
+CACHE_VERSION = 2
+CACHE_FILE_EXTENSION = "arrow"
+# Bumped whenever the cleaned values kept change : the cleaned titles are no longer kept since version 3
+NORMALIZATION_CACHE_VERSION = 3
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as error:
+        raise ImportError(
+            "The cache of the cleaned DataFrames requires pyarrow : poetry install --extras arrow (or pip install pyarrow)"
+        ) from error
+
+    return pa
+
+
+@dataclass
+class CleanedDataFramesCache:
+    """
+    Cache of the cleaned input DataFrames, stored as Arrow IPC (Feather v2) files and keyed by the
+    fingerprints of the input files they were built from. Cached DataFrames are reloaded through
+    memory mapping, skipping both the parsing and the cleaning of the inputs.
+    Without a cache path, the DataFrames are always built.
+    """
+
+    cache_path: Optional[str] = None
+    # Fingerprints already computed, by path, size and modification time of the files,
+    # so that an unchanged file is only hashed once
+    files_fingerprints: Dict = field(default_factory=dict, init=False)
+
+    def get_files_fingerprints(self, filepaths: List) -> Dict:
+        files_fingerprints = {}
+        for filepath in filepaths:
+            file_stat = os.stat(filepath)
+            file_id = (filepath, file_stat.st_size, file_stat.st_mtime_ns)
+            if file_id not in self.files_fingerprints:
+                self.files_fingerprints[file_id] = P.compute_file_fingerprint(filepath)
+            files_fingerprints[filepath] = self.files_fingerprints[file_id]
+
+        return files_fingerprints
+
+    def get_cache_key(
+        self, name: str, filepaths: List, parameters: Optional[Dict] = None
+    ) -> str:
+        key_content = {
+            "version": CACHE_VERSION,
+            "name": name,
+            "files": self.get_files_fingerprints(filepaths),
+            "parameters": parameters or {},
+        }
+        key_str = json.dumps(key_content, sort_keys=True)
+
+        return hashlib.sha256(key_str.encode("utf-8")).hexdigest()[:16]
+
+    def get_cached_file_path(self, name: str, cache_key: str) -> str:
+        assert self.cache_path is not None
+        return os.path.join(
+            self.cache_path, f"{name}-{cache_key}.{CACHE_FILE_EXTENSION}"
+        )
+
+    def is_cached(
+        self, name: str, filepaths: List, parameters: Optional[Dict] = None
+    ) -> bool:
+        if not self.cache_path:
+            return False
+
+        cache_key = self.get_cache_key(name, filepaths, parameters)
+        return os.path.exists(self.get_cached_file_path(name, cache_key))
+
+    def load(self, name: str, cache_key: str) -> Optional[pd.DataFrame]:
+        pa = import_pyarrow()
+        cached_file_path = self.get_cached_file_path(name, cache_key)
+
+        if not os.path.exists(cached_file_path):
+            return None
+
+        with pa.memory_map(cached_file_path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    def save(self, name: str, cache_key: str, df: pd.DataFrame) -> None:
+        """
+        Replaces the cached versions of the DataFrame. The file is written under a temporary name first,
+        so an interrupted run never leaves a truncated file behind.
+        """
+        pa = import_pyarrow()
+        cached_file_path = self.get_cached_file_path(name, cache_key)
+        P.create_folders_if_not_exist(cached_file_path)
+
+        table = pa.Table.from_pandas(df)
+        with pa.OSFile(f"{cached_file_path}.tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        for previous_file_path in glob.glob(self.get_cached_file_path(name, "*")):
+            os.remove(previous_file_path)
+        os.replace(f"{cached_file_path}.tmp", cached_file_path)
+
+    def get_or_build(
+        self,
+        name: str,
+        filepaths: List,
+        build_dataframe: Callable[[], pd.DataFrame],
+        parameters: Optional[Dict] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the cached DataFrame if the input files and parameters did not change,
+        otherwise builds it with `build_dataframe` and caches it.
+        """
+        if not self.cache_path:
+            return build_dataframe()
+
+        cache_key = self.get_cache_key(name, filepaths, parameters)
+        cached_df = self.load(name, cache_key)
+
+        if cached_df is not None:
+            logging.info(f"[Cache] - Loaded the cleaned {name} DataFrame from cache.")
+            return cached_df
+
+        df = build_dataframe()
+        self.save(name, cache_key, df)
+        logging.info(f"[Cache] - Cached the cleaned {name} DataFrame.")
+
+        return df
+
+
+@dataclass
+class NormalizationCache:
+    """
+    Cleaned values of the raw journals and drug names seen by the previous runs, persisted as an
+    Arrow IPC file in the cache folder, so that a value is only cleaned the first time it is seen.
+    The titles are not kept : nearly all distinct, they would grow the cache with every article.
+    Unlike the cached DataFrames, it is still used when the input files change.
+    Without a cache path, the cleaned values are only reused within the run.
+    """
+
+    cache_path: Optional[str] = None
+    cleaned_values: Dict = field(default_factory=dict, init=False)
+    nb_saved_values: int = field(default=0, init=False)
+
+    def get_cached_file_path(self) -> str:
+        assert self.cache_path is not None
+        return os.path.join(
+            self.cache_path,
+            f"normalized_values-v{NORMALIZATION_CACHE_VERSION}.{CACHE_FILE_EXTENSION}",
+        )
+
+    def load(self) -> None:
+        if not self.cache_path or not os.path.exists(self.get_cached_file_path()):
+            return
+
+        pa = import_pyarrow()
+        with pa.memory_map(self.get_cached_file_path(), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        self.cleaned_values.update(
+            zip(table.column("raw").to_pylist(), table.column("cleaned").to_pylist())
+        )
+        self.nb_saved_values = len(self.cleaned_values)
+        logging.info(
+            f"[Cache] - Loaded {self.nb_saved_values} cleaned values from cache."
+        )
+
+    def save(self) -> None:
+        """
+        Persists the cleaned values if new ones were added, replacing the versions of the previous
+        cleaning steps. Only the string values are kept, like the values of the input files.
+        """
+        if not self.cache_path or len(self.cleaned_values) == self.nb_saved_values:
+            return
+
+        pa = import_pyarrow()
+        cached_file_path = self.get_cached_file_path()
+        P.create_folders_if_not_exist(cached_file_path)
+
+        raw_values = [value for value in self.cleaned_values if isinstance(value, str)]
+        table = pa.table(
+            {
+                "raw": pa.array(raw_values, type=pa.string()),
+                "cleaned": pa.array(
+                    [self.cleaned_values[value] for value in raw_values],
+                    type=pa.string(),
+                ),
+            }
+        )
+        with pa.OSFile(f"{cached_file_path}.tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        for previous_file_path in glob.glob(
+            os.path.join(
+                self.cache_path, f"normalized_values-v*.{CACHE_FILE_EXTENSION}"
+            )
+        ):
+            os.remove(previous_file_path)
+        os.replace(f"{cached_file_path}.tmp", cached_file_path)
+
+        self.nb_saved_values = len(self.cleaned_values)
+        logging.info(f"[Cache] - Cached {self.nb_saved_values} cleaned values.")
@@ -0,0 +1,460 @@
+import logging
+from typing import Dict, List, Literal, Optional
+
+import app.src.data_processing.load as L
+import app.src.data_processing.preprocess as C
+import app.src.data_processing.transform as T
+import numpy as np
+import pandas as pd
+from app.src.graph_link.drug_matcher import get_drug_names_df
+
+# Values read as missing in the csv files, the same as pandas
+CSV_NULL_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+ARTICLE_COLUMNS = ["id", "title", "date", "journal"]
+
+# Units tried by `pd.read_json` to convert the date columns of the json files
+JSON_DATE_UNITS: List[Literal["s", "ms", "us", "ns"]] = ["s", "ms", "us", "ns"]
+
+# Sources of articles, in the order they are merged, with their type
+ARTICLE_SOURCES = {"pubmed": "PubMed", "clinical_trials": "ClinicalTrial"}
+
+# Whitespaces of Python (str.split, \s) and its word characters (\w), which RE2 only matches in ASCII
+WHITESPACES = r"\t\n\v\f\r\x1c-\x1f\x85\pZ"
+WORD_CHARACTERS = r"\pL\pN_"
+CASED_LETTERS = r"\p{Lu}\p{Ll}\p{Lt}"
+
+# SQL version of `C.clean_titles`. `title_case` is str.title : the first letter of each run of
+# cased letters is upper-cased, the other ones lower-cased. The few letters whose title case is not their upper case
+# (digraphs like "ǆ", "ß") are upper-cased
+CLEAN_TITLES_MACROS = f"""
+CREATE OR REPLACE MACRO title_case(value) AS array_to_string(
+    list_transform(
+        regexp_extract_all(value, '[{CASED_LETTERS}]+|[^{CASED_LETTERS}]+'),
+        part -> CASE
+            WHEN regexp_matches(part, '^[{CASED_LETTERS}]')
+            THEN upper(left(part, 1)) || lower(substr(part, 2))
+            ELSE part
+        END
+    ),
+    ''
+);
+CREATE OR REPLACE MACRO clean_title(value) AS trim(
+    regexp_replace(
+        title_case(
+            regexp_replace(
+                replace(
+                    regexp_replace(value, '{C.ENCODING_ISSUES_PATTERN.pattern}', '', 'g'),
+                    '{C.NAMES_SEPARATOR}',
+                    ' '
+                ),
+                '[^{WORD_CHARACTERS}{WHITESPACES}&ÀàÀ-ÿ-]',
+                '',
+                'g'
+            )
+        ),
+        '[{WHITESPACES}]+',
+        ' ',
+        'g'
+    ),
+    ' '
+);
+"""
+
+# The same steps as `merge_duplicate_rows` : rows without a title or a date are dropped, the other ones merged
+# by title and date, each column taking its first non-null value, sorted by title then date
+DEDUP_ARTICLES_QUERY = """
+CREATE OR REPLACE TEMP TABLE {source}_dedup AS
+SELECT
+    first(id ORDER BY file_position, row_position) FILTER (WHERE id IS NOT NULL) AS id,
+    title,
+    parsed_date AS date,
+    first(journal ORDER BY file_position, row_position) FILTER (WHERE journal IS NOT NULL) AS journal,
+    row_number() OVER (ORDER BY title, parsed_date) AS sorted_position
+FROM {source}_dated
+WHERE title IS NOT NULL AND parsed_date IS NOT NULL
+GROUP BY title, parsed_date
+"""
+
+# The same steps as `fill_in_missing_ids_int` then `cast_id_as_string` : IDs are integers, the missing ones
+# numbered after the highest one in the sorted order
+FILL_IN_MISSING_IDS_QUERY = """
+CREATE OR REPLACE TEMP TABLE {source}_ids AS
+WITH numeric_ids AS (
+    SELECT *, CASE WHEN isfinite(try_cast(id AS DOUBLE)) THEN trunc(try_cast(id AS DOUBLE)) END AS numeric_id
+    FROM {source}_dedup
+)
+SELECT
+    CAST(CAST(coalesce(
+        numeric_id,
+        greatest(coalesce(max(numeric_id) OVER (), 0), 0)
+            + row_number() OVER (PARTITION BY numeric_id IS NULL ORDER BY sorted_position)
+    ) AS BIGINT) AS VARCHAR) AS id,
+    title,
+    date,
+    journal,
+    sorted_position
+FROM numeric_ids
+"""
+
+# Like `cast_id_as_string`, which gives "nan" to the missing IDs
+CAST_ID_AS_STRING_QUERY = """
+CREATE OR REPLACE TEMP TABLE {source}_ids AS
+SELECT coalesce(id, 'nan') AS id, title, date, journal, sorted_position FROM {source}_dedup
+"""
+
+# Titles and journals cleaning, in a table of its own : as a subquery of the next steps, the filters on the
+# cleaned values are pushed down to the scans and the cleaning is run several times
+CLEAN_ARTICLES_QUERY = """
+CREATE OR REPLACE TEMP TABLE cleaned_articles AS
+WITH all_articles AS (
+    {articles_of_sources}
+)
+SELECT
+    id,
+    clean_title(title) AS title,
+    date,
+    clean_title(journal) AS journal,
+    article_type,
+    source_position,
+    sorted_position
+FROM all_articles
+"""
+
+# The same steps as `drop_empty_titles_and_journals` and `drop_duplicate_ids_then_index`
+MERGE_ARTICLES_QUERY = """
+CREATE OR REPLACE TEMP TABLE articles AS
+WITH unique_articles AS (
+    SELECT *
+    FROM cleaned_articles
+    WHERE title <> '' AND journal <> ''
+    QUALIFY row_number() OVER (PARTITION BY id ORDER BY source_position, sorted_position) = 1
+)
+SELECT
+    id,
+    title,
+    date,
+    journal,
+    article_type,
+    row_number() OVER (ORDER BY source_position, sorted_position) - 1 AS article_position
+FROM unique_articles
+"""
+
+# Title to drug join : each token of a title is joined to the names starting with it, multi-word names
+# being compared to the tokens following it
+EXTRACT_MENTIONS_QUERY = """
+WITH article_tokens AS (
+    SELECT article_position, tokens, unnest(tokens) AS token, generate_subscripts(tokens, 1) AS token_position
+    FROM (SELECT article_position, string_split(title, ' ') AS tokens FROM articles)
+),
+names AS (
+    SELECT drug_position, drug_name, string_split(drug_name, ' ') AS name_tokens
+    FROM drug_names
+    WHERE drug_name <> ''
+)
+SELECT DISTINCT article_position, drug_position
+FROM article_tokens
+JOIN names ON article_tokens.token = names.name_tokens[1]
+WHERE len(name_tokens) = 1
+    OR array_to_string(tokens[token_position : token_position + len(name_tokens) - 1], ' ') = drug_name
+ORDER BY article_position, drug_position
+"""
+
+
+def import_duckdb():
+    try:
+        import duckdb
+    except ImportError as error:
+        raise ImportError(
+            "The duckdb engine requires duckdb : poetry install --extras duckdb (or pip install duckdb)"
+        ) from error
+
+    return duckdb
+
+
+def quote_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def get_json_scan(connection, path: str, json_format: str) -> Optional[str]:
+    """
+    Returns the DuckDB scan of a json file, all its columns read as strings, or None when DuckDB can't parse it.
+    The whole file is sampled to find its columns, so that a broken json is detected before being scanned.
+    """
+    duckdb = import_duckdb()
+    try:
+        columns = connection.execute(
+            f"DESCRIBE SELECT * FROM read_json({quote_string(path)}, format = {quote_string(json_format)}, "
+            "sample_size = -1)"
+        ).fetchall()
+    except duckdb.Error:
+        return None
+
+    columns_types = ", ".join(f"{quote_string(row[0])}: 'VARCHAR'" for row in columns)
+    return (
+        f"read_json({quote_string(path)}, format = {quote_string(json_format)}, "
+        f"columns = {{{columns_types}}})"
+    )
+
+
+def convert_json_dates(raw_dates: pd.Series) -> Optional[pd.Series]:
+    """
+    Converts the dates of a json file like `pd.read_json` does in the pandas engine : they are parsed
+    one at a time (month first) into timestamps, only when all of them can be. Returns None otherwise.
+    """
+    for date_unit in JSON_DATE_UNITS:
+        try:
+            return pd.to_datetime(raw_dates, errors="raise", unit=date_unit)
+        except (ValueError, OverflowError, TypeError):
+            continue
+
+    return None
+
+
+def convert_file_scan_dates(connection, dates_table: str, file_scan: str) -> str:
+    """
+    Returns the scan of a json file read by DuckDB, its dates converted as in the pandas engine.
+    Only the distinct dates are converted, then joined back to the rows already numbered by the scan.
+    """
+    file_columns = [
+        row[0] for row in connection.execute(f"DESCRIBE {file_scan}").fetchall()
+    ]
+    if "date" not in file_columns:
+        return file_scan
+
+    raw_dates = pd.Series(
+        [
+            row[0]
+            for row in connection.execute(
+                f"SELECT DISTINCT date FROM ({file_scan}) WHERE date IS NOT NULL"
+            ).fetchall()
+        ],
+        dtype=object,
+    )
+    dates = convert_json_dates(raw_dates)
+    if dates is None:
+        return file_scan
+
+    connection.register(
+        dates_table,
+        pd.DataFrame(
+            {
+                "raw_date": raw_dates,
+                "date": [None if pd.isna(date) else str(date) for date in dates],
+            }
+        ),
+    )
+    return (
+        f"SELECT files.* REPLACE (dates.date AS date) FROM ({file_scan}) AS files "
+        f"LEFT JOIN {dates_table} AS dates ON files.date = dates.raw_date"
+    )
+
+
+def get_file_scan(connection, source: str, file_position: int, path: str) -> str:
+    """
+    Returns the query scanning one input file, numbering its rows in order.
+    Csv and json files are scanned by DuckDB, all their columns read as strings.
+    Json files DuckDB can't parse may be broken, so they are loaded (and repaired) like in the pandas engine
+    then registered, their values kept as strings.
+    """
+    json_scan = None
+    if path.endswith(".csv"):
+        null_values = ", ".join(quote_string(value) for value in CSV_NULL_VALUES)
+        scan = f"read_csv({quote_string(path)}, header = true, all_varchar = true, nullstr = [{null_values}])"
+
+    elif path.endswith(L.JSON_LINES_EXTENSIONS + (".json",)):
+        json_format = (
+            "newline_delimited" if path.endswith(L.JSON_LINES_EXTENSIONS) else "array"
+        )
+        json_scan = get_json_scan(connection, path, json_format)
+
+        if json_scan is not None:
+            scan = json_scan
+        else:
+            logging.warning(
+                f"[DuckDB] - Can't parse {path}, it is loaded with pandas instead"
+            )
+            scan = f"{source}_file_{file_position}"
+            connection.register(
+                scan,
+                L.load_df_from_file(path)
+                .astype(object)
+                .apply(
+                    lambda column: column.map(
+                        lambda value: None if pd.isna(value) else str(value)
+                    )
+                ),
+            )
+
+    else:
+        raise Exception(
+            f"The provided path {path} has an incompatible file extension (not csv nor json)."
+        )
+
+    file_scan = f"SELECT *, {file_position} AS file_position, row_number() OVER () AS row_position FROM {scan}"
+    if json_scan is not None:
+        file_scan = convert_file_scan_dates(
+            connection, f"{source}_file_{file_position}_dates", file_scan
+        )
+
+    return file_scan
+
+
+def create_source_view(
+    connection,
+    source: str,
+    paths: List,
+    column_naming_mapping: Optional[Dict] = None,
+) -> None:
+    """
+    Creates the view of the rows of all the files of a source : their id, title, date and journal as strings
+    (null when missing), then their file and row positions.
+    """
+    connection.execute(
+        f"CREATE OR REPLACE VIEW {source}_files AS "
+        + " UNION ALL BY NAME ".join(
+            get_file_scan(connection, source, file_position, path)
+            for file_position, path in enumerate(paths)
+        )
+    )
+
+    file_columns = [
+        row[0] for row in connection.execute(f"DESCRIBE {source}_files").fetchall()
+    ]
+    renamed_columns = {
+        (column_naming_mapping or {}).get(column_name, column_name): column_name
+        for column_name in file_columns
+    }
+
+    selected_columns = [
+        (
+            f'CAST("{renamed_columns[column_name]}" AS VARCHAR) AS {column_name}'
+            if column_name in renamed_columns
+            else f"CAST(NULL AS VARCHAR) AS {column_name}"
+        )
+        for column_name in ARTICLE_COLUMNS
+    ]
+    connection.execute(
+        f"CREATE OR REPLACE VIEW {source}_raw AS SELECT {', '.join(selected_columns)}, "
+        f"file_position, row_position FROM {source}_files"
+    )
+
+
+def create_dated_table(connection, source: str) -> None:
+    """
+    Parses the dates with the known formats, then each distinct date left like in `C.normalize_dates_format_cached`.
+    """
+    known_formats_dates = ", ".join(
+        f"try_strptime(date, {quote_string(date_format)})"
+        for date_format in C.KNOWN_DATE_FORMATS
+    )
+    connection.execute(
+        f"CREATE OR REPLACE TEMP TABLE {source}_dated AS "
+        f"SELECT *, CAST(coalesce({known_formats_dates}) AS DATE) AS parsed_date FROM {source}_raw"
+    )
+
+    other_dates_df = connection.execute(
+        f"SELECT DISTINCT date FROM {source}_dated WHERE parsed_date IS NULL AND date IS NOT NULL"
+    ).df()
+    if len(other_dates_df) == 0:
+        return
+
+    other_dates_df["other_date"] = C.normalize_dates_format_cached(
+        other_dates_df.copy(), "date", known_date_formats=[]
+    )["date"]
+    connection.register(f"{source}_other_dates", other_dates_df)
+    connection.execute(
+        f"""
+        UPDATE {source}_dated SET parsed_date = CAST(other_dates.other_date AS DATE)
+        FROM {source}_other_dates AS other_dates
+        WHERE {source}_dated.parsed_date IS NULL AND {source}_dated.date = other_dates.date
+        """
+    )
+
+
+def clean_articles(
+    connection, clinical_trials_path: List, pubmed_path: List
+) -> pd.DataFrame:
+    """
+    Runs the cleaning steps of the pandas engine as SQL over the scans of the input files, into the articles table.
+    Returns the cleaned articles, indexed by ID, like `merge_cleaned_articles_and_drugs`.
+    """
+    connection.execute(CLEAN_TITLES_MACROS)
+
+    sources_paths = {"pubmed": pubmed_path, "clinical_trials": clinical_trials_path}
+    articles_of_sources = []
+    for source_position, (source, article_type) in enumerate(ARTICLE_SOURCES.items()):
+        if not sources_paths[source]:
+            continue
+
+        create_source_view(
+            connection,
+            source,
+            sources_paths[source],
+            {"scientific_title": "title"} if source == "clinical_trials" else None,
+        )
+        create_dated_table(connection, source)
+        connection.execute(DEDUP_ARTICLES_QUERY.format(source=source))
+        connection.execute(
+            (
+                FILL_IN_MISSING_IDS_QUERY
+                if source == "pubmed"
+                else CAST_ID_AS_STRING_QUERY
+            ).format(source=source)
+        )
+        articles_of_sources.append(
+            f"SELECT *, '{article_type}' AS article_type, {source_position} AS source_position FROM {source}_ids"
+        )
+
+    connection.execute(
+        CLEAN_ARTICLES_QUERY.format(
+            articles_of_sources=" UNION ALL ".join(articles_of_sources)
+        )
+    )
+    connection.execute(MERGE_ARTICLES_QUERY)
+
+    articles_df = (
+        connection.execute(
+            "SELECT id, title, date, journal, article_type FROM articles ORDER BY article_position"
+        )
+        .df()
+        .set_index("id")
+    )
+    articles_df["date"] = articles_df["date"].astype("datetime64[ns]")
+
+    # Journals and article types are repeated over all the articles, and stored once each
+    return C.intern_columns_as_categories(articles_df, T.INTERNED_ARTICLE_COLUMNS)
+
+
+def extract_mentions(
+    connection, articles_df: pd.DataFrame, drugs_df_cleaned: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Joins the titles of the articles table to the names and synonyms of the drugs in SQL,
+    then returns the mentions like `T.extract_mentions_from_df`.
+    """
+    connection.register("drug_names", get_drug_names_df(drugs_df_cleaned))
+    positions_df = connection.execute(EXTRACT_MENTIONS_QUERY).df().astype(np.int32)
+    logging.info(f"[DuckDB] - Found {len(positions_df)} drug mentions in the articles.")
+
+    return T.build_mentions_from_positions(articles_df, drugs_df_cleaned, positions_df)
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import app.src.data_processing.preprocess as C
+import app.src.data_processing.transform as T
+import app.src.files_processing.files_processing as P
+import pandas as pd
+
+MANIFEST_FILENAME = "manifest.json"
+FILE_RESULTS_FOLDER = "file_results"
+# Sources of articles, in the order they are merged into the graph
+ARTICLE_SOURCES = ["pubmed", "clinical_trials"]
+
+
+def load_manifest(state_path: str) -> Dict:
+    """
+    Returns the fingerprints of the input files processed by the previous run, empty if there is none.
+    """
+    manifest_path = os.path.join(state_path, MANIFEST_FILENAME)
+
+    if not os.path.exists(manifest_path):
+        return {"drugs": {}, "pubmed": {}, "clinical_trials": {}}
+
+    return P.import_json_file_as_dict(manifest_path)
+
+
+def save_manifest(state_path: str, manifest: Dict) -> None:
+    P.write_dict_to_file(os.path.join(state_path, MANIFEST_FILENAME), manifest)
+
+
+def get_file_results_path(state_path: str, article_filepath: str) -> str:
+    path_hash = hashlib.sha256(article_filepath.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_path, FILE_RESULTS_FOLDER, f"{path_hash}.json")
+
+
+def get_files_to_process(previous_manifest: Dict, current_manifest: Dict) -> List:
+    """
+    Returns the article files that are new or whose content changed since the previous run.
+    All of them are returned when the drugs changed, as every title has to be matched again.
+    """
+    drugs_changed = previous_manifest["drugs"] != current_manifest["drugs"]
+
+    return [
+        filepath
+        for source in ARTICLE_SOURCES
+        for filepath, fingerprint in current_manifest[source].items()
+        if drugs_changed or previous_manifest[source].get(filepath) != fingerprint
+    ]
+
+
+def get_removed_files(previous_manifest: Dict, current_manifest: Dict) -> List:
+    return [
+        filepath
+        for source in ARTICLE_SOURCES
+        for filepath in previous_manifest[source]
+        if filepath not in current_manifest[source]
+    ]
+
+
+def save_file_results(
+    state_path: str,
+    article_filepath: str,
+    df_articles_of_file: pd.DataFrame,
+    df_mentions_of_file: pd.DataFrame,
+    generated_article_ids: Optional[List] = None,
+) -> None:
+    """
+    Persists what the graph needs from one article file : its journals in order of appearance,
+    the highest numeric article ID, and the drug mentions of its articles.
+    `generated_article_ids` are the IDs given to the articles missing one, which are renumbered
+    when the files are merged. They are left out of the highest article ID.
+    """
+    generated_article_ids = generated_article_ids or []
+    numeric_ids = pd.to_numeric(
+        df_articles_of_file.index.to_series(), errors="coerce"
+    ).where(~df_articles_of_file.index.isin(generated_article_ids))
+
+    df_mentions_of_file = df_mentions_of_file.assign(
+        mention_date=df_mentions_of_file["mention_date"].dt.strftime("%Y-%m-%d")
+    )
+
+    file_results = {
+        "source_file": article_filepath,
+        "journals": df_articles_of_file["journal"].unique().tolist(),
+        "max_article_id": int(numeric_ids.max()) if numeric_ids.notna().any() else 0,
+        "generated_article_ids": generated_article_ids,
+        "mentions": df_mentions_of_file[T.MENTION_COLUMNS].to_dict("records"),
+    }
+
+    P.write_dict_to_file(
+        get_file_results_path(state_path, article_filepath), file_results
+    )
+
+
+def load_file_results(state_path: str, article_filepath: str) -> Dict:
+    return P.import_json_file_as_dict(
+        get_file_results_path(state_path, article_filepath)
+    )
+
+
+def delete_file_results(state_path: str, article_filepaths: List) -> None:
+    for filepath in article_filepaths:
+        file_results_path = get_file_results_path(state_path, filepath)
+
+        if os.path.exists(file_results_path):
+            os.remove(file_results_path)
+
+
+def get_known_max_article_id(state_path: str, article_filepaths: List) -> int:
+    """
+    Returns the highest numeric article ID given in the persisted results of the files.
+    """
+    return max(
+        [
+            load_file_results(state_path, filepath)["max_article_id"]
+            for filepath in article_filepaths
+        ],
+        default=0,
+    )
+
+
+def merge_file_results(
+    state_path: str, article_filepaths: List
+) -> Tuple[List, pd.DataFrame]:
+    """
+    Merges the persisted results of the article files into their journals and drug mentions.
+    Files are merged in the given order : journals are kept in order of first appearance,
+    and an article ID already found in a previous file is ignored.
+    The generated IDs of the files are renumbered in that order, after the highest article ID of all the files,
+    so that files processed separately can't give the same ID to different articles.
+    """
+    journals = {}
+    list_mentions_dfs = []
+    seen_article_ids: Set[str] = set()
+
+    list_file_results = [
+        load_file_results(state_path, filepath) for filepath in article_filepaths
+    ]
+    next_generated_id = 1 + max(
+        [file_results["max_article_id"] for file_results in list_file_results],
+        default=0,
+    )
+
+    for file_results in list_file_results:
+        journals.update(dict.fromkeys(file_results["journals"]))
+
+        df_mentions_of_file = pd.DataFrame.from_records(
+            file_results["mentions"], columns=T.MENTION_COLUMNS
+        )
+
+        generated_article_ids = file_results.get("generated_article_ids", [])
+        if generated_article_ids:
+            renumbered_ids = {
+                article_id: str(next_generated_id + position)
+                for position, article_id in enumerate(generated_article_ids)
+            }
+            next_generated_id += len(generated_article_ids)
+            df_mentions_of_file["article_id"] = df_mentions_of_file[
+                "article_id"
+            ].replace(renumbered_ids)
+
+        new_article_condition = ~df_mentions_of_file["article_id"].isin(
+            seen_article_ids
+        )
+        list_mentions_dfs.append(df_mentions_of_file[new_article_condition])
+        seen_article_ids.update(df_mentions_of_file["article_id"])
+
+    df_mentions = (
+        T.merge_dataframes(list_mentions_dfs)
+        if list_mentions_dfs
+        else pd.DataFrame(columns=T.MENTION_COLUMNS)
+    )
+    df_mentions = C.intern_columns_as_categories(
+        df_mentions, T.INTERNED_MENTION_COLUMNS
+    )
+    logging.info(
+        f"[Incremental] - Merged {len(df_mentions)} drug mentions from {len(article_filepaths)} files."
+    )
+
+    return list(journals), df_mentions
+
+
+def iter_link_graph_journals_from_file_results(
+    state_path: str, article_filepaths: List
+) -> Iterator[Dict]:
+    journals, df_mentions = merge_file_results(state_path, article_filepaths)
+    return T.iter_link_graph_journals_from_mentions(journals, df_mentions)
@@ -1,50 +1,246 @@
 import logging
-from typing import Dict, List
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import app.src.data_processing.preprocess as C
 import app.src.data_processing.transform as T
 import app.src.files_processing.files_processing as P
 import pandas as pd
+from app.src.files_processing.json_repair import NotAJsonArrayError
+from app.src.graph_link.drug_matcher import DrugMatcher
+
+# Line-delimited json, one record per line
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Optional file of the drugs folder, with one row per synonym or brand name : "atccode" and "synonym"
+DRUG_SYNONYMS_FILE_NAME = "drug_synonyms"
 
 
 def load_df_from_csv(
-    filepath: str, delimiter: str = ",", header: int = 0
+    filepath: str, delimiter: str = ",", header: int = 0, engine: Optional[str] = None
 ) -> pd.DataFrame:
-    return pd.read_csv(filepath, delimiter=delimiter, header=header)
+    # engine="pyarrow" parses the file with several threads, and requires pyarrow
+    return pd.read_csv(
+        filepath, delimiter=delimiter, header=header, engine=engine  # type: ignore[arg-type]
+    )
 
 
 def load_df_from_json(filepath: str) -> pd.DataFrame:
     return pd.read_json(filepath)
 
 
+def load_df_from_json_lines(filepath: str) -> pd.DataFrame:
+    return pd.read_json(filepath, lines=True)
+
+
 def load_df_from_dict(dictionary: Dict) -> pd.DataFrame:
     return pd.DataFrame.from_dict(dictionary)
 
 
-def load_input_data(paths: List) -> pd.DataFrame:
-    list_dfs = []
+def load_df_from_records(records: Iterable[Dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(records)
 
-    for path in paths:
-        if path.endswith(".csv"):
-            df = load_df_from_csv(path)
 
-        elif path.endswith(".json"):
+def load_df_from_file(path: str, csv_engine: Optional[str] = None) -> pd.DataFrame:
+    if path.endswith(".csv"):
+        return load_df_from_csv(path, engine=csv_engine)
+
+    elif path.endswith(".json"):
+        try:
+            return load_df_from_json(path)
+        except ValueError:
+            logging.warning(
+                f"Broken json detected in {path}. Attempting to clean it and re-load it."
+            )
             try:
-                df = load_df_from_json(path)
-            except ValueError:
-                logging.warning(
-                    f"Broken json detected in {path}. Attempting to clean it and re-load it."
-                )
-                fixed_json = P.fix_broken_json(path)
-                df = load_df_from_dict(fixed_json)
-
-        else:
-            raise Exception(
-                f"The provided path {path} has an incompatible file extension (not csv nor json)."
+                return load_df_from_records(P.iter_fixed_json_records(path))
+            except NotAJsonArrayError:
+                return load_df_from_dict(P.fix_broken_json(path))
+
+    elif path.endswith(JSON_LINES_EXTENSIONS):
+        return load_df_from_json_lines(path)
+
+    raise Exception(
+        f"The provided path {path} has an incompatible file extension (not csv nor json)."
+    )
+
+
+@dataclass
+class ParallelFilesLoader:
+    """
+    Loads the input files over a pool of threads, ahead of the steps consuming them.
+
+    The files of all the sources are queued once, in the order they will be consumed, and at most
+    `max_pending_files` of them are loading or waiting to be consumed at a time (default : twice the
+    number of workers), which bounds the memory taken by the files loaded ahead.
+    Threads are used as the csv parsers (C and pyarrow engines) release the GIL while parsing,
+    and the loaded DataFrames don't have to be copied back from other processes.
+    """
+
+    workers: int = 1
+    csv_engine: Optional[str] = None
+    max_pending_files: int = 0
+    # Created when entering the context
+    executor: ThreadPoolExecutor = field(init=False)
+    queued_paths: Deque = field(default_factory=deque, init=False)
+    pending_files: Dict[str, Future] = field(default_factory=dict, init=False)
+
+    def __enter__(self) -> "ParallelFilesLoader":
+        self.executor = ThreadPoolExecutor(max_workers=max(self.workers, 1))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def queue_files(self, paths: List) -> None:
+        self.queued_paths.extend(paths)
+        self.submit_queued_files()
+
+    def submit_queued_files(self) -> None:
+        max_pending_files = self.max_pending_files or 2 * max(self.workers, 1)
+
+        while self.queued_paths and len(self.pending_files) < max_pending_files:
+            path = self.queued_paths.popleft()
+            self.pending_files[path] = self.executor.submit(
+                load_df_from_file, path, self.csv_engine
             )
 
+    def load_file(self, path: str) -> pd.DataFrame:
+        """
+        Returns the DataFrame of the file, loaded ahead if it was queued, otherwise loaded now.
+        """
+        future = self.pending_files.pop(path, None)
+
+        if future is None:
+            if path in self.queued_paths:
+                self.queued_paths.remove(path)
+            future = self.executor.submit(load_df_from_file, path, self.csv_engine)
+
+        # Keep the workers busy with the next files while waiting for this one
+        self.submit_queued_files()
+        return future.result()
+
+
+def load_input_data(
+    paths: List,
+    source_column: Optional[str] = None,
+    load_file: Callable[[str], pd.DataFrame] = load_df_from_file,
+) -> pd.DataFrame:
+    """
+    Loads and merges the data of all the files. If `source_column` is given, it is filled with
+    the path of the file each row comes from.
+    The files are loaded by `load_file`, e.g. the `load_file` of a `ParallelFilesLoader` to load them in parallel.
+    """
+    list_dfs = []
+
+    for path in paths:
+        df = load_file(path)
+
+        if source_column is not None:
+            df[source_column] = path
+
         list_dfs.append(df)
 
     df = T.merge_dataframes(list_dfs)
 
     logging.info(f"[Loading] - Successfully loaded and merged dataframes from {paths}.")
     return df
+
+
+def is_drug_synonyms_file(path: str) -> bool:
+    return os.path.splitext(os.path.basename(path))[0] == DRUG_SYNONYMS_FILE_NAME
+
+
+def load_drugs_input_data(
+    paths: List, load_file: Callable[[str], pd.DataFrame] = load_df_from_file
+) -> pd.DataFrame:
+    """
+    Loads the drugs of the files of the drugs folder. If one of them is a drug synonyms file,
+    the synonyms of each drug are added as a list, in the "synonyms" column.
+    """
+    drug_synonyms_paths = [path for path in paths if is_drug_synonyms_file(path)]
+    drugs_df = load_input_data(
+        [path for path in paths if path not in drug_synonyms_paths],
+        load_file=load_file,
+    )
+
+    if not drug_synonyms_paths:
+        return drugs_df
+
+    synonyms_df = load_input_data(drug_synonyms_paths, load_file=load_file).dropna(
+        subset=["synonym"]
+    )
+    synonyms_by_drug_id = synonyms_df.groupby(
+        synonyms_df["atccode"].astype(str), sort=False
+    )["synonym"].agg(list)
+
+    drug_ids = drugs_df["atccode"].astype(str)
+    drugs_df["synonyms"] = [
+        synonyms_by_drug_id.get(drug_id, []) for drug_id in drug_ids
+    ]
+
+    nb_unknown_drugs = (~synonyms_by_drug_id.index.isin(drug_ids)).sum()
+    if nb_unknown_drugs > 0:
+        logging.warning(
+            f"[Loading] - Ignored the synonyms of {nb_unknown_drugs} drugs missing from the drugs files."
+        )
+
+    return drugs_df
+
+
+def iter_df_chunks_from_file(filepath: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Yields the rows of a file by chunks of at most `chunksize` rows.
+    Csv and line-delimited json files are read lazily, json arrays can't be read partially
+    so they are loaded entirely and then split.
+    """
+    if filepath.endswith(".csv"):
+        with pd.read_csv(filepath, chunksize=chunksize) as reader:
+            yield from reader
+
+    elif filepath.endswith(JSON_LINES_EXTENSIONS):
+        with pd.read_json(filepath, lines=True, chunksize=chunksize) as reader:
+            yield from reader
+
+    else:
+        df = load_input_data([filepath])
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start : start + chunksize]
+
+
+def iter_input_data_chunks(paths: List, chunksize: int) -> Iterator[pd.DataFrame]:
+    for path in paths:
+        yield from iter_df_chunks_from_file(path, chunksize)
+
+        logging.info(f"[Loading] - Successfully loaded {path} by chunks.")
+
+
+def load_articles_mentioning_drugs(
+    paths: List, chunksize: int, drug_matcher: DrugMatcher
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Loads the articles chunk by chunk and only keeps the ones mentioning a drug, as the others can't
+    appear in the graph. Memory is bounded by one chunk plus the articles kept so far, which are
+    needed to merge duplicates across chunks.
+    Also returns the highest numeric ID of all the articles, the ones filtered out included, so that
+    the IDs given to the articles missing one can't be the ID of another article.
+    """
+    list_dfs = []
+    max_article_id = 0
+
+    for chunk_df in iter_input_data_chunks(paths, chunksize):
+        if "id" in chunk_df.columns:
+            chunk_ids = pd.to_numeric(chunk_df["id"], errors="coerce")
+            if chunk_ids.notna().any():
+                max_article_id = max(max_article_id, int(chunk_ids.max()))
+
+        chunk_df = C.rename_column(chunk_df, {"scientific_title": "title"})
+        list_dfs.append(T.filter_articles_mentioning_drugs(chunk_df, drug_matcher))
+
+    df = T.merge_dataframes(list_dfs)
+
+    logging.info(f"[Loading] - Kept {len(df)} articles mentioning drugs from {paths}.")
+    return df, max_article_id
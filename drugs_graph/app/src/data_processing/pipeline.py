@@ -0,0 +1,819 @@
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import app.src.ad_hoc.graph_index as G
+import app.src.data_processing.cache as K
+import app.src.data_processing.duckdb_engine as D
+import app.src.data_processing.incremental as N
+import app.src.data_processing.load as L
+import app.src.data_processing.preprocess as C
+import app.src.data_processing.shards as S
+import app.src.data_processing.transform as T
+import app.src.files_processing.files_processing as U
+import app.src.monitoring.profiling as M
+import pandas as pd
+from app.src.graph_link.drug_matcher import DrugMatcher
+from app.src.graph_link.title_index import (
+    TitleIndex,
+    get_drugs_names,
+    get_title_index_path,
+    is_title_index_up_to_date,
+)
+
+INPUT_FILE_TYPES = ["csv", "json", "jsonl", "ndjson"]
+COLUMNAR_OUTPUT_FORMATS = ["parquet", "arrow"]
+
+# Stages of the graph generation, the cloud logger is given by the entry point
+profiler = M.StageProfiler()
+
+
+def clean_drugs_dataframe(
+    drugs_df: pd.DataFrame, cleaned_values: Optional[Dict] = None
+) -> pd.DataFrame:
+    drugs_df = C.rename_column(drugs_df, {"drug": "name"})
+
+    # Clean the names, and the synonyms matched as their drug
+    return C.clean_drug_names(drugs_df, cleaned_values)
+
+
+def clean_clinical_trials_dataframe(
+    clinical_df: pd.DataFrame, cleaned_values: Optional[Dict] = None
+) -> pd.DataFrame:
+    # Standardize column names
+    clinical_df = C.rename_column(clinical_df, {"scientific_title": "title"})
+
+    # Standardize the Date format (into datetime64, formatted as %Y-%m-%d in the output)
+    clinical_df = C.normalize_dates_format_cached(clinical_df, "date")
+
+    # Merge duplicate rows together, filling in missing columns based on other rows
+    with profiler.stage("dedup_clinical_trials", rows_in=len(clinical_df)) as stage:
+        clinical_df = T.merge_duplicate_rows(clinical_df, ["title", "date"])
+        stage["rows_out"] = len(clinical_df)
+
+    # Clean titles and names, each distinct value once. The titles are nearly all distinct,
+    # so unlike the journals they are not kept with the values already cleaned
+    clinical_df["title"] = C.clean_distinct_titles_column(clinical_df["title"])
+    clinical_df["journal"] = C.clean_distinct_titles_column(
+        clinical_df["journal"], cleaned_values
+    )
+
+    # Standardize the type of IDs used (string)
+    return C.cast_id_as_string(clinical_df, "id")
+
+
+def clean_pubmed_dataframe(
+    pubmed_df: pd.DataFrame,
+    known_max_id: int = 0,
+    cleaned_values: Optional[Dict] = None,
+) -> pd.DataFrame:
+    # Standardize the Date format (into datetime64, formatted as %Y-%m-%d in the output)
+    pubmed_df = C.normalize_dates_format_cached(pubmed_df, "date")
+
+    # Merge duplicate rows together, filling in missing columns based on other rows
+    with profiler.stage("dedup_pubmed", rows_in=len(pubmed_df)) as stage:
+        pubmed_df = T.merge_duplicate_rows(pubmed_df, ["title", "date"])
+        stage["rows_out"] = len(pubmed_df)
+
+    # Fill in missing IDs
+    pubmed_df = C.fill_in_missing_ids_int(pubmed_df, "id", known_max_id)
+
+    # Clean titles and names, each distinct value once. The titles are nearly all distinct,
+    # so unlike the journals they are not kept with the values already cleaned
+    pubmed_df["title"] = C.clean_distinct_titles_column(pubmed_df["title"])
+    pubmed_df["journal"] = C.clean_distinct_titles_column(
+        pubmed_df["journal"], cleaned_values
+    )
+
+    # Standardize the type of IDs used (string)
+    return C.cast_id_as_string(pubmed_df, "id")
+
+
+def clean_dataframes(
+    clinical_df: pd.DataFrame,
+    pubmed_df: pd.DataFrame,
+    drugs_df: pd.DataFrame,
+    known_max_id: int = 0,
+    cleaned_values: Optional[Dict] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    This function is simply used to orchestrate the cleaning of each input dataframe.
+    Check the docstring of each function or the in-line comments for more details.
+    """
+    # The values cleaned for a source are reused by the next ones
+    if cleaned_values is None:
+        cleaned_values = {}
+
+    with profiler.stage("clean_clinical_trials", rows_in=len(clinical_df)) as stage:
+        clinical_df = clean_clinical_trials_dataframe(clinical_df, cleaned_values)
+        stage["rows_out"] = len(clinical_df)
+    logging.info("[Cleaning] - Successfully cleaned the clinical trials.")
+
+    with profiler.stage("clean_pubmed", rows_in=len(pubmed_df)) as stage:
+        pubmed_df = clean_pubmed_dataframe(pubmed_df, known_max_id, cleaned_values)
+        stage["rows_out"] = len(pubmed_df)
+    logging.info("[Cleaning] - Successfully cleaned the pubmed articles.")
+
+    with profiler.stage("clean_drugs", rows_in=len(drugs_df)) as stage:
+        drugs_df = clean_drugs_dataframe(drugs_df, cleaned_values)
+        stage["rows_out"] = len(drugs_df)
+    logging.info("[Cleaning] - Successfully cleaned the drugs.")
+
+    return clinical_df, pubmed_df, drugs_df
+
+
+def prepare_articles_and_drugs(
+    clinical_df: pd.DataFrame,
+    pubmed_df: pd.DataFrame,
+    drugs_df: pd.DataFrame,
+    known_max_id: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Cleans the loaded dataframes, then merges all the articles into one dataframe indexed by ID.
+    """
+    return merge_cleaned_articles_and_drugs(
+        *clean_dataframes(clinical_df, pubmed_df, drugs_df, known_max_id)
+    )
+
+
+def load_and_clean_input_data(
+    source: str,
+    load_input_data: Callable[[], pd.DataFrame],
+    clean_input_data: Callable[[pd.DataFrame], pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Loads then cleans the data of one source, profiling both stages.
+    """
+    with profiler.stage(f"load_{source}") as stage:
+        df = load_input_data()
+        stage["rows_out"] = len(df)
+
+    with profiler.stage(f"clean_{source}", rows_in=len(df)) as stage:
+        df = clean_input_data(df)
+        stage["rows_out"] = len(df)
+
+    return df
+
+
+def load_and_clean_pubmed_mentioning_drugs(
+    pubmed_path: List,
+    chunksize: int,
+    drug_matcher: DrugMatcher,
+    cleaned_values: Optional[Dict] = None,
+) -> pd.DataFrame:
+    """
+    Loads by chunks then cleans the pubmed articles mentioning drugs. The IDs given to the articles
+    missing one come after the highest ID of all the loaded articles, the filtered out ones included.
+    """
+    max_article_id = 0
+
+    def load_pubmed_df() -> pd.DataFrame:
+        nonlocal max_article_id
+        pubmed_df, max_article_id = L.load_articles_mentioning_drugs(
+            pubmed_path, chunksize, drug_matcher
+        )
+        return pubmed_df
+
+    return load_and_clean_input_data(
+        "pubmed",
+        load_pubmed_df,
+        lambda pubmed_df: clean_pubmed_dataframe(
+            pubmed_df, max_article_id, cleaned_values
+        ),
+    )
+
+
+def merge_cleaned_articles_and_drugs(
+    clinical_df_cleaned: pd.DataFrame,
+    pubmed_df_cleaned: pd.DataFrame,
+    drugs_df_cleaned: pd.DataFrame,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Enrich the dataframes with the types of articles, before merging
+    pubmed_df_cleaned["article_type"] = "PubMed"
+    clinical_df_cleaned["article_type"] = "ClinicalTrial"
+
+    # Merge the articles dataframes into one
+    all_articles_df = T.merge_dataframes([pubmed_df_cleaned, clinical_df_cleaned])
+    logging.info(
+        "[Transform] - Successfully merged the pubmed and clinical trials dataframes."
+    )
+
+    # Remove empty strings
+    all_articles_df_cleaned = C.drop_empty_titles_and_journals(all_articles_df)
+    logging.info("[Cleaning] - Successfully droped rows with empty titles and names.")
+
+    # Drop duplicate IDs and index dataframes
+    drugs_df_cleaned, all_articles_df_cleaned = C.drop_duplicate_ids_then_index(
+        drugs_df_cleaned, all_articles_df_cleaned
+    )
+    logging.info("[Cleaning] - Successfully droped rows with duplicate IDs.")
+
+    # Journals and article types are repeated over all the articles, and stored once each
+    all_articles_df_cleaned = C.intern_columns_as_categories(
+        all_articles_df_cleaned, T.INTERNED_ARTICLE_COLUMNS
+    )
+
+    return all_articles_df_cleaned, drugs_df_cleaned
+
+
+def list_input_files(data_path: str) -> Tuple[List[str], List[str], List[str]]:
+    clinical_trials_path = U.list_files_in_folder(
+        f"{data_path}/clinical_trials", file_types=INPUT_FILE_TYPES
+    )
+    pubmed_path = U.list_files_in_folder(
+        f"{data_path}/pubmed", file_types=INPUT_FILE_TYPES
+    )
+    drugs_path = U.list_files_in_folder(
+        f"{data_path}/drugs", file_types=INPUT_FILE_TYPES
+    )
+
+    return clinical_trials_path, pubmed_path, drugs_path
+
+
+def load_cleaned_input_data(
+    clinical_trials_path: List,
+    pubmed_path: List,
+    drugs_path: List,
+    dataframes_cache: K.CleanedDataFramesCache,
+    files_loader: L.ParallelFilesLoader,
+    chunksize: int = 0,
+    cleaned_values: Optional[Dict] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Loads and cleans the drugs, clinical trials and pubmed articles, reusing the cached dataframes.
+    The files of all the sources to build are queued at once, so they are loaded in parallel,
+    ahead of the cleaning of the previous sources.
+    The journals and drug names are cleaned with the values already cleaned, if any.
+    """
+    if cleaned_values is None:
+        cleaned_values = {}
+
+    sources_to_load = [("drugs", drugs_path)]
+    if chunksize <= 0:
+        # The chunked articles are streamed while loading, so they are not loaded ahead
+        sources_to_load += [
+            ("clinical_trials", clinical_trials_path),
+            ("pubmed", pubmed_path),
+        ]
+    for source, source_paths in sources_to_load:
+        if not dataframes_cache.is_cached(source, source_paths):
+            files_loader.queue_files(source_paths)
+
+    drugs_df_cleaned = dataframes_cache.get_or_build(
+        "drugs",
+        drugs_path,
+        lambda: load_and_clean_input_data(
+            "drugs",
+            lambda: L.load_drugs_input_data(
+                drugs_path, load_file=files_loader.load_file
+            ),
+            lambda drugs_df: clean_drugs_dataframe(drugs_df, cleaned_values),
+        ),
+    )
+
+    if chunksize > 0:
+        # Only the articles mentioning drugs are kept, so they also depend on the drugs
+        drug_matcher = DrugMatcher(
+            drugs_dataFrame=drugs_df_cleaned.set_index("atccode")
+        )
+        clinical_df_cleaned = dataframes_cache.get_or_build(
+            "clinical_trials",
+            clinical_trials_path + drugs_path,
+            lambda: load_and_clean_input_data(
+                "clinical_trials",
+                lambda: L.load_articles_mentioning_drugs(
+                    clinical_trials_path, chunksize, drug_matcher
+                )[0],
+                lambda clinical_df: clean_clinical_trials_dataframe(
+                    clinical_df, cleaned_values
+                ),
+            ),
+            parameters={"chunksize": chunksize},
+        )
+        pubmed_df_cleaned = dataframes_cache.get_or_build(
+            "pubmed",
+            pubmed_path + drugs_path,
+            lambda: load_and_clean_pubmed_mentioning_drugs(
+                pubmed_path, chunksize, drug_matcher, cleaned_values
+            ),
+            parameters={"chunksize": chunksize},
+        )
+    else:
+        clinical_df_cleaned = dataframes_cache.get_or_build(
+            "clinical_trials",
+            clinical_trials_path,
+            lambda: load_and_clean_input_data(
+                "clinical_trials",
+                lambda: L.load_input_data(
+                    clinical_trials_path, load_file=files_loader.load_file
+                ),
+                lambda clinical_df: clean_clinical_trials_dataframe(
+                    clinical_df, cleaned_values
+                ),
+            ),
+        )
+        pubmed_df_cleaned = dataframes_cache.get_or_build(
+            "pubmed",
+            pubmed_path,
+            lambda: load_and_clean_input_data(
+                "pubmed",
+                lambda: L.load_input_data(
+                    pubmed_path, load_file=files_loader.load_file
+                ),
+                lambda pubmed_df: clean_pubmed_dataframe(
+                    pubmed_df, cleaned_values=cleaned_values
+                ),
+            ),
+        )
+
+    return clinical_df_cleaned, pubmed_df_cleaned, drugs_df_cleaned
+
+
+def generate_graph(
+    data_path: str,
+    output_path: str,
+    graph_builder: str = "vectorized",
+    compact_output: bool = False,
+    chunksize: int = 0,
+    workers: int = 1,
+    output_format: str = "json",
+    cache_path: Optional[str] = None,
+    load_workers: int = 1,
+    csv_engine: Optional[str] = None,
+    title_index: bool = False,
+    engine: str = "pandas",
+) -> None:
+    if engine == "duckdb":
+        if chunksize > 0 or cache_path or title_index:
+            raise ValueError(
+                "The duckdb engine reads all the articles, and can't be used with chunksize, the cache or the title index."
+            )
+        return generate_graph_duckdb(
+            data_path, output_path, compact_output, output_format
+        )
+
+    if title_index and (chunksize > 0 or output_format != "json"):
+        raise ValueError(
+            "The title index needs all the articles and the json graph : it can't be built with chunksize or a columnar output format."
+        )
+
+    # Define the paths to the data
+    clinical_trials_path, pubmed_path, drugs_path = list_input_files(data_path)
+
+    # Load and clean the data, reusing the cleaned dataframes of unchanged input files,
+    # and the values cleaned by the previous runs for the other ones
+    dataframes_cache = K.CleanedDataFramesCache(cache_path)
+    normalization_cache = K.NormalizationCache(cache_path)
+    normalization_cache.load()
+
+    with L.ParallelFilesLoader(
+        workers=load_workers, csv_engine=csv_engine
+    ) as files_loader:
+        clinical_df_cleaned, pubmed_df_cleaned, drugs_df_cleaned = (
+            load_cleaned_input_data(
+                clinical_trials_path,
+                pubmed_path,
+                drugs_path,
+                dataframes_cache,
+                files_loader,
+                chunksize,
+                normalization_cache.cleaned_values,
+            )
+        )
+    normalization_cache.save()
+
+    with profiler.stage(
+        "merge_articles", rows_in=len(clinical_df_cleaned) + len(pubmed_df_cleaned)
+    ) as stage:
+        all_articles_df_cleaned, drugs_df_cleaned = merge_cleaned_articles_and_drugs(
+            clinical_df_cleaned, pubmed_df_cleaned, drugs_df_cleaned
+        )
+        stage["rows_out"] = len(all_articles_df_cleaned)
+
+    if output_format in COLUMNAR_OUTPUT_FORMATS:
+        with profiler.stage(
+            "extract_mentions", rows_in=len(all_articles_df_cleaned)
+        ) as stage:
+            mentions_df = T.extract_mentions_from_df(
+                all_articles_df_cleaned, drugs_df_cleaned
+            )
+            stage["rows_out"] = len(mentions_df)
+
+        write_edge_table(output_path, mentions_df, output_format)
+        return
+
+    # Finally, generate the graph as json file, streaming one journal at a time
+    if workers > 1:
+        output_journals = T.iter_link_graph_journals_parallel(
+            all_articles_df_cleaned, drugs_df_cleaned, graph_builder, workers
+        )
+    elif graph_builder == "vectorized":
+        output_journals = T.iter_link_graph_journals_vectorized(
+            all_articles_df_cleaned, drugs_df_cleaned
+        )
+    else:
+        output_journals = T.iter_link_graph_journals_from_df(
+            all_articles_df_cleaned, drugs_df_cleaned
+        )
+
+    # The journals are built while they are written, so both are profiled together
+    with profiler.stage("build_graph", rows_in=len(all_articles_df_cleaned)) as stage:
+        stage["rows_out"] = write_graph_and_index(
+            output_path, output_journals, compact_output
+        )
+    logging.info(f"[Transform] - Link graph successfully written to {output_path}.")
+
+    # Written after the graph, as it is only used as long as it is not older than the graph
+    if title_index:
+        with profiler.stage(
+            "write_title_index", rows_in=len(all_articles_df_cleaned)
+        ) as stage:
+            title_index_builder = TitleIndex.from_dataframes(
+                all_articles_df_cleaned, drugs_df_cleaned
+            )
+            U.write_dict_to_file(
+                get_title_index_path(output_path),
+                title_index_builder.to_dict(),
+                indent=None,
+            )
+            stage["rows_out"] = len(title_index_builder.tokens)
+        logging.info(
+            f"[Transform] - Title index successfully written to {get_title_index_path(output_path)}."
+        )
+
+
+def load_cleaned_drugs(drugs_path: List) -> pd.DataFrame:
+    """
+    Loads and cleans the drugs alone, indexed by ID like `merge_cleaned_articles_and_drugs` does.
+    """
+    with profiler.stage("clean_drugs") as stage:
+        drugs_df_cleaned = clean_drugs_dataframe(L.load_drugs_input_data(drugs_path))
+        drugs_df_cleaned = drugs_df_cleaned.drop_duplicates(
+            subset=["atccode"], keep="first", ignore_index=True
+        ).set_index("atccode")
+        stage["rows_out"] = len(drugs_df_cleaned)
+
+    return drugs_df_cleaned
+
+
+def generate_graph_duckdb(
+    data_path: str,
+    output_path: str,
+    compact_output: bool = False,
+    output_format: str = "json",
+) -> None:
+    """
+    Generates the same graph with an in-process DuckDB : the article files are scanned by DuckDB, then
+    cleaned and joined to the drug names in SQL, multi-threaded. The cleaned articles and the mentions are then
+    loaded in memory to build the graph, and the drugs are cleaned like in the pandas engine.
+    """
+    duckdb = D.import_duckdb()
+    clinical_trials_path, pubmed_path, drugs_path = list_input_files(data_path)
+
+    drugs_df_cleaned = load_cleaned_drugs(drugs_path)
+
+    with duckdb.connect() as connection:
+        with profiler.stage("clean_articles") as stage:
+            all_articles_df_cleaned = D.clean_articles(
+                connection, clinical_trials_path, pubmed_path
+            )
+            stage["rows_out"] = len(all_articles_df_cleaned)
+        logging.info("[DuckDB] - Successfully cleaned and merged the articles.")
+
+        with profiler.stage(
+            "extract_mentions", rows_in=len(all_articles_df_cleaned)
+        ) as stage:
+            mentions_df = D.extract_mentions(
+                connection, all_articles_df_cleaned, drugs_df_cleaned
+            )
+            stage["rows_out"] = len(mentions_df)
+
+    if output_format in COLUMNAR_OUTPUT_FORMATS:
+        write_edge_table(output_path, mentions_df, output_format)
+        return
+
+    with profiler.stage("build_graph", rows_in=len(all_articles_df_cleaned)) as stage:
+        stage["rows_out"] = write_graph_and_index(
+            output_path,
+            T.iter_link_graph_journals_from_mentions(
+                all_articles_df_cleaned["journal"].unique(), mentions_df
+            ),
+            compact_output,
+        )
+    logging.info(f"[Transform] - Link graph successfully written to {output_path}.")
+
+
+def update_graph_drugs(
+    data_path: str, output_path: str, compact_output: bool = False
+) -> None:
+    """
+    Patches the graph after a change of the drugs, without matching all the titles again :
+    only the names of the added drugs are looked up in the title index written by `generate_graph`,
+    and only the journals whose mentions changed are rebuilt. The graph is read one journal at a time.
+    """
+    title_index_path = get_title_index_path(output_path)
+    if not is_title_index_up_to_date(output_path):
+        raise FileNotFoundError(
+            f"No up to date title index found for {output_path}, generate the graph with the title index first."
+        )
+
+    _, _, drugs_path = list_input_files(data_path)
+    drugs_df_cleaned = load_cleaned_drugs(drugs_path)
+
+    with profiler.stage("load_title_index") as stage:
+        title_index_builder = TitleIndex.from_dict(
+            U.import_json_file_as_dict(title_index_path)
+        )
+        stage["rows_out"] = len(title_index_builder.tokens)
+
+    new_drugs = get_drugs_names(drugs_df_cleaned)
+    added_drug_ids, removed_drug_ids = title_index_builder.get_drugs_changes(new_drugs)
+    logging.info(
+        f"[Transform] - {len(added_drug_ids)} drugs added and {len(removed_drug_ids)} drugs removed since the graph was generated."
+    )
+
+    # The journals are streamed from the graph to a patched copy, which then replaces it with its index
+    output_root, output_extension = os.path.splitext(output_path)
+    patched_output_path = f"{output_root}.patched{output_extension}"
+    with profiler.stage("patch_graph") as stage:
+        journals = U.iter_json_file_array(output_path, "journals")
+        stage["rows_out"] = write_graph_and_index(
+            patched_output_path,
+            title_index_builder.patch_journals(journals, new_drugs),
+            compact_output,
+        )
+        os.replace(patched_output_path, output_path)
+        os.replace(G.get_index_path(patched_output_path), G.get_index_path(output_path))
+        U.write_dict_to_file(
+            title_index_path, title_index_builder.to_dict(), indent=None
+        )
+    logging.info(f"[Transform] - Link graph successfully patched in {output_path}.")
+
+
+def save_article_files_results(
+    clinical_trials_path: List,
+    pubmed_path: List,
+    drugs_path: List,
+    state_path: str,
+    known_max_id: int = 0,
+    load_workers: int = 1,
+    csv_engine: Optional[str] = None,
+    renumber_generated_ids: bool = False,
+) -> None:
+    """
+    Processes the article files together, then persists the journals and drug mentions of each file
+    in the state folder, to be merged with the results of other files by the incremental and shard modes.
+    With `renumber_generated_ids`, the IDs given to the pubmed articles missing one are recorded,
+    so they are renumbered when the files are merged.
+    """
+    # Load Data, keeping track of the file of each article
+    with profiler.stage("load_articles") as stage, L.ParallelFilesLoader(
+        workers=load_workers, csv_engine=csv_engine
+    ) as files_loader:
+        list_paths_to_process = [clinical_trials_path, pubmed_path]
+        for paths_to_process in list_paths_to_process + [drugs_path]:
+            files_loader.queue_files(paths_to_process)
+
+        empty_articles_df = pd.DataFrame(columns=["id", "title", "date", "journal"])
+        clinical_df, pubmed_df = [
+            (
+                L.load_input_data(
+                    paths_to_process,
+                    source_column="source_file",
+                    load_file=files_loader.load_file,
+                )
+                if paths_to_process
+                else empty_articles_df.assign(source_file=None)
+            )
+            for paths_to_process in list_paths_to_process
+        ]
+        drugs_df = L.load_drugs_input_data(drugs_path, load_file=files_loader.load_file)
+        stage["rows_out"] = len(clinical_df) + len(pubmed_df)
+
+    # The generated IDs are the ones above all the loaded IDs
+    if renumber_generated_ids:
+        loaded_ids = pd.to_numeric(pubmed_df["id"], errors="coerce")
+        if loaded_ids.notna().any():
+            known_max_id = max(known_max_id, int(loaded_ids.max()))
+
+    all_articles_df_cleaned, drugs_df_cleaned = prepare_articles_and_drugs(
+        clinical_df, pubmed_df, drugs_df, known_max_id
+    )
+
+    with profiler.stage(
+        "extract_mentions", rows_in=len(all_articles_df_cleaned)
+    ) as stage:
+        mentions_df = T.extract_mentions_from_df(
+            all_articles_df_cleaned, drugs_df_cleaned
+        )
+        stage["rows_out"] = len(mentions_df)
+    mentions_df["source_file"] = all_articles_df_cleaned["source_file"].to_numpy()[
+        mentions_df["article_position"]
+    ]
+
+    generated_id_condition = (all_articles_df_cleaned["article_type"] == "PubMed") & (
+        pd.to_numeric(all_articles_df_cleaned.index.to_series(), errors="coerce")
+        > known_max_id
+    )
+
+    for filepath in pubmed_path + clinical_trials_path:
+        file_condition = all_articles_df_cleaned["source_file"] == filepath
+        N.save_file_results(
+            state_path,
+            filepath,
+            all_articles_df_cleaned[file_condition],
+            mentions_df[mentions_df["source_file"] == filepath],
+            generated_article_ids=(
+                all_articles_df_cleaned.index[
+                    file_condition & generated_id_condition
+                ].tolist()
+                if renumber_generated_ids
+                else None
+            ),
+        )
+
+
+def generate_graph_incremental(
+    data_path: str,
+    output_path: str,
+    state_path: str,
+    compact_output: bool = False,
+    output_format: str = "json",
+    load_workers: int = 1,
+    csv_engine: Optional[str] = None,
+) -> None:
+    """
+    Only processes the article files that are new or changed since the previous run (all of them
+    if the drugs changed), then merges their mentions with the ones persisted for the other files.
+    Duplicate articles are only merged within the processed files.
+    """
+    clinical_trials_path, pubmed_path, drugs_path = list_input_files(data_path)
+
+    previous_manifest = N.load_manifest(state_path)
+    current_manifest = {
+        "drugs": U.compute_files_fingerprints(drugs_path),
+        "pubmed": U.compute_files_fingerprints(pubmed_path),
+        "clinical_trials": U.compute_files_fingerprints(clinical_trials_path),
+    }
+
+    files_to_process = N.get_files_to_process(previous_manifest, current_manifest)
+    N.delete_file_results(
+        state_path, N.get_removed_files(previous_manifest, current_manifest)
+    )
+    logging.info(f"[Incremental] - {len(files_to_process)} article files to process.")
+
+    if files_to_process:
+        unchanged_files = [
+            path
+            for path in pubmed_path + clinical_trials_path
+            if path not in files_to_process
+        ]
+        save_article_files_results(
+            [path for path in clinical_trials_path if path in files_to_process],
+            [path for path in pubmed_path if path in files_to_process],
+            drugs_path,
+            state_path,
+            known_max_id=N.get_known_max_article_id(state_path, unchanged_files),
+            load_workers=load_workers,
+            csv_engine=csv_engine,
+            renumber_generated_ids=True,
+        )
+
+    N.save_manifest(state_path, current_manifest)
+
+    write_graph_from_file_results(
+        state_path,
+        pubmed_path + clinical_trials_path,
+        output_path,
+        compact_output,
+        output_format,
+    )
+
+
+def generate_graph_shard(
+    data_path: str,
+    shards_path: str,
+    shard: int,
+    nb_shards: int,
+    load_workers: int = 1,
+    csv_engine: Optional[str] = None,
+) -> None:
+    """
+    Processes the article files assigned to one shard, with all the drugs, and persists their
+    journals and drug mentions in the shards folder. The shards are independent processes,
+    combined into the graph by `merge_graph_shards`.
+    Duplicate articles are only merged within a shard, like within the processed files of the incremental mode.
+    """
+    clinical_trials_path, pubmed_path, drugs_path = list_input_files(data_path)
+    files_by_source = {
+        "pubmed": S.get_files_of_shard(data_path, pubmed_path, shard, nb_shards),
+        "clinical_trials": S.get_files_of_shard(
+            data_path, clinical_trials_path, shard, nb_shards
+        ),
+    }
+    logging.info(
+        f"[Shards] - {len(files_by_source['pubmed']) + len(files_by_source['clinical_trials'])} article files in the shard {shard}/{nb_shards}."
+    )
+
+    if files_by_source["pubmed"] or files_by_source["clinical_trials"]:
+        save_article_files_results(
+            files_by_source["clinical_trials"],
+            files_by_source["pubmed"],
+            drugs_path,
+            shards_path,
+            load_workers=load_workers,
+            csv_engine=csv_engine,
+            renumber_generated_ids=True,
+        )
+
+    S.save_shard_manifest(
+        shards_path,
+        shard,
+        nb_shards,
+        files_by_source,
+        U.compute_files_fingerprints(drugs_path),
+    )
+    logging.info(f"[Shards] - Shard {shard}/{nb_shards} written to {shards_path}.")
+
+
+def merge_graph_shards(
+    shards_path: str,
+    output_path: str,
+    compact_output: bool = False,
+    output_format: str = "json",
+) -> None:
+    pubmed_path, clinical_trials_path = S.load_shards_files(shards_path)
+
+    write_graph_from_file_results(
+        shards_path,
+        pubmed_path + clinical_trials_path,
+        output_path,
+        compact_output,
+        output_format,
+    )
+
+
+def write_graph_from_file_results(
+    state_path: str,
+    article_filepaths: List,
+    output_path: str,
+    compact_output: bool = False,
+    output_format: str = "json",
+) -> None:
+    """
+    Merges the persisted results of the article files into the graph, or the edge table of the columnar formats.
+    """
+    if output_format in COLUMNAR_OUTPUT_FORMATS:
+        _, mentions_df = N.merge_file_results(state_path, article_filepaths)
+        write_edge_table(output_path, mentions_df, output_format)
+        return
+
+    with profiler.stage("build_graph") as stage:
+        output_journals = N.iter_link_graph_journals_from_file_results(
+            state_path, article_filepaths
+        )
+        stage["rows_out"] = write_graph_and_index(
+            output_path, output_journals, compact_output
+        )
+    logging.info(f"[Transform] - Link graph successfully written to {output_path}.")
+
+
+def write_edge_table(
+    output_path: str, mentions_df: pd.DataFrame, output_format: str
+) -> None:
+    """
+    Writes the drug mentions as a flat table of edges, partitioned by year of mention.
+    """
+    dataset_path = U.get_dataset_path(output_path)
+    with profiler.stage("write_edge_table", rows_in=len(mentions_df)) as stage:
+        edge_table = T.build_edge_table_from_mentions(mentions_df)
+        U.write_table_to_dataset(
+            dataset_path,
+            edge_table,
+            output_format,
+            partition_column=T.EDGE_TABLE_PARTITION_COLUMN,
+        )
+        stage["rows_out"] = len(edge_table)
+    logging.info(
+        f"[Transform] - {len(mentions_df)} drug mentions successfully written to {dataset_path} ({output_format})."
+    )
+
+
+def write_graph_and_index(
+    output_path: str, output_journals: Iterable[Dict], compact_output: bool = False
+) -> int:
+    """
+    Streams the journals to the output file, and writes the index of the graph alongside it.
+    Returns the number of journals written.
+    """
+    graph_index_builder = G.GraphIndexBuilder()
+    U.write_journals_to_file(
+        output_path,
+        graph_index_builder.index_journals(output_journals),
+        compact=compact_output,
+    )
+    U.write_dict_to_file(
+        G.get_index_path(output_path), graph_index_builder.to_dict(), indent=None
+    )
+
+    return len(graph_index_builder.journals)
@@ -2,11 +2,26 @@
 # Built-in packages
 import re
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+# Patterns used to clean the titles, compiled once
+ENCODING_ISSUES_PATTERN = re.compile(r"\\x[0-9a-fA-F]{2}")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s&ÀàÀ-ÿ-]")
+WHITESPACES_PATTERN = re.compile(r"\s+")
+
+# Separates the alternative names of a drug, like "EPINEPHRINE/ADRENALINE", in the drugs and the titles
+NAMES_SEPARATOR = "/"
+
+# Separator used to clean a whole column as one string : it is neither a word nor a space character
+COLUMN_SEPARATOR = "\x00"
+COLUMN_PUNCTUATION_PATTERN = re.compile(r"[^\w\s&ÀàÀ-ÿ\x00-]+")
+
+# Date formats found in the input files, each one is parsed with a vectorized pass
+KNOWN_DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d %B %Y", "%d-%m-%Y"]
+
 
 def normalize_dates_format(
     df: pd.DataFrame, date_column_name: str, output_date_format: str = "%Y-%m-%d"
@@ -21,19 +36,78 @@ def normalize_dates_format(
     return df
 
 
+def normalize_dates_format_cached(
+    df: pd.DataFrame,
+    date_column_name: str,
+    known_date_formats: List = KNOWN_DATE_FORMATS,
+) -> pd.DataFrame:
+    """
+    Faster equivalent of `normalize_dates_format`, keeping the column as datetime64 (day precision)
+    without formatting the dates to strings and parsing them back.
+
+    Each distinct raw date is parsed only once : the known formats are tried one after the other
+    on the distinct values not parsed yet, the remaining ones are inferred like in `normalize_dates_format`,
+    then the parsed dates are broadcast back to the rows.
+    """
+    raw_dates_codes, distinct_raw_dates_index = pd.factorize(df[date_column_name])
+    distinct_raw_dates = pd.Series(distinct_raw_dates_index, dtype=object)
+
+    distinct_dates = pd.Series(
+        pd.NaT, index=distinct_raw_dates.index, dtype="datetime64[ns]"
+    )
+    for date_format in known_date_formats:
+        not_parsed = distinct_dates.isna()
+        if not not_parsed.any():
+            break
+
+        distinct_dates[not_parsed] = pd.to_datetime(
+            distinct_raw_dates[not_parsed], format=date_format, errors="coerce"
+        )
+
+    not_parsed = distinct_dates.isna()
+    if not_parsed.any():
+        distinct_dates[not_parsed] = pd.to_datetime(
+            distinct_raw_dates[not_parsed], dayfirst=True, format="mixed"
+        )
+
+    # Missing raw dates have the code -1, and stay missing
+    dates = distinct_dates.dt.normalize().to_numpy()[raw_dates_codes]
+    df[date_column_name] = np.where(raw_dates_codes >= 0, dates, np.datetime64("NaT"))
+    return df
+
+
 def cast_id_as_string(df: pd.DataFrame, id_column_name: str) -> pd.DataFrame:
     df[id_column_name] = df[id_column_name].astype(str)
     return df
 
 
+def intern_columns_as_categories(df: pd.DataFrame, column_names: List) -> pd.DataFrame:
+    """
+    Stores each distinct value of the repeated string columns (journals, article types, ...) only once,
+    the rows holding small integer codes. Categories are kept in order of first appearance, so that
+    `unique` and the groupbys return the values in the same order as with the original strings.
+    """
+    for column_name in column_names:
+        df[column_name] = pd.Categorical(
+            df[column_name], categories=df[column_name].dropna().unique()
+        )
+    return df
+
+
 def rename_column(df: pd.DataFrame, column_naming_mapping: Dict) -> pd.DataFrame:
     return df.rename(columns=column_naming_mapping)
 
 
-def fill_in_missing_ids_int(df: pd.DataFrame, id_column_name: str) -> pd.DataFrame:
+def fill_in_missing_ids_int(
+    df: pd.DataFrame, id_column_name: str, known_max_id: int = 0
+) -> pd.DataFrame:
+    """
+    Gives new IDs to the rows missing one, after the highest ID of the DataFrame.
+    `known_max_id` is the highest ID already given outside of the DataFrame, if any.
+    """
     df[id_column_name] = pd.to_numeric(df[id_column_name], errors="coerce")
 
-    max_id = int(df[id_column_name].max())
+    max_id = int(np.nanmax([df[id_column_name].max(), known_max_id]))
     number_missing_rows = df[id_column_name].isna().sum()
 
     id_range = range(int(max_id) + 1, int(max_id) + 1 + number_missing_rows)
@@ -46,16 +120,19 @@ def fill_in_missing_ids_int(df: pd.DataFrame, id_column_name: str) -> pd.DataFra
 def clean_titles(current_title: str) -> str:
     if not pd.isna(current_title):
         # Remove encoding issues like \xc3\x28, we are focusing solely on \x followed by 2 characters or digits
-        current_title = re.sub(r"\\x[0-9a-fA-F]{2}", "", current_title)
+        current_title = ENCODING_ISSUES_PATTERN.sub("", current_title)
+
+        # Keep the alternative names separated by a slash as separate words
+        current_title = current_title.replace(NAMES_SEPARATOR, " ")
 
         # Remove punctuations except hyphens "-"
-        current_title = re.sub(r"[^\w\s&ÀàÀ-ÿ-]", "", current_title)
+        current_title = PUNCTUATION_PATTERN.sub("", current_title)
 
         # Convert to title case
         current_title = current_title.title()
 
         # Normalize number of spaces (remove extra spaces)
-        current_title = re.sub(r"\s+", " ", current_title)
+        current_title = WHITESPACES_PATTERN.sub(" ", current_title)
 
         # Remove trailing spaces
         current_title = current_title.strip()
@@ -65,6 +142,116 @@ def clean_titles(current_title: str) -> str:
     return ""  # Will be cleaned in the next steps
 
 
+def clean_titles_column(titles: pd.Series) -> pd.Series:
+    """
+    Column-level version of `clean_titles`, giving the same output as `titles.apply(clean_titles)`.
+    The titles are joined into a single string, so that each precompiled pattern runs once over
+    the whole column instead of once per title.
+    """
+    titles = titles.astype(object).where(titles.notna(), "")
+    joined_titles = COLUMN_SEPARATOR.join(titles) if len(titles) > 0 else None
+
+    # Non-string values or titles containing the separator can't be cleaned as one string
+    if (
+        joined_titles is None
+        or pd.api.types.infer_dtype(titles) != "string"
+        or joined_titles.count(COLUMN_SEPARATOR) != len(titles) - 1
+    ):
+        return titles.apply(clean_titles)
+
+    joined_titles = ENCODING_ISSUES_PATTERN.sub("", joined_titles)
+    joined_titles = joined_titles.replace(NAMES_SEPARATOR, " ")
+    joined_titles = COLUMN_PUNCTUATION_PATTERN.sub("", joined_titles)
+    joined_titles = joined_titles.title()
+
+    # Normalize the number of spaces (same whitespaces as \s), then remove the spaces around each title
+    joined_titles = " ".join(joined_titles.split())
+    joined_titles = joined_titles.replace(
+        f" {COLUMN_SEPARATOR}", COLUMN_SEPARATOR
+    ).replace(f"{COLUMN_SEPARATOR} ", COLUMN_SEPARATOR)
+
+    return pd.Series(
+        joined_titles.split(COLUMN_SEPARATOR), index=titles.index, name=titles.name
+    )
+
+
+def clean_distinct_titles_column(
+    titles: pd.Series, cleaned_values: Optional[Dict] = None
+) -> pd.Series:
+    """
+    Same output as `clean_titles_column`, cleaning each distinct value only once (journals are repeated
+    over many articles) then broadcasting the cleaned values back to the rows by their codes.
+    `cleaned_values` maps the raw values already cleaned to their cleaned value : only the other ones are
+    cleaned, then added to it.
+    """
+    if cleaned_values is None:
+        cleaned_values = {}
+
+    titles_codes, distinct_titles_index = pd.factorize(titles)
+    distinct_titles = pd.Series(distinct_titles_index, dtype=object)
+
+    new_titles = distinct_titles[
+        [title not in cleaned_values for title in distinct_titles]
+    ]
+    cleaned_values.update(zip(new_titles, clean_titles_column(new_titles)))
+
+    # Missing titles have the code -1, which points to the empty string added last
+    distinct_cleaned_titles = np.array(
+        [cleaned_values[title] for title in distinct_titles] + [""], dtype=object
+    )
+    return pd.Series(
+        distinct_cleaned_titles[titles_codes], index=titles.index, name=titles.name
+    )
+
+
+def clean_drug_names(
+    drugs_df: pd.DataFrame, cleaned_values: Optional[Dict] = None
+) -> pd.DataFrame:
+    """
+    Cleans the names of the drugs, and their synonyms (including brand names) stored as a list per drug
+    in the optional "synonyms" column. A name like "EPINEPHRINE/ADRENALINE" is split : the drug keeps
+    the first one as name, the other ones becoming synonyms.
+    Synonyms that are empty or the same as the name of their drug once cleaned are dropped.
+    `cleaned_values` are the values already cleaned, as in `clean_distinct_titles_column`.
+    """
+    names_parts = (
+        drugs_df["name"]
+        .astype(object)
+        .where(drugs_df["name"].notna(), "")
+        .str.split(NAMES_SEPARATOR)
+    )
+    synonyms = names_parts.str[1:].tolist()
+    if "synonyms" in drugs_df.columns:
+        synonyms = [
+            name_synonyms + list(drug_synonyms)
+            for name_synonyms, drug_synonyms in zip(synonyms, drugs_df["synonyms"])
+        ]
+
+    drugs_df["name"] = clean_distinct_titles_column(names_parts.str[0], cleaned_values)
+
+    synonyms_df = pd.DataFrame(
+        {"drug_position": np.arange(len(drugs_df)), "synonym": synonyms}
+    ).explode("synonym", ignore_index=True)
+    synonyms_df = synonyms_df.dropna(subset=["synonym"])
+    synonyms_df["synonym"] = clean_distinct_titles_column(
+        synonyms_df["synonym"], cleaned_values
+    )
+
+    drug_names = drugs_df["name"].to_numpy()[
+        synonyms_df["drug_position"].to_numpy(dtype=int)
+    ]
+    synonyms_df = synonyms_df[
+        (synonyms_df["synonym"] != "") & (synonyms_df["synonym"] != drug_names)
+    ].drop_duplicates()
+
+    synonyms_by_position = synonyms_df.groupby("drug_position")["synonym"].agg(list)
+    drugs_df["synonyms"] = [
+        synonyms_by_position.get(drug_position, [])
+        for drug_position in range(len(drugs_df))
+    ]
+    return drugs_df
+
+
 def drop_empty_titles_and_journals(df: pd.DataFrame) -> pd.DataFrame:
     """
     Drops rows from the input DataFrame where either the 'title' or 'journal' column is empty.
@@ -88,7 +275,7 @@ def drop_empty_titles_and_journals(df: pd.DataFrame) -> pd.DataFrame:
 
 def drop_duplicate_ids_then_index(
     drugs_df: pd.DataFrame, all_articles_df: pd.DataFrame
-) -> List:
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Drop duplicate IDs from the projects' DataFrames, then index them using the ID column.
 
@@ -0,0 +1,108 @@
+import glob
+import hashlib
+import os
+import re
+from typing import Dict, List, Tuple
+
+import app.src.data_processing.incremental as N
+import app.src.files_processing.files_processing as P
+
+SHARD_MANIFEST_PATTERN = re.compile(r"shard-(\d+)-of-(\d+)\.json")
+
+
+def get_shard_of_file(data_path: str, filepath: str, nb_shards: int) -> int:
+    """
+    Returns the shard an input file is assigned to, from the hash of its path in the data folder,
+    so that every shard process agrees on it wherever the data folder is mounted.
+    """
+    relative_path = os.path.relpath(filepath, data_path)
+    path_hash = hashlib.sha256(relative_path.encode("utf-8")).hexdigest()
+
+    return int(path_hash, 16) % nb_shards
+
+
+def get_files_of_shard(
+    data_path: str, filepaths: List, shard: int, nb_shards: int
+) -> List:
+    return [
+        filepath
+        for filepath in filepaths
+        if get_shard_of_file(data_path, filepath, nb_shards) == shard
+    ]
+
+
+def get_shard_manifest_path(shards_path: str, shard: int, nb_shards: int) -> str:
+    return os.path.join(shards_path, f"shard-{shard}-of-{nb_shards}.json")
+
+
+def save_shard_manifest(
+    shards_path: str,
+    shard: int,
+    nb_shards: int,
+    files_by_source: Dict,
+    drugs_fingerprints: Dict,
+) -> None:
+    """
+    Written once all the file results of the shard are, so a manifest always means a complete shard.
+    The manifests of a previous run with another number of shards are removed : their shards were
+    replaced by the ones of this run.
+    """
+    for manifest_path in glob.glob(os.path.join(shards_path, "shard-*-of-*.json")):
+        manifest_match = SHARD_MANIFEST_PATTERN.fullmatch(
+            os.path.basename(manifest_path)
+        )
+        if manifest_match and int(manifest_match.group(2)) != nb_shards:
+            os.remove(manifest_path)
+
+    P.write_dict_to_file(
+        get_shard_manifest_path(shards_path, shard, nb_shards),
+        {
+            "shard": shard,
+            "nb_shards": nb_shards,
+            "drugs": drugs_fingerprints,
+            **files_by_source,
+        },
+    )
+
+
+def load_shards_files(shards_path: str) -> Tuple[List, List]:
+    """
+    Returns the pubmed and clinical trials files processed by all the shards, in the same order as a single run.
+    Raises an error if a shard is missing, or if the shards were not generated with the same drugs.
+    """
+    shard_manifests: Dict[int, Dict[int, Dict]] = {}
+    for manifest_path in glob.glob(os.path.join(shards_path, "shard-*-of-*.json")):
+        manifest_match = SHARD_MANIFEST_PATTERN.fullmatch(
+            os.path.basename(manifest_path)
+        )
+        if manifest_match is None:
+            continue
+        shard, nb_shards = map(int, manifest_match.groups())
+        shard_manifests.setdefault(nb_shards, {})[shard] = P.import_json_file_as_dict(
+            manifest_path
+        )
+
+    if len(shard_manifests) != 1:
+        raise FileNotFoundError(
+            f"Expected the shards of a single run in {shards_path}, found runs of {sorted(shard_manifests)} shards."
+        )
+
+    nb_shards, manifests = shard_manifests.popitem()
+    missing_shards = sorted(set(range(nb_shards)) - set(manifests))
+    if missing_shards:
+        raise FileNotFoundError(
+            f"The shards {missing_shards} of {nb_shards} are missing in {shards_path}."
+        )
+
+    if len({str(manifest["drugs"]) for manifest in manifests.values()}) > 1:
+        raise ValueError(
+            f"The shards in {shards_path} were not generated with the same drugs."
+        )
+
+    pubmed_path, clinical_trials_path = [
+        sorted(
+            filepath for manifest in manifests.values() for filepath in manifest[source]
+        )
+        for source in N.ARTICLE_SOURCES
+    ]
+    return pubmed_path, clinical_trials_path
@@ -1,9 +1,45 @@
 import logging
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, cast
 
+import app.src.data_processing.preprocess as C
+import numpy as np
 import pandas as pd
+from app.src.graph_link.drug_matcher import DrugMatcher, get_drug_names_df
 from app.src.graph_link.journal_mentions import JournalMentions
 
+# Fields of each mention in the graph, then the columns used to group the mentions by journal and type
+GRAPH_MENTION_FIELDS = [
+    "article_id",
+    "article_title",
+    "mention_date",
+    "mentioned_drug_id",
+    "mentioned_drug_name",
+]
+MENTION_COLUMNS = GRAPH_MENTION_FIELDS + ["journal", "article_type"]
+
+# Repeated string columns, stored as categories : each distinct value once, and an integer code per row
+INTERNED_ARTICLE_COLUMNS = ["journal", "article_type"]
+INTERNED_MENTION_COLUMNS = [
+    "mentioned_drug_id",
+    "mentioned_drug_name",
+] + INTERNED_ARTICLE_COLUMNS
+
+# Columns of the flat edge table written by the columnar output formats, partitioned by year
+EDGE_TABLE_COLUMNS = [
+    "journal",
+    "article_id",
+    "article_type",
+    "mention_date",
+    "drug_id",
+    "drug_name",
+]
+EDGE_TABLE_PARTITION_COLUMN = "mention_year"
+
+# Drugs shared by the graph worker processes, set once per process by the pool initializer
+_worker_drugs_df: Optional[pd.DataFrame] = None
+_worker_drug_matcher: Optional[DrugMatcher] = None
+
 
 def merge_dataframes(list_dataframes: List) -> pd.DataFrame:
     return pd.concat(list_dataframes)
@@ -13,12 +49,67 @@ def merge_rows(group):
     return group.ffill().bfill().iloc[0]
 
 
-def build_link_graph_from_df(
-    df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
-) -> Dict:
+def merge_duplicate_rows(df: pd.DataFrame, key_columns: List) -> pd.DataFrame:
+    """
+    Vectorized equivalent of grouping by `key_columns` then applying `merge_rows` on each group :
+    the rows of a group are merged into one, each column taking its first non-null value.
+    """
+    merged_df = df.groupby(key_columns).first().reset_index()
+    return merged_df[df.columns.tolist()]
+
+
+def take_interned_values(values: pd.Series, positions: np.ndarray) -> pd.Categorical:
+    """
+    Returns the values at the positions as a categorical, sharing the categories of `values`
+    when it is already interned, so only the integer codes are copied.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = pd.Series(
+            pd.Categorical(values, categories=values.dropna().unique()),
+            index=values.index,
+        )
+
+    return cast(pd.Categorical, values.array).take(positions)
+
+
+def format_dates_as_categories(
+    dates: pd.Series, output_date_format: str = "%Y-%m-%d"
+) -> pd.Categorical:
+    """
+    Formats each distinct day only once, instead of building a new string per row.
+    Missing dates stay missing.
+    """
+    dates_codes, distinct_dates = pd.factorize(dates.dt.normalize())
+    return pd.Categorical.from_codes(
+        dates_codes, categories=distinct_dates.strftime(output_date_format)
+    )
+
+
+def get_values_and_codes(values: pd.Series) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Returns the distinct values and the codes of a categorical, the missing code -1 pointing to a
+    NaN added at the end of the values. Other columns are returned as is, without codes.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        distinct_values = values.cat.categories.to_numpy(dtype=object)
+        return np.append(distinct_values, np.nan), values.cat.codes.to_numpy()
+
+    return values.to_numpy(), None
+
+
+def iter_link_graph_journals_from_df(
+    df_articles_cleaned: pd.DataFrame,
+    df_drugs_cleaned: pd.DataFrame,
+    drug_matcher: Optional[DrugMatcher] = None,
+) -> Iterator[Dict]:
+    """
+    Yields the graph of each journal one at a time, so it can be written before the next one is built.
+    """
     list_distinct_journals = df_articles_cleaned["journal"].unique()
 
-    output_dict = {"journals": []}
+    # Compile the drug names once, and share the matcher across all journals
+    if drug_matcher is None:
+        drug_matcher = DrugMatcher(drugs_dataFrame=df_drugs_cleaned)
 
     for journal in list_distinct_journals:
         logging.info(f"Currently generating graph for {journal}")
@@ -30,9 +121,312 @@ def build_link_graph_from_df(
             title=journal,
             drugs_dataFrame=df_drugs_cleaned,
             journal_articles_dataFrame=df_articles_of_journal,
+            drug_matcher=drug_matcher,
         )
 
-        current_graph_dict = journal_instance.generate_article_link_graph_dict()
-        output_dict["journals"].append(current_graph_dict)
+        yield journal_instance.generate_article_link_graph_dict()
+
+
+def filter_articles_mentioning_drugs(
+    df_articles: pd.DataFrame, drug_matcher: DrugMatcher
+) -> pd.DataFrame:
+    """
+    Keeps only the articles whose cleaned title mentions at least one drug.
+    The columns are left untouched, so the rows can still go through all the cleaning steps afterwards.
+    """
+    cleaned_titles = C.clean_titles_column(df_articles["title"])
+    mention_condition = cleaned_titles.apply(
+        lambda title: len(drug_matcher.match(title)) > 0
+    )
+
+    return df_articles[mention_condition]
+
+
+def build_link_graph_from_df(
+    df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
+) -> Dict:
+    return {
+        "journals": list(
+            iter_link_graph_journals_from_df(df_articles_cleaned, df_drugs_cleaned)
+        )
+    }
+
+
+def extract_mentions_from_df(
+    df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Matches all the article titles against the drug names in a single pass over the corpus :
+    titles are tokenized and exploded once, consecutive tokens are joined into n-grams for
+    multi-word drug names, then everything is merged against the names and synonyms of the drugs.
+
+    Parameters:
+        - df_articles_cleaned: DataFrame of all the articles, indexed by ID.
+        - df_drugs_cleaned: DataFrame of the drugs, indexed by ID.
+
+    Returns:
+        - One row per (article, mentioned drug), sorted in the articles order then in the drugs order.
+          The journals, article types and drugs are categoricals : the mentions only hold integer codes,
+          and references to the IDs and titles of the articles.
+    """
+    tokens_df = pd.DataFrame(
+        {
+            "article_position": np.arange(len(df_articles_cleaned)),
+            "ngram": df_articles_cleaned["title"].str.split().to_numpy(),
+        }
+    ).explode("ngram", ignore_index=True)
+    tokens_df = tokens_df.dropna(subset=["ngram"])
+
+    # The names and synonyms of the drugs, a mention of a synonym being a mention of its drug
+    drugs_df = get_drug_names_df(df_drugs_cleaned)
+    drugs_nb_words = drugs_df["drug_name"].str.split().str.len()  # type: ignore[misc]
+
+    # Build the n-grams needed by the multi-word drug names, without crossing article boundaries
+    list_ngrams_dfs = [tokens_df]
+    for nb_words in sorted(set(drugs_nb_words.dropna().astype(int)) - {0, 1}):
+        ngrams = tokens_df["ngram"]
+        for offset in range(1, nb_words):
+            same_article = tokens_df["article_position"].shift(-offset) == (
+                tokens_df["article_position"]
+            )
+            ngrams = (
+                ngrams + " " + tokens_df["ngram"].shift(-offset).where(same_article)
+            )
+
+        list_ngrams_dfs.append(
+            pd.DataFrame(
+                {"article_position": tokens_df["article_position"], "ngram": ngrams}
+            ).dropna(subset=["ngram"])
+        )
+
+    mentions_df = (
+        merge_dataframes(list_ngrams_dfs)
+        .merge(drugs_df, left_on="ngram", right_on="drug_name")
+        .drop_duplicates(subset=["article_position", "drug_position"])
+        .sort_values(["article_position", "drug_position"], ignore_index=True)
+    )[["article_position", "drug_position"]].astype(np.int32)
+
+    return build_mentions_from_positions(
+        df_articles_cleaned, df_drugs_cleaned, mentions_df
+    )
+
+
+def build_mentions_from_positions(
+    df_articles_cleaned: pd.DataFrame,
+    df_drugs_cleaned: pd.DataFrame,
+    mentions_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Builds the mentions from the positions of their article and drug, as returned by `extract_mentions_from_df`.
+    Only the positions are kept from the matching, the columns of the mentions are taken from them.
+    """
+    article_positions = mentions_df["article_position"].to_numpy()
+    drug_positions = mentions_df["drug_position"].to_numpy()
+
+    mentions_df["article_id"] = df_articles_cleaned.index.to_numpy()[article_positions]
+    mentions_df["article_title"] = df_articles_cleaned["title"].to_numpy()[
+        article_positions
+    ]
+    mentions_df["mention_date"] = df_articles_cleaned["date"].to_numpy()[
+        article_positions
+    ]
+    mentions_df["mentioned_drug_id"] = take_interned_values(
+        df_drugs_cleaned.index.to_series(), drug_positions
+    )
+    mentions_df["mentioned_drug_name"] = take_interned_values(
+        df_drugs_cleaned["name"], drug_positions
+    )
+    for column_name in INTERNED_ARTICLE_COLUMNS:
+        mentions_df[column_name] = take_interned_values(
+            df_articles_cleaned[column_name], article_positions
+        )
+
+    nb_articles_without_drugs = (
+        len(df_articles_cleaned) - mentions_df["article_position"].nunique()
+    )
+    if nb_articles_without_drugs > 0:
+        logging.warning(f"No drug was mentioned in {nb_articles_without_drugs} titles.")
+
+    return mentions_df.drop(columns=["drug_position"])
+
+
+def iter_link_graph_journals_from_mentions(
+    journals: Iterable, df_mentions: pd.DataFrame
+) -> Iterator[Dict]:
+    """
+    Groups the mentions by journal and article type to yield the same journal graphs as
+    `iter_link_graph_journals_from_df`, in the order of `journals` and journals with no mentions included.
+    The mention dicts of a journal are only built when the journal is yielded.
+    """
+    if pd.api.types.is_datetime64_any_dtype(df_mentions["mention_date"]):
+        df_mentions = df_mentions.assign(
+            mention_date=format_dates_as_categories(df_mentions["mention_date"])
+        )
+    df_mentions = df_mentions[MENTION_COLUMNS]
+
+    unknown_types = ~df_mentions["article_type"].isin(["PubMed", "ClinicalTrial"])
+    if unknown_types.any():
+        raise Exception(
+            f"Something went wrong, the articles {df_mentions.loc[unknown_types, 'article_title'].tolist()} are neither clinical nor pubmed"
+        )
+
+    positions_by_journal_and_type = df_mentions.groupby(
+        ["journal", "article_type"], sort=False, observed=True
+    ).indices
+
+    # The categoricals are only decoded for the mentions of the journal being yielded
+    fields_values_and_codes = [
+        get_values_and_codes(df_mentions[field_name])
+        for field_name in GRAPH_MENTION_FIELDS
+    ]
+
+    def get_mentions(journal: str, article_type: str) -> List:
+        positions = positions_by_journal_and_type.get((journal, article_type), [])
+        fields_values = [
+            (values[positions] if codes is None else values[codes[positions]]).tolist()
+            for values, codes in fields_values_and_codes
+        ]
+        return [
+            dict(zip(GRAPH_MENTION_FIELDS, mention_values))
+            for mention_values in zip(*fields_values)
+        ]
+
+    for journal in journals:
+        yield {
+            "title": journal,
+            "referenced_in": {
+                "pubmed_articles": get_mentions(journal, "PubMed"),
+                "clinical_trials": get_mentions(journal, "ClinicalTrial"),
+            },
+        }
+
+
+def build_link_graph_from_mentions(
+    df_articles_cleaned: pd.DataFrame, df_mentions: pd.DataFrame
+) -> Dict:
+    return {
+        "journals": list(
+            iter_link_graph_journals_from_mentions(
+                df_articles_cleaned["journal"].unique(), df_mentions
+            )
+        )
+    }
+
+
+def iter_link_graph_journals_vectorized(
+    df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
+) -> Iterator[Dict]:
+    df_mentions = extract_mentions_from_df(df_articles_cleaned, df_drugs_cleaned)
+    logging.info(f"Found {len(df_mentions)} drug mentions in the articles.")
+
+    return iter_link_graph_journals_from_mentions(
+        df_articles_cleaned["journal"].unique(), df_mentions
+    )
+
+
+def build_link_graph_vectorized(
+    df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
+) -> Dict:
+    return {
+        "journals": list(
+            iter_link_graph_journals_vectorized(df_articles_cleaned, df_drugs_cleaned)
+        )
+    }
+
+
+def build_edge_table_from_mentions(df_mentions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flattens the drug mentions into one row per (journal, article, drug) edge, with the year of
+    the mention as partition column. Mentions without a date get an empty year.
+    """
+    mention_dates = pd.to_datetime(df_mentions["mention_date"], format="%Y-%m-%d")
+
+    return pd.DataFrame(
+        {
+            "journal": df_mentions["journal"].to_numpy(),
+            "article_id": df_mentions["article_id"].to_numpy(),
+            "article_type": df_mentions["article_type"].to_numpy(),
+            "mention_date": mention_dates.to_numpy(),
+            "drug_id": df_mentions["mentioned_drug_id"].to_numpy(),
+            "drug_name": df_mentions["mentioned_drug_name"].to_numpy(),
+            EDGE_TABLE_PARTITION_COLUMN: mention_dates.dt.year.astype(
+                "Int32"
+            ).to_numpy(),
+        }
+    )
+
+
+def split_articles_by_journal(
+    df_articles_cleaned: pd.DataFrame, nb_partitions: int
+) -> List:
+    """
+    Splits the articles into partitions of whole journals, balanced on their number of articles.
+    Journals are kept contiguous in their order of first appearance, so concatenating the graphs
+    of the partitions gives the journals in the same order as a serial run.
+    """
+    journal_codes, _ = pd.factorize(df_articles_cleaned["journal"])
+    nb_articles_by_journal = np.bincount(journal_codes)
+    nb_articles_before_journal = (
+        np.cumsum(nb_articles_by_journal) - nb_articles_by_journal
+    )
+    partition_by_journal = (
+        nb_articles_before_journal * nb_partitions // max(len(journal_codes), 1)
+    )
+
+    article_partitions = partition_by_journal[journal_codes]
+    return [
+        df_articles_cleaned[article_partitions == partition]
+        for partition in np.unique(partition_by_journal)
+    ]
+
+
+def init_graph_worker(
+    df_drugs_cleaned: pd.DataFrame, drug_matcher: DrugMatcher
+) -> None:
+    global _worker_drugs_df, _worker_drug_matcher
+    _worker_drugs_df = df_drugs_cleaned
+    _worker_drug_matcher = drug_matcher
+
+
+def build_journals_of_partition(
+    df_articles_partition: pd.DataFrame, graph_builder: str
+) -> List:
+    assert _worker_drugs_df is not None
+    if graph_builder == "vectorized":
+        return list(
+            iter_link_graph_journals_vectorized(df_articles_partition, _worker_drugs_df)
+        )
+
+    return list(
+        iter_link_graph_journals_from_df(
+            df_articles_partition, _worker_drugs_df, drug_matcher=_worker_drug_matcher
+        )
+    )
+
+
+def iter_link_graph_journals_parallel(
+    df_articles_cleaned: pd.DataFrame,
+    df_drugs_cleaned: pd.DataFrame,
+    graph_builder: str = "vectorized",
+    workers: int = 2,
+) -> Iterator[Dict]:
+    """
+    Builds the journal graphs over a pool of processes and yields them in the same order as a serial run.
+    The drugs and their matcher are shipped once to each worker by the pool initializer,
+    then each task only receives the articles of a partition of journals.
+    """
+    # More partitions than workers, so a slow partition doesn't leave the other workers idle
+    partitions = split_articles_by_journal(df_articles_cleaned, workers * 4)
+    drug_matcher = DrugMatcher(drugs_dataFrame=df_drugs_cleaned)
 
-    return output_dict
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_graph_worker,
+        initargs=(df_drugs_cleaned, drug_matcher),
+    ) as executor:
+        for journals_of_partition in executor.map(
+            build_journals_of_partition,
+            partitions,
+            [graph_builder] * len(partitions),
+        ):
+            yield from journals_of_partition
@@ -1,8 +1,13 @@
+import hashlib
 import json
 import logging
 import os
+import shutil
+import textwrap
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import app.src.files_processing.json_repair as R
 
 
 def list_files_in_folder(
@@ -36,36 +41,159 @@ def list_files_in_folder(
     return sorted(files)
 
 
+def compute_file_fingerprint(filepath: str, block_size: int = 1 << 20) -> str:
+    """
+    Returns the sha256 hash of the content of a file, read by blocks"""
+    file_hash = hashlib.sha256()
+
+    with open(filepath, "rb") as hd:
+        for block in iter(lambda: hd.read(block_size), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def compute_files_fingerprints(filepaths: List[str]) -> Dict[str, str]:
+    return {filepath: compute_file_fingerprint(filepath) for filepath in filepaths}
+
+
 def create_folders_if_not_exist(output_filepath: str) -> None:
-    path_split = output_filepath.split("/")
+    # The last part of the path is the file itself
+    path_split = output_filepath.split("/")[:-1]
     current_path = ""
 
     for folder in path_split:
-        if "." not in folder and not os.path.exists(folder):
-            current_path += folder + "/"
+        current_path += folder + "/"
+        if not os.path.exists(current_path):
             os.makedirs(current_path)
 
 
-def write_dict_to_file(output_filepath: str, dictionary: Dict) -> None:
+def write_dict_to_file(
+    output_filepath: str, dictionary: Dict, indent: Optional[int] = 4
+) -> None:
     create_folders_if_not_exist(output_filepath)
 
+    # Without indentation, the separators don't contain spaces either
+    separators = None if indent is not None else (",", ":")
+
     with open(output_filepath, "w", encoding="utf-8") as hd:
-        json.dump(dictionary, hd, indent=4, ensure_ascii=False)
+        json.dump(
+            dictionary, hd, indent=indent, ensure_ascii=False, separators=separators
+        )
 
 
-def fix_broken_json(filepath: str) -> Dict:
-    with open(filepath, "r", encoding="utf-8") as hd:
-        json_str = hd.read()
+def write_journals_to_file(
+    output_filepath: str, journals: Iterable[Dict], compact: bool = False
+) -> None:
+    """
+    Streams the journals into the "journals" array of the output file, one journal at a time,
+    so the whole graph never has to be held in memory.
+    The default layout is identical to `write_dict_to_file`, `compact` drops indentation and spaces.
+    """
+    create_folders_if_not_exist(output_filepath)
+
+    if compact:
+        opening, first_separator, separator, closing = '{"journals":[', "", ",", "]}"
+    else:
+        opening, first_separator, separator = '{\n    "journals": [', "\n", ",\n"
+        closing = "\n    ]\n}"
+
+    with open(output_filepath, "w", encoding="utf-8") as hd:
+        hd.write(opening)
+        nb_journals = 0
+
+        for journal in journals:
+            hd.write(separator if nb_journals > 0 else first_separator)
+
+            if compact:
+                hd.write(json.dumps(journal, ensure_ascii=False, separators=(",", ":")))
+            else:
+                journal_str = json.dumps(journal, indent=4, ensure_ascii=False)
+                hd.write(textwrap.indent(journal_str, " " * 8))
+
+            nb_journals += 1
+
+        hd.write(closing if nb_journals > 0 or compact else "]\n}")
+
+
+def get_dataset_path(output_filepath: str) -> str:
+    """
+    Returns the folder of a columnar dataset written in place of a json output file"""
+    base_path, extension = os.path.splitext(output_filepath)
+    return base_path if extension.lower() == ".json" else output_filepath
+
+
+def write_table_to_dataset(
+    output_path: str, table, file_format: str, partition_column: str
+) -> None:
+    """
+    Writes a DataFrame as a hive partitioned dataset (e.g. mention_year=2020/part-0.parquet),
+    in the "parquet" or "arrow" (IPC/Feather) format. The dataset is written in a temporary folder first,
+    then replaces the previous one entirely, like a json output file : no partition of a previous run is left.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError as error:
+        raise ImportError(
+            f"The {file_format} output format requires pyarrow : poetry install --extras arrow (or pip install pyarrow)"
+        ) from error
+
+    temporary_path = f"{output_path}.tmp"
+    if os.path.isdir(temporary_path):
+        shutil.rmtree(temporary_path)
+
+    ds.write_dataset(
+        pa.Table.from_pandas(table, preserve_index=False),
+        temporary_path,
+        format="ipc" if file_format == "arrow" else file_format,
+        partitioning=[partition_column],
+        partitioning_flavor="hive",
+    )
+
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    os.replace(temporary_path, output_path)
+
 
-    json_str = (
-        json_str.replace("null", "None")
-        .replace("true", "True")
-        .replace("false", "False")
+def log_json_repairs(filepath: str, json_repairer: R.JsonRepairer) -> None:
+    repairs = json_repairer.repairs
+    repairs_str = ", ".join(str(offset) for offset in repairs[:10])
+    if len(repairs) > 10:
+        repairs_str += ", ..."
+
+    logging.info(
+        f"Successfully fixed and loaded the broken Json file {filepath}, removed {len(repairs)} misplaced commas at byte offsets [{repairs_str}]."
     )
-    cleaned_json = eval(json_str)
 
-    logging.info(f"Successfully fixed and loaded the broken Json file.")
-    return cleaned_json
+
+def fix_broken_json(filepath: str) -> Dict:
+    """
+    Loads a json file with trailing or repeated commas, repaired while it is read by blocks
+    """
+    json_repairer = R.JsonRepairer()
+    fixed_json = R.load_repaired_json(filepath, json_repairer)
+
+    log_json_repairs(filepath, json_repairer)
+    return fixed_json
+
+
+def iter_fixed_json_records(filepath: str) -> Iterator[Dict]:
+    """
+    Yields the records of a broken json array one by one, repaired while the file is read by blocks.
+    Raises NotAJsonArrayError before yielding anything if the file is not an array"""
+    json_repairer = R.JsonRepairer()
+    yield from R.iter_repaired_json_array(filepath, json_repairer)
+
+    log_json_repairs(filepath, json_repairer)
+
+
+def iter_json_file_array(filepath: str, array_key: Optional[str] = None) -> Iterator:
+    """
+    Yields the elements of the top level array of a json file, or of the array of one of its members
+    (like the "journals" of the graph), one by one without ever loading the whole file.
+    """
+    yield from R.iter_json_array(filepath, array_key)
 
 
 def import_json_file_as_dict(filepath: str) -> Dict:
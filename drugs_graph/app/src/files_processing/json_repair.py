@@ -0,0 +1,288 @@
+import codecs
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Only ASCII bytes are searched : they never appear inside a multi-byte UTF-8 character
+STRING_SPECIAL_PATTERN = re.compile(rb'["\\]')
+STRUCTURE_SPECIAL_PATTERN = re.compile(rb'[",]')
+NON_WHITESPACE_PATTERN = re.compile(rb"[^ \t\r\n]")
+
+# Whitespaces allowed between json values
+WHITESPACES = " \t\r\n"
+
+# Longest json token that the end of a text can cut, so that the decoding fails before it : "\uXXXX"
+MAX_CUT_TOKEN_LENGTH = 6
+
+
+class NotAJsonArrayError(ValueError):
+    pass
+
+
+@dataclass
+class JsonRepairer:
+    """
+    Repairs a json document fed block by block, without ever holding it entirely :
+    trailing commas (before a closing "}" or "]", or at the end of the document) and repeated
+    commas are removed, the content of the strings is never modified.
+    The byte offsets of the removed commas in the original document are kept in `repairs`.
+    """
+
+    repairs: List[int] = field(default_factory=list)
+    in_string: bool = False
+    escaped: bool = False
+    pending_comma_offset: Optional[int] = None
+    pending_whitespaces: bytes = b""
+    nb_bytes_read: int = 0
+
+    def feed(self, block: bytes) -> bytes:
+        block_offset = self.nb_bytes_read
+        self.nb_bytes_read += len(block)
+
+        repaired_parts = []
+        position = 0
+
+        while position < len(block):
+            # A comma was found outside a string : it is only written if a value follows it
+            if self.pending_comma_offset is not None:
+                match = NON_WHITESPACE_PATTERN.search(block, position)
+                if match is None:
+                    self.pending_whitespaces += block[position:]
+                    break
+
+                whitespaces = self.pending_whitespaces + block[position : match.start()]
+                next_char = block[match.start() : match.start() + 1]
+
+                if next_char in b"]},":
+                    self.repairs.append(self.pending_comma_offset)
+                    repaired_parts.append(whitespaces)
+                else:
+                    repaired_parts.append(b"," + whitespaces)
+
+                self.pending_comma_offset = None
+                self.pending_whitespaces = b""
+                position = match.start()
+
+                if next_char == b",":
+                    self.pending_comma_offset = block_offset + position
+                    position += 1
+
+            elif self.in_string:
+                if self.escaped:
+                    repaired_parts.append(block[position : position + 1])
+                    self.escaped = False
+                    position += 1
+                    continue
+
+                match = STRING_SPECIAL_PATTERN.search(block, position)
+                if match is None:
+                    repaired_parts.append(block[position:])
+                    break
+
+                repaired_parts.append(block[position : match.end()])
+                self.escaped = match.group() == b"\\"
+                self.in_string = self.escaped
+                position = match.end()
+
+            else:
+                match = STRUCTURE_SPECIAL_PATTERN.search(block, position)
+                if match is None:
+                    repaired_parts.append(block[position:])
+                    break
+
+                if match.group() == b",":
+                    repaired_parts.append(block[position : match.start()])
+                    self.pending_comma_offset = block_offset + match.start()
+                else:
+                    repaired_parts.append(block[position : match.end()])
+                    self.in_string = True
+
+                position = match.end()
+
+        return b"".join(repaired_parts)
+
+    def close(self) -> bytes:
+        """
+        Returns what is left once the whole document was fed : a comma at the very end is dropped.
+        """
+        if self.pending_comma_offset is not None:
+            self.repairs.append(self.pending_comma_offset)
+            self.pending_comma_offset = None
+
+        remaining_whitespaces, self.pending_whitespaces = self.pending_whitespaces, b""
+        return remaining_whitespaces
+
+
+def iter_text(filepath: str, block_size: int = 1 << 20) -> Iterator[str]:
+    # An optional UTF-8 BOM at the start of the file is dropped
+    with open(filepath, "r", encoding="utf-8-sig") as hd:
+        yield from iter(lambda: hd.read(block_size), "")
+
+
+def iter_repaired_text(
+    filepath: str, json_repairer: JsonRepairer, block_size: int = 1 << 20
+) -> Iterator[str]:
+    # An optional UTF-8 BOM at the start of the file is dropped
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    with open(filepath, "rb") as hd:
+        for block in iter(lambda: hd.read(block_size), b""):
+            yield decoder.decode(json_repairer.feed(block))
+
+    yield decoder.decode(json_repairer.close(), final=True)
+
+
+def load_repaired_json(filepath: str, json_repairer: JsonRepairer) -> Any:
+    return json.loads("".join(iter_repaired_text(filepath, json_repairer)))
+
+
+@dataclass
+class JsonTextReader:
+    """
+    Decodes the values of a json document given as successive texts, one value at a time :
+    only the part of the document that was not decoded yet is kept in the buffer.
+    """
+
+    texts: Iterator[str]
+    filepath: str
+    buffer: str = ""
+    position: int = 0
+    end_of_file: bool = False
+    decoder: json.JSONDecoder = field(default_factory=json.JSONDecoder)
+
+    def read_more_texts(self) -> None:
+        """
+        Reads the next texts until the part of the buffer not decoded yet doubled, so that a value spanning
+        many texts is only decoded again a logarithmic number of times.
+        """
+        target_length = 2 * max(len(self.buffer) - self.position, 1)
+
+        self.read_next_text()
+        while not self.end_of_file and len(self.buffer) - self.position < target_length:
+            self.read_next_text()
+
+    def is_cut_by_buffer_end(self, error: json.JSONDecodeError) -> bool:
+        """
+        Returns whether the decoding error can come from a value cut by the end of the buffer, rather than from
+        a syntax error : it is at the end of the buffer, or a string is not closed yet.
+        """
+        return error.pos >= len(self.buffer) - MAX_CUT_TOKEN_LENGTH or (
+            error.msg.startswith("Unterminated string")
+        )
+
+    def read_next_text(self) -> None:
+        next_text = next(self.texts, None)
+        if next_text is None:
+            self.end_of_file = True
+        else:
+            self.buffer, self.position = self.buffer[self.position :] + next_text, 0
+
+    def peek(self, skipped_chars: str = WHITESPACES) -> Optional[str]:
+        """
+        Skips the given characters, then returns the next one without consuming it (None at the end of the file).
+        """
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in skipped_chars
+            ):
+                self.position += 1
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.end_of_file:
+                return None
+
+            self.read_next_text()
+
+    def expect(self, char: str, error_message: str) -> None:
+        if self.peek() != char:
+            raise NotAJsonArrayError(error_message)
+        self.position += 1
+
+    def decode_value(self) -> Any:
+        # The decoder doesn't skip the whitespaces before the value
+        self.peek()
+
+        while True:
+            try:
+                value, value_end = self.decoder.raw_decode(self.buffer, self.position)
+
+                # A number could still continue in the next block
+                if value_end < len(self.buffer) or self.end_of_file:
+                    self.position = value_end
+                    return value
+
+            except json.JSONDecodeError as error:
+                if self.end_of_file or not self.is_cut_by_buffer_end(error):
+                    raise
+
+            self.read_more_texts()
+
+    def iter_array(self, array_key: Optional[str] = None) -> Iterator[Any]:
+        """
+        Yields the elements of the top level array one by one, or of the array of the `array_key` member
+        of the top level object : the members before it are decoded and skipped, the ones after it are not read.
+        Raises NotAJsonArrayError before yielding anything if there is no such array.
+        """
+        if array_key is None:
+            not_an_array_message = (
+                f"The json file {self.filepath} is not an array of records."
+            )
+        else:
+            not_an_array_message = (
+                f'The json file {self.filepath} has no "{array_key}" array.'
+            )
+            self.expect("{", not_an_array_message)
+
+            while True:
+                if self.peek(WHITESPACES + ",") != '"':
+                    raise NotAJsonArrayError(not_an_array_message)
+
+                member_key = self.decode_value()
+                self.expect(":", not_an_array_message)
+                if member_key == array_key:
+                    break
+
+                self.decode_value()
+
+        self.expect("[", not_an_array_message)
+
+        while True:
+            # Skip the whitespaces, and the separators between the elements
+            next_char = self.peek(WHITESPACES + ",")
+
+            if next_char == "]":
+                return
+            if next_char is None:
+                raise ValueError(
+                    f"The json file {self.filepath} ended before its array did."
+                )
+
+            yield self.decode_value()
+
+
+def iter_repaired_json_array(
+    filepath: str, json_repairer: JsonRepairer, block_size: int = 1 << 20
+) -> Iterator[Dict]:
+    """
+    Yields the elements of the top level array of a json file one by one, as soon as they are
+    repaired and decoded, so only one block and one element are held in memory at a time.
+    """
+    json_text_reader = JsonTextReader(
+        iter_repaired_text(filepath, json_repairer, block_size), filepath
+    )
+    yield from json_text_reader.iter_array()
+
+
+def iter_json_array(
+    filepath: str, array_key: Optional[str] = None, block_size: int = 1 << 20
+) -> Iterator[Any]:
+    """
+    Same as `iter_repaired_json_array` for a valid json file, without repairing it : yields the elements
+    of the top level array, or of the array of the `array_key` member of the top level object.
+    """
+    yield from JsonTextReader(iter_text(filepath, block_size), filepath).iter_array(
+        array_key
+    )
@@ -0,0 +1,104 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Key used in the trie nodes to store the positions of the drugs ending at that node
+_TERMINAL_KEY = None
+
+# Optional column of the drugs DataFrame, listing the synonyms and brand names of each drug
+SYNONYMS_COLUMN = "synonyms"
+
+
+def get_drug_names_df(drugs_dataFrame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the dictionary of all the names a drug can be mentioned with : one row per name or synonym,
+    with the position of its drug in the drugs DataFrame.
+    """
+    drug_names_df = pd.DataFrame(
+        {
+            "drug_position": np.arange(len(drugs_dataFrame)),
+            "drug_name": drugs_dataFrame["name"].to_numpy(),
+        }
+    )
+
+    if SYNONYMS_COLUMN in drugs_dataFrame.columns:
+        synonyms_df = pd.DataFrame(
+            {
+                "drug_position": np.arange(len(drugs_dataFrame)),
+                "drug_name": drugs_dataFrame[SYNONYMS_COLUMN].to_numpy(),
+            }
+        ).explode("drug_name")
+        drug_names_df = pd.concat(
+            [drug_names_df, synonyms_df.dropna(subset=["drug_name"])],
+            ignore_index=True,
+        )
+
+    return drug_names_df
+
+
+@dataclass
+class DrugMatcher:
+    """
+    Precompiled drug names matcher, built once from the cleaned drugs DataFrame (indexed by ID)
+    and shared across all the journals.
+
+    Single-word names are stored in a hash index (token -> drugs positions), and multi-word names
+    (e.g. "Insulin Glargine") in a trie of tokens, so that matching a title is linear in its
+    number of words instead of its number of words times the number of drugs.
+    The synonyms and brand names of a drug are compiled the same way, and matched as their drug.
+    """
+
+    drugs_dataFrame: pd.DataFrame
+    drugs: List = field(default_factory=list, init=False)
+    token_index: Dict = field(default_factory=dict, init=False)
+    names_trie: Dict = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self.compile()
+
+    def compile(self) -> None:
+        # Positions follow the order of the DataFrame, to return the drugs in the same order as a full scan
+        self.drugs = list(self.drugs_dataFrame["name"].items())
+
+        drug_names_df = get_drug_names_df(self.drugs_dataFrame)
+        for drug_position, drug_name in zip(
+            drug_names_df["drug_position"].tolist(), drug_names_df["drug_name"]
+        ):
+            name_tokens = drug_name.split()
+
+            if len(name_tokens) == 1:
+                self.token_index.setdefault(name_tokens[0], []).append(drug_position)
+
+            elif len(name_tokens) > 1:
+                node = self.names_trie
+                for token in name_tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_TERMINAL_KEY, []).append(drug_position)
+
+    def match(self, article_title: str) -> List:
+        """
+        Returns the [drug_id, drug_name] pairs of the drugs mentioned in the title,
+        in the order of the drugs DataFrame.
+        """
+        title_words = article_title.split()
+        matched_positions = set()
+
+        for word_position, word in enumerate(title_words):
+            matched_positions.update(self.token_index.get(word, []))
+
+            # Walk the trie as long as the next words continue a multi-word name
+            node = self.names_trie.get(word)
+            next_word_position = word_position + 1
+
+            while node is not None:
+                matched_positions.update(node.get(_TERMINAL_KEY, []))
+
+                if next_word_position >= len(title_words):
+                    break
+
+                node = node.get(title_words[next_word_position])
+                next_word_position += 1
+
+        return [list(self.drugs[position]) for position in sorted(matched_positions)]
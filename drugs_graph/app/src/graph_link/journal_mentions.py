@@ -1,9 +1,10 @@
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+from app.src.graph_link.drug_matcher import DrugMatcher
 
 
 @dataclass
@@ -13,15 +14,21 @@ class JournalMentions:
     journal_articles_dataFrame: pd.DataFrame  # Articles of the current journal only
     pubmed_publications: List = field(default_factory=list, init=False)
     clinical_trials_publications: List = field(default_factory=list, init=False)
+    # Precompiled matcher shared across journals, falls back to a full scan of the drugs if missing
+    drug_matcher: Optional[DrugMatcher] = None
 
     def extract_drug_from_publication_title(self, article_title: str) -> List:
-        title_words_set = set(article_title.split())
+        if self.drug_matcher is not None:
+            mentioned_drugs = self.drug_matcher.match(article_title)
 
-        mentioned_drugs = []
+        else:
+            title_words_set = set(article_title.split())
 
-        for drug_id, row in self.drugs_dataFrame.iterrows():
-            if row["name"] in title_words_set:
-                mentioned_drugs.append([drug_id, row["name"]])
+            mentioned_drugs = []
+
+            for drug_id, row in self.drugs_dataFrame.iterrows():
+                if row["name"] in title_words_set:
+                    mentioned_drugs.append([drug_id, row["name"]])
 
         if mentioned_drugs == []:
             # No drug found, and given our hypothesis, we skip it
@@ -39,7 +46,9 @@ class JournalMentions:
         article_type = current_article_row["article_type"]
 
         # Transform date to string
-        mention_date_str = datetime.strftime(mention_date, "%Y-%m-%d")
+        mention_date_str = datetime.strftime(
+            mention_date, "%Y-%m-%d"  # type: ignore[arg-type]
+        )
 
         article_info = {
             "title": article_title,
@@ -50,10 +59,30 @@ class JournalMentions:
 
         return article_info
 
+    def iter_articles_information(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yields the ID and the information of each article of the journal, like `get_article_information_from_id`,
+        but reading each column only once : the dates are formatted in one call, and the types compared as arrays.
+        """
+        articles_df = self.journal_articles_dataFrame
+        article_types = articles_df["article_type"].to_numpy()
+
+        for article_id, article_title, mention_date_str, is_pubmed, is_clinical in zip(
+            articles_df.index,
+            articles_df["title"].to_numpy(),
+            pd.to_datetime(articles_df["date"]).dt.strftime("%Y-%m-%d").to_numpy(),
+            (article_types == "PubMed").tolist(),
+            (article_types == "ClinicalTrial").tolist(),
+        ):
+            yield article_id, {
+                "title": article_title,
+                "date": mention_date_str,
+                "isPubMed": is_pubmed,
+                "isClinical": is_clinical,
+            }
+
     def build_links_articles_drug_mentions(self) -> None:
-        for article_id in self.journal_articles_dataFrame.index:
-            # Get info about articles
-            article_info = self.get_article_information_from_id(article_id)
+        for article_id, article_info in self.iter_articles_information():
 
             # Find mentioned drug(s)
             list_mentioned_drugs = self.extract_drug_from_publication_title(
@@ -0,0 +1,262 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from app.src.graph_link.drug_matcher import SYNONYMS_COLUMN
+
+TITLE_INDEX_VERSION = 1
+
+
+def get_title_index_path(graph_path: str) -> str:
+    """
+    Returns the path of the title index written alongside the graph, e.g. outputs/graph.titles.json
+    """
+    return f"{os.path.splitext(graph_path)[0]}.titles.json"
+
+
+def is_title_index_up_to_date(graph_path: str) -> bool:
+    title_index_path = get_title_index_path(graph_path)
+
+    return os.path.exists(title_index_path) and os.path.getmtime(
+        title_index_path
+    ) >= os.path.getmtime(graph_path)
+
+
+def get_drugs_names(df_drugs_cleaned: pd.DataFrame) -> Dict:
+    """
+    Returns the names a drug can be mentioned with (its name, then its synonyms), by drug ID
+    in the order of the drugs DataFrame.
+    """
+    synonyms = (
+        df_drugs_cleaned[SYNONYMS_COLUMN].tolist()
+        if SYNONYMS_COLUMN in df_drugs_cleaned.columns
+        else [[]] * len(df_drugs_cleaned)
+    )
+
+    return {
+        str(drug_id): [drug_name] + list(drug_synonyms)
+        for drug_id, drug_name, drug_synonyms in zip(
+            df_drugs_cleaned.index, df_drugs_cleaned["name"], synonyms
+        )
+    }
+
+
+@dataclass
+class TitleIndex:
+    """
+    Inverted index of the cleaned article titles : each token points to the positions of the articles
+    containing it, with its position in their titles so that multi-word names are matched on consecutive tokens.
+    Along with the articles and the names of the drugs the graph was built with, it is enough to find the
+    mentions of added drugs and to patch the graph, without matching every title again.
+    """
+
+    articles: Dict = field(default_factory=dict)  # Columns of the articles, by position
+    journals: List = field(default_factory=list)
+    tokens: Dict = field(
+        default_factory=dict
+    )  # Token -> [article positions, token positions]
+    drugs: Dict = field(default_factory=dict)  # Drug ID -> names, in the drugs order
+    max_nb_tokens: int = 0
+
+    @classmethod
+    def from_dataframes(
+        cls, df_articles_cleaned: pd.DataFrame, df_drugs_cleaned: pd.DataFrame
+    ) -> "TitleIndex":
+        tokens_df = pd.DataFrame(
+            {
+                "article_position": np.arange(len(df_articles_cleaned)),
+                "token": df_articles_cleaned["title"].str.split().to_numpy(),
+            }
+        ).explode("token", ignore_index=True)
+        tokens_df = tokens_df.dropna(subset=["token"])
+        tokens_df["token_position"] = tokens_df.groupby("article_position").cumcount()
+
+        article_positions = tokens_df["article_position"].to_numpy(dtype=np.int64)
+        token_positions = tokens_df["token_position"].to_numpy(dtype=np.int64)
+        tokens = {
+            token: [article_positions[rows].tolist(), token_positions[rows].tolist()]
+            for token, rows in tokens_df.groupby("token", sort=False).indices.items()
+        }
+
+        journal_codes, journals = pd.factorize(df_articles_cleaned["journal"])
+        mention_dates = pd.to_datetime(df_articles_cleaned["date"]).dt.strftime(
+            "%Y-%m-%d"
+        )
+
+        return cls(
+            articles={
+                "ids": df_articles_cleaned.index.tolist(),
+                "titles": df_articles_cleaned["title"].tolist(),
+                "dates": mention_dates.astype(object).tolist(),
+                "journal_codes": journal_codes.tolist(),
+                "types": df_articles_cleaned["article_type"].astype(object).tolist(),
+            },
+            journals=journals.tolist(),
+            tokens=tokens,
+            drugs=get_drugs_names(df_drugs_cleaned),
+            max_nb_tokens=int(token_positions.max(initial=-1)) + 1,
+        )
+
+    @classmethod
+    def from_dict(cls, title_index_dict: Dict) -> "TitleIndex":
+        if title_index_dict.get("version") != TITLE_INDEX_VERSION:
+            raise ValueError(
+                f"The title index was written by another version ({title_index_dict.get('version')}), generate the graph again."
+            )
+
+        return cls(
+            articles=title_index_dict["articles"],
+            journals=title_index_dict["journals"],
+            tokens=title_index_dict["tokens"],
+            drugs=title_index_dict["drugs"],
+            max_nb_tokens=title_index_dict["max_nb_tokens"],
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": TITLE_INDEX_VERSION,
+            "max_nb_tokens": self.max_nb_tokens,
+            "drugs": self.drugs,
+            "journals": self.journals,
+            "articles": self.articles,
+            "tokens": self.tokens,
+        }
+
+    def find_articles(self, name: str) -> np.ndarray:
+        """
+        Returns the positions of the articles whose title contains all the tokens of the name, consecutively.
+        """
+        name_tokens = name.split()
+        if not name_tokens or any(token not in self.tokens for token in name_tokens):
+            return np.array([], dtype=np.int64)
+
+        # An occurrence is encoded as one integer : article position * max number of tokens + token position
+        def get_occurrences(token: str) -> np.ndarray:
+            article_positions, token_positions = self.tokens[token]
+            return np.array(article_positions, dtype=np.int64) * self.max_nb_tokens + (
+                np.array(token_positions, dtype=np.int64)
+            )
+
+        name_starts = get_occurrences(name_tokens[0])
+        for offset, token in enumerate(name_tokens[1:], start=1):
+            name_starts = name_starts[
+                np.isin(name_starts + offset, get_occurrences(token))
+            ]
+
+        return np.unique(name_starts // self.max_nb_tokens)
+
+    def get_drugs_changes(self, new_drugs: Dict) -> Tuple[List, List]:
+        """
+        Returns the IDs of the added and removed drugs. A drug whose names changed is both removed and added.
+        """
+        added_drug_ids = [
+            drug_id
+            for drug_id, drug_names in new_drugs.items()
+            if self.drugs.get(drug_id) != drug_names
+        ]
+        removed_drug_ids = [
+            drug_id
+            for drug_id, drug_names in self.drugs.items()
+            if new_drugs.get(drug_id) != drug_names
+        ]
+
+        return added_drug_ids, removed_drug_ids
+
+    def find_mentions(self, new_drugs: Dict, drug_ids: List) -> Dict:
+        """
+        Looks the names of the drugs up in the index, and returns the mentions found by journal,
+        as (article position, drug ID) pairs.
+        """
+        journal_codes = self.articles["journal_codes"]
+        mentions_by_journal: Dict[str, List] = {}
+
+        for drug_id in drug_ids:
+            article_positions = set()
+            for drug_name in new_drugs[drug_id]:
+                article_positions.update(self.find_articles(drug_name).tolist())
+
+            for article_position in article_positions:
+                journal = self.journals[journal_codes[article_position]]
+                mentions_by_journal.setdefault(journal, []).append(
+                    (article_position, drug_id)
+                )
+
+        return mentions_by_journal
+
+    def get_mention(self, article_position: int, drug_id: str, drug_name: str) -> Dict:
+        return {
+            "article_id": self.articles["ids"][article_position],
+            "article_title": self.articles["titles"][article_position],
+            "mention_date": self.articles["dates"][article_position],
+            "mentioned_drug_id": drug_id,
+            "mentioned_drug_name": drug_name,
+        }
+
+    def patch_journals(
+        self, journals: Iterable[Dict], new_drugs: Dict
+    ) -> Iterator[Dict]:
+        """
+        Patches the journals of the graph built with the indexed drugs into the graph of the new drugs :
+        the mentions of the removed drugs are dropped and the ones of the added drugs are looked up in the index.
+        Only the journals with changed mentions are rebuilt, their mentions sorted by article then by drug,
+        as in a full generation. All of them are when the order of the kept drugs changed.
+        The index then refers to the new drugs.
+        """
+        added_drug_ids, removed_drug_ids_list = self.get_drugs_changes(new_drugs)
+        added_mentions_by_journal = self.find_mentions(new_drugs, added_drug_ids)
+
+        kept_drug_ids = [drug_id for drug_id in self.drugs if drug_id in new_drugs]
+        is_drugs_order_changed = kept_drug_ids != [
+            drug_id for drug_id in new_drugs if drug_id in self.drugs
+        ]
+
+        article_positions = {
+            article_id: position
+            for position, article_id in enumerate(self.articles["ids"])
+        }
+        drug_positions = {
+            drug_id: position for position, drug_id in enumerate(new_drugs)
+        }
+        removed_drug_ids = set(removed_drug_ids_list)
+        type_lists = {"PubMed": "pubmed_articles", "ClinicalTrial": "clinical_trials"}
+
+        for journal_dict in journals:
+            added_mentions = added_mentions_by_journal.get(journal_dict["title"], [])
+            referenced_in = journal_dict["referenced_in"]
+            has_removed_mentions = any(
+                mention["mentioned_drug_id"] in removed_drug_ids
+                for mentions in referenced_in.values()
+                for mention in mentions
+            )
+
+            if added_mentions or has_removed_mentions or is_drugs_order_changed:
+                # The mentions of a changed drug are removed before the ones of its new names are added
+                for list_name, mentions in referenced_in.items():
+                    referenced_in[list_name] = [
+                        mention
+                        for mention in mentions
+                        if mention["mentioned_drug_id"] not in removed_drug_ids
+                    ]
+
+                for article_position, drug_id in added_mentions:
+                    referenced_in[
+                        type_lists[self.articles["types"][article_position]]
+                    ].append(
+                        self.get_mention(
+                            article_position, drug_id, new_drugs[drug_id][0]
+                        )
+                    )
+
+                for mentions in referenced_in.values():
+                    mentions.sort(
+                        key=lambda mention: (
+                            article_positions[mention["article_id"]],
+                            drug_positions[mention["mentioned_drug_id"]],
+                        )
+                    )
+
+            yield journal_dict
+
+        self.drugs = new_drugs
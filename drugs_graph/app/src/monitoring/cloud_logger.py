@@ -0,0 +1,27 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Optional
+
+LOGGING_GCP_PROJECT_ID = os.getenv("LOGGING_GCP_PROJECT_ID", "")
+CLOUD_LOGGER_NAME = "servier-drugs-graph"
+
+
+@lru_cache(maxsize=None)
+def get_cloud_logger() -> Optional[Any]:
+    """
+    Creates the cloud logger on first use only, as importing the client and discovering the credentials is slow.
+    Returns None if cloud logging is not available (e.g. offline or without credentials), to only log locally.
+    """
+    try:
+        from google.cloud import logging as cloud_logging
+
+        logging_client = cloud_logging.Client(project=LOGGING_GCP_PROJECT_ID)
+
+    except Exception as error:
+        logging.warning(
+            f"[Logging] - Cloud logging is not available ({error}), only logging locally."
+        )
+        return None
+
+    return logging_client.logger(CLOUD_LOGGER_NAME)
@@ -0,0 +1,185 @@
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import app.src.files_processing.files_processing as P
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+# Current and peak resident memory of the process, Linux only
+PROC_STATUS_PATH = "/proc/self/status"
+# Writing 5 to it resets the peak resident memory of the process, Linux only
+PROC_CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident memory of the current process since it started (or since the last reset), in MB
+    """
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is given in bytes on macOS, and in kilobytes on Linux
+    return round(peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def read_proc_memory_mb(field_name: str) -> Optional[float]:
+    """
+    Returns a memory field of the process status, like VmRSS (current resident memory)
+    or VmHWM (peak resident memory since the last reset), in MB. None when it can't be read.
+    """
+    try:
+        with open(PROC_STATUS_PATH, "r", encoding="utf-8") as hd:
+            for line in hd:
+                if line.startswith(f"{field_name}:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak resident memory of the process, returns whether it could be reset.
+    """
+    try:
+        with open(PROC_CLEAR_REFS_PATH, "w", encoding="utf-8") as hd:
+            hd.write("5")
+    except OSError:
+        return False
+
+    return True
+
+
+@dataclass
+class StageProfiler:
+    """
+    Records the wall time, CPU time, peak RSS, RSS delta and rows in / out of each stage of the pipeline.
+    Each stage is logged when it ends, as text and as a structured entry of the cloud logger if one is given.
+    Nested stages are recorded separately, their time and memory are also included in the enclosing stage.
+
+    The peak RSS of the process is reset when a stage starts, so it is the peak of the stage itself.
+    When it can't be reset (out of Linux), the peak of the process is only the peak of the stage
+    if it grew during the stage, otherwise it is left unknown.
+    """
+
+    cloud_logger: Optional[Any] = None
+    stages: List[Dict] = field(default_factory=list)
+    # Peak RSS of the stages still running, the innermost last, and of the whole run
+    open_stages_peak_rss_mb: List = field(default_factory=list, init=False)
+    run_peak_rss_mb: Optional[float] = field(default=None, init=False)
+
+    def collect_peak_rss(self) -> None:
+        """
+        Adds the peak RSS since the last reset to the peaks of the running stages and of the run.
+        """
+        peak_rss_mb = read_proc_memory_mb("VmHWM")
+        if peak_rss_mb is None:
+            return
+
+        self.open_stages_peak_rss_mb = [
+            max(stage_peak_rss_mb, peak_rss_mb)
+            for stage_peak_rss_mb in self.open_stages_peak_rss_mb
+        ]
+        self.run_peak_rss_mb = max(self.run_peak_rss_mb or 0, peak_rss_mb)
+
+    @contextmanager
+    def stage(self, stage_name: str, rows_in: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Profiles the code run in the context. The yielded record can be completed with the "rows_out".
+        """
+        stage_record: Dict[str, Any] = {
+            "stage": stage_name,
+            "rows_in": rows_in,
+            "rows_out": None,
+        }
+
+        self.collect_peak_rss()
+        is_peak_rss_reset = reset_peak_rss()
+        start_rss_mb = read_proc_memory_mb("VmRSS")
+        start_process_peak_rss_mb = get_peak_rss_mb()
+        self.open_stages_peak_rss_mb.append(start_rss_mb or 0)
+
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+
+        try:
+            yield stage_record
+
+        finally:
+            stage_record["wall_time_s"] = round(
+                time.perf_counter() - start_wall_time, 6
+            )
+            stage_record["cpu_time_s"] = round(time.process_time() - start_cpu_time, 6)
+
+            self.collect_peak_rss()
+            stage_peak_rss_mb = self.open_stages_peak_rss_mb.pop()
+            if is_peak_rss_reset:
+                stage_record["peak_rss_mb"] = stage_peak_rss_mb
+            else:
+                process_peak_rss_mb = get_peak_rss_mb()
+                stage_record["peak_rss_mb"] = (
+                    process_peak_rss_mb
+                    if process_peak_rss_mb != start_process_peak_rss_mb
+                    else None
+                )
+
+            end_rss_mb = read_proc_memory_mb("VmRSS")
+            stage_record["rss_delta_mb"] = (
+                round(end_rss_mb - start_rss_mb, 1)
+                if start_rss_mb is not None and end_rss_mb is not None
+                else None
+            )
+
+            self.stages.append(stage_record)
+            self.log_stage(stage_record)
+
+    def log_stage(self, stage_record: Dict) -> None:
+        logging.info(
+            f"[Profiling] - {stage_record['stage']} : {stage_record['wall_time_s']:.3f}s wall, "
+            f"{stage_record['cpu_time_s']:.3f}s CPU, peak RSS {stage_record['peak_rss_mb']} MB, "
+            f"RSS delta {stage_record['rss_delta_mb']} MB, "
+            f"rows {stage_record['rows_in']} -> {stage_record['rows_out']}."
+        )
+
+        if self.cloud_logger is None:
+            return
+
+        try:
+            self.cloud_logger.log_struct(
+                {"message": "pipeline_stage", **stage_record}, severity="INFO"
+            )
+        except Exception as error:
+            # Profiling must never fail the run, e.g. when the cloud logging API can't be reached
+            logging.warning(
+                f"[Profiling] - Could not send the stage to cloud logging ({error}), only logging locally from now on."
+            )
+            self.cloud_logger = None
+
+    def get_report(self) -> Dict:
+        # The peak RSS of the process only covers the time since the last reset
+        self.collect_peak_rss()
+        peaks_rss_mb = [
+            peak_rss_mb
+            for peak_rss_mb in [self.run_peak_rss_mb, get_peak_rss_mb()]
+            if peak_rss_mb is not None
+        ]
+
+        return {
+            "stages": self.stages,
+            "peak_rss_mb": max(peaks_rss_mb) if peaks_rss_mb else None,
+        }
+
+    def write_report(self, report_path: str) -> None:
+        P.write_dict_to_file(report_path, self.get_report())
+        logging.info(f"[Profiling] - Run report written to {report_path}.")
@@ -0,0 +1,150 @@
+# Built-in packages
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.cache import CleanedDataFramesCache, NormalizationCache
+from app.src.data_processing.pipeline import clean_dataframes
+from pandas.testing import assert_frame_equal
+
+
+class TestCleanedDataFramesCache(unittest.TestCase):
+    def setUp(self):
+        """Run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_filepath = os.path.join(self.temp_dir.name, "drugs.csv")
+        with open(self.input_filepath, "w", encoding="utf-8") as hd:
+            hd.write("atccode,drug\nA04AD,DIPHENHYDRAMINE\n")
+
+        self.cleaned_df = pd.DataFrame(
+            {
+                "id": ["1", "2"],
+                "title": ["Epinephrine In Children", None],
+                "date": pd.to_datetime(["2020-01-01", None]),
+            }
+        )
+        self.nb_builds = 0
+
+    def tearDown(self):
+        """Run after each test"""
+        self.temp_dir.cleanup()
+
+    def build_dataframe(self) -> pd.DataFrame:
+        self.nb_builds += 1
+        return self.cleaned_df.copy()
+
+    def test_no_cache_path_always_builds(self):
+        dataframes_cache = CleanedDataFramesCache()
+
+        for _ in range(2):
+            result_df = dataframes_cache.get_or_build(
+                "drugs", [self.input_filepath], self.build_dataframe
+            )
+
+        self.assertEqual(self.nb_builds, 2)
+        assert_frame_equal(result_df, self.cleaned_df)
+
+    def test_cache_key_changes_with_files_and_parameters(self):
+        dataframes_cache = CleanedDataFramesCache(self.temp_dir.name)
+        cache_key = dataframes_cache.get_cache_key("drugs", [self.input_filepath])
+
+        self.assertNotEqual(
+            cache_key,
+            dataframes_cache.get_cache_key(
+                "drugs", [self.input_filepath], {"chunksize": 10}
+            ),
+        )
+
+        with open(self.input_filepath, "a", encoding="utf-8") as hd:
+            hd.write("A01AD,EPINEPHRINE\n")
+
+        self.assertNotEqual(
+            cache_key, dataframes_cache.get_cache_key("drugs", [self.input_filepath])
+        )
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed"
+    )
+    def test_cached_dataframe_is_reloaded_until_inputs_change(self):
+        cache_path = os.path.join(self.temp_dir.name, "cache")
+        dataframes_cache = CleanedDataFramesCache(cache_path)
+
+        for _ in range(2):
+            result_df = dataframes_cache.get_or_build(
+                "drugs", [self.input_filepath], self.build_dataframe
+            )
+
+        self.assertEqual(self.nb_builds, 1)
+        assert_frame_equal(result_df, self.cleaned_df)
+
+        with open(self.input_filepath, "a", encoding="utf-8") as hd:
+            hd.write("A01AD,EPINEPHRINE\n")
+        dataframes_cache.get_or_build(
+            "drugs", [self.input_filepath], self.build_dataframe
+        )
+
+        # The outdated version is replaced
+        self.assertEqual(self.nb_builds, 2)
+        self.assertEqual(len(os.listdir(cache_path)), 1)
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed"
+    )
+    def test_cleaned_values_reloaded_by_next_run(self):
+        cache_path = os.path.join(self.temp_dir.name, "cache")
+        normalization_cache = NormalizationCache(cache_path)
+        normalization_cache.load()
+        normalization_cache.cleaned_values.update(
+            {"journal (A)": "Journal A", "EPINEPHRINE": "Epinephrine"}
+        )
+        normalization_cache.save()
+
+        next_normalization_cache = NormalizationCache(cache_path)
+        next_normalization_cache.load()
+
+        self.assertEqual(
+            next_normalization_cache.cleaned_values,
+            {"journal (A)": "Journal A", "EPINEPHRINE": "Epinephrine"},
+        )
+        self.assertEqual(len(os.listdir(cache_path)), 1)
+
+    def test_only_journals_and_drug_names_kept_in_cleaned_values(self):
+        cleaned_values = {}
+        clinical_df = pd.DataFrame(
+            {
+                "id": ["NCT1"],
+                "scientific_title": ["epinephrine for anaphylaxis"],
+                "date": ["1 January 2020"],
+                "journal": ["journal (A)"],
+            }
+        )
+        pubmed_df = pd.DataFrame(
+            {
+                "id": ["1"],
+                "title": ["Diphenhydramine in children."],
+                "date": ["01/01/2019"],
+                "journal": ["journal b"],
+            }
+        )
+        drugs_df = pd.DataFrame({"atccode": ["A01AD"], "drug": ["EPINEPHRINE"]})
+
+        clean_dataframes(
+            clinical_df, pubmed_df, drugs_df, cleaned_values=cleaned_values
+        )
+
+        self.assertEqual(
+            cleaned_values,
+            {
+                "journal (A)": "Journal A",
+                "journal b": "Journal B",
+                "EPINEPHRINE": "Epinephrine",
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+# Built-in packages
+import unittest
+from unittest.mock import patch
+
+# My Custom packages
+from app.src.monitoring.cloud_logger import get_cloud_logger
+
+
+class TestCloudLogger(unittest.TestCase):
+    def setUp(self):
+        """Run before each test, as the cloud logger is only created once"""
+        get_cloud_logger.cache_clear()
+
+    def tearDown(self):
+        """Run after each test"""
+        get_cloud_logger.cache_clear()
+
+    def test_cloud_logger_created_once(self):
+        with patch("google.cloud.logging.Client") as mock_client:
+            cloud_logger = get_cloud_logger()
+            self.assertIs(get_cloud_logger(), cloud_logger)
+
+        mock_client.assert_called_once()
+        mock_client.return_value.logger.assert_called_once_with("servier-drugs-graph")
+
+    def test_no_cloud_logger_without_credentials(self):
+        with patch(
+            "google.cloud.logging.Client", side_effect=RuntimeError("No credentials")
+        ):
+            self.assertIsNone(get_cloud_logger())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Built-in packages
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.graph_link.drug_matcher import DrugMatcher
+from app.src.graph_link.journal_mentions import JournalMentions
+
+
+class TestDrugMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.drugs_df = pd.DataFrame(
+            {
+                "name": [
+                    "Diphenhydramine",
+                    "Tetracycline",
+                    "Insulin Glargine",
+                    "Epinephrine",
+                    "Insulin",
+                ]
+            },
+            index=pd.Index(
+                ["A04AD", "S03AA", "A10AE", "A01AD", "A10AB"], name="atccode"
+            ),
+        )
+        cls.drug_matcher = DrugMatcher(drugs_dataFrame=cls.drugs_df)
+
+    def test_match_single_word_names_in_drugs_order(self):
+        result = self.drug_matcher.match(
+            "Epinephrine Versus Diphenhydramine And Epinephrine In Children"
+        )
+        expected_result = [["A04AD", "Diphenhydramine"], ["A01AD", "Epinephrine"]]
+        self.assertEqual(result, expected_result)
+
+    def test_match_multi_word_names(self):
+        result = self.drug_matcher.match("Efficacy Of Insulin Glargine In Adults")
+        expected_result = [["A10AE", "Insulin Glargine"], ["A10AB", "Insulin"]]
+        self.assertEqual(result, expected_result)
+
+    def test_partial_multi_word_names_are_not_matched(self):
+        result = self.drug_matcher.match("Glargine Alone Versus Metformin")
+        self.assertEqual(result, [])
+
+        result = self.drug_matcher.match("Cost Of Insulin")
+        self.assertEqual(result, [["A10AB", "Insulin"]])
+
+    def test_synonyms_are_matched_as_their_drug(self):
+        drugs_df = self.drugs_df.assign(
+            synonyms=[
+                ["Benadryl"],
+                [],
+                ["Lantus"],
+                ["Adrenaline", "Adrenalin Auto"],
+                [],
+            ]
+        )
+        drug_matcher = DrugMatcher(drugs_dataFrame=drugs_df)
+
+        result = drug_matcher.match(
+            "Benadryl And Adrenalin Auto Versus Lantus Or Adrenaline"
+        )
+        expected_result = [
+            ["A04AD", "Diphenhydramine"],
+            ["A10AE", "Insulin Glargine"],
+            ["A01AD", "Epinephrine"],
+        ]
+        self.assertEqual(result, expected_result)
+
+    def test_same_results_as_drugs_scan_for_single_word_names(self):
+        titles = [
+            "A 44-Year-Old Man With Diphenhydramine Neck And Chest",
+            "Tetracycline Resistance Patterns Of Epinephrine",
+            "Title Without Any Drug",
+            "",
+        ]
+        single_word_drugs_df = self.drugs_df[~self.drugs_df["name"].str.contains(" ")]
+
+        scan_instance = JournalMentions("Journal", single_word_drugs_df, pd.DataFrame())
+        matcher_instance = JournalMentions(
+            "Journal",
+            single_word_drugs_df,
+            pd.DataFrame(),
+            drug_matcher=DrugMatcher(drugs_dataFrame=single_word_drugs_df),
+        )
+
+        for title in titles:
+            self.assertEqual(
+                matcher_instance.extract_drug_from_publication_title(title),
+                scan_instance.extract_drug_from_publication_title(title),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+# Built-in packages
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.load import load_df_from_file
+from app.src.data_processing.preprocess import (
+    clean_titles,
+    normalize_dates_format_cached,
+)
+from app.src.data_processing.transform import extract_mentions_from_df
+from pandas.testing import assert_frame_equal
+
+
+@unittest.skipIf(importlib.util.find_spec("duckdb") is None, "duckdb is not installed")
+class TestDuckDBEngine(unittest.TestCase):
+    def setUp(self):
+        """Run before each test"""
+        import duckdb
+        from app.src.data_processing import duckdb_engine
+
+        self.duckdb_engine = duckdb_engine
+        self.connection = duckdb.connect()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        self.pubmed_path = os.path.join(self.temp_dir.name, "pubmed.csv")
+        with open(self.pubmed_path, "w", encoding="utf-8") as hd:
+            hd.write(
+                "id,title,date,journal\n"
+                "2,tetracycline  resistance,2020-05-12,Journal B\n"
+                ",insulin glargine/LANTUS study,01/01/2019,journal a\n"
+                ",tetracycline  resistance,2020-05-12,\n"
+                "1,\\xc3\\x28Diphenhydramine in children.,1 January 2020,Journal A\n"
+            )
+        self.clinical_trials_path = os.path.join(self.temp_dir.name, "trials.csv")
+        with open(self.clinical_trials_path, "w", encoding="utf-8") as hd:
+            hd.write(
+                "id,scientific_title,date,journal\n"
+                "NCT1,Epinephrine For Anaphylaxis,25/05/2020,Journal A\n"
+                "NCT2,,25/05/2020,Journal A\n"
+            )
+
+    def tearDown(self):
+        """Run after each test"""
+        self.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_clean_title_macro_same_as_clean_titles(self):
+        titles = [
+            "  The HIGH cost of épinéphrine,  autoinjectors. ",
+            "EPINEPHRINE/ADRENALINE",
+            "\\xc3\\x28tetracycline's 2nd-line use\tin children",
+            "bêta ΑΒΓ naïve o'neil",
+            "!!!",
+        ]
+        self.connection.execute(self.duckdb_engine.CLEAN_TITLES_MACROS)
+
+        result = [
+            self.connection.execute("SELECT clean_title(?)", [title]).fetchone()[0]
+            for title in titles
+        ]
+
+        self.assertEqual(result, [clean_titles(title) for title in titles])
+
+    def test_articles_cleaned_as_in_pandas_engine(self):
+        result = self.duckdb_engine.clean_articles(
+            self.connection, [self.clinical_trials_path], [self.pubmed_path]
+        )
+
+        self.assertEqual(result.index.tolist(), ["1", "3", "2", "NCT1"])
+        self.assertEqual(
+            result["title"].tolist(),
+            [
+                "Diphenhydramine In Children",
+                "Insulin Glargine Lantus Study",
+                "Tetracycline Resistance",
+                "Epinephrine For Anaphylaxis",
+            ],
+        )
+        self.assertEqual(
+            result["date"].tolist(),
+            [
+                pd.Timestamp("2020-01-01"),
+                pd.Timestamp("2019-01-01"),
+                pd.Timestamp("2020-05-12"),
+                pd.Timestamp("2020-05-25"),
+            ],
+        )
+        self.assertEqual(
+            result["journal"].tolist(),
+            ["Journal A", "Journal A", "Journal B", "Journal A"],
+        )
+
+    def test_json_files_dated_as_in_pandas_engine(self):
+        json_path = os.path.join(self.temp_dir.name, "pubmed.json")
+        broken_json_path = os.path.join(self.temp_dir.name, "broken_pubmed.json")
+        articles = (
+            '{"id": 5, "title": "Atropine use", "date": "01/03/2020", "journal": "Journal C"},'
+            '{"id": null, "title": "Betamethasone use", "date": "02/03/2020", "journal": "Journal C"}'
+        )
+        with open(json_path, "w", encoding="utf-8") as hd:
+            hd.write(f"[{articles}]")
+        with open(broken_json_path, "w", encoding="utf-8") as hd:
+            hd.write(f"[{articles},]")
+
+        for path in [json_path, broken_json_path]:
+            result = self.duckdb_engine.clean_articles(self.connection, [], [path])
+            expected_df = normalize_dates_format_cached(load_df_from_file(path), "date")
+
+            self.assertEqual(result.index.tolist(), ["5", "6"])
+            self.assertEqual(result["date"].tolist(), expected_df["date"].tolist())
+
+    def test_mentions_same_as_pandas_engine(self):
+        articles_df = self.duckdb_engine.clean_articles(
+            self.connection, [self.clinical_trials_path], [self.pubmed_path]
+        )
+        drugs_df = pd.DataFrame(
+            {
+                "name": ["Insulin Glargine", "Tetracycline", "Epinephrine"],
+                "synonyms": [["Lantus"], [], ["Adrenaline"]],
+            },
+            index=pd.Index(["A10AE", "S03AA", "A01AD"], name="atccode"),
+        )
+
+        result = self.duckdb_engine.extract_mentions(
+            self.connection, articles_df, drugs_df
+        )
+
+        assert_frame_equal(result, extract_mentions_from_df(articles_df, drugs_df))
+        self.assertEqual(len(result), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,39 @@
 # Built-in packages
+import importlib.util
+import json
 import os
 import tempfile
 import unittest
 from unittest.mock import call, patch
 
+import pandas as pd
+
 # My Custom packages
 from app.src.files_processing.files_processing import (
-    create_folders_if_not_exist, fix_broken_json)
+    create_folders_if_not_exist,
+    fix_broken_json,
+    iter_fixed_json_records,
+    write_dict_to_file,
+    write_journals_to_file,
+    write_table_to_dataset,
+)
 
 
 class TestFilesProcessing(unittest.TestCase):
+    def setUp(self):
+        """Run before each test"""
+        self.initial_cwd = os.getcwd()
+
+    def tearDown(self):
+        """Run after each test, going back to the initial working directory"""
+        os.chdir(self.initial_cwd)
+
     def test_create_folders_for_valid_nested_output_file_path(self):
         output_filepath = "test_outputs/folder2/folder3/file.txt"
 
         with patch("os.makedirs") as mock_makedirs, patch(
             "os.path.exists", return_value=False
-        ) as mock_exists:
+        ):
             create_folders_if_not_exist(output_filepath)
             expected_calls = [
                 call("test_outputs/"),
@@ -29,7 +47,7 @@ class TestFilesProcessing(unittest.TestCase):
         output_filepath = "test.json"
         with patch("os.makedirs") as mock_makedirs, patch(
             "os.path.exists", return_value=False
-        ) as mock_exists:
+        ):
             create_folders_if_not_exist(output_filepath)
             mock_makedirs.assert_not_called()
 
@@ -51,6 +69,88 @@ class TestFilesProcessing(unittest.TestCase):
         finally:
             os.remove(temp_filepath)
 
+    def test_fix_broken_json_keeps_literals_inside_strings(self):
+        broken_json_content = (
+            '[{"title": "null and void, true or false", "id": null, "valid": true,},]'
+        )
+        expected_output = [
+            {"title": "null and void, true or false", "id": None, "valid": True}
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_filepath = os.path.join(temp_dir, "broken.json")
+            with open(temp_filepath, "w", encoding="utf-8") as hd:
+                hd.write(broken_json_content)
+
+            self.assertEqual(fix_broken_json(temp_filepath), expected_output)
+            self.assertEqual(
+                list(iter_fixed_json_records(temp_filepath)), expected_output
+            )
+
+    def test_streamed_journals_identical_to_dict_dump(self):
+        journals = [
+            {
+                "title": "Journal Of Emergency Nursing",
+                "referenced_in": {
+                    "pubmed_articles": [
+                        {"article_id": "1", "mentioned_drug_name": "Épinéphrine"}
+                    ],
+                    "clinical_trials": [],
+                },
+            },
+            {
+                "title": "Psychopharmacology",
+                "referenced_in": {"pubmed_articles": [], "clinical_trials": []},
+            },
+        ]
+
+        # Relative paths are used, as expected by create_folders_if_not_exist
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            for current_journals in [journals, []]:
+                write_dict_to_file("expected.json", {"journals": current_journals})
+                write_journals_to_file("result.json", iter(current_journals))
+
+                with open("expected.json", encoding="utf-8") as expected_hd, open(
+                    "result.json", encoding="utf-8"
+                ) as result_hd:
+                    self.assertEqual(result_hd.read(), expected_hd.read())
+
+            write_journals_to_file("compact.json", iter(journals), compact=True)
+            with open("compact.json", encoding="utf-8") as compact_hd:
+                compact_str = compact_hd.read()
+
+            os.chdir(self.initial_cwd)
+
+        self.assertNotIn("\n", compact_str)
+        self.assertEqual(json.loads(compact_str), {"journals": journals})
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyarrow") is None, "pyarrow is not installed"
+    )
+    def test_dataset_replaced_by_next_write(self):
+        import pyarrow.dataset as ds
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dataset_path = os.path.join(temp_dir, "graph")
+            for mention_years in [[2019, 2020], [2020, 2021]]:
+                write_table_to_dataset(
+                    dataset_path,
+                    pd.DataFrame(
+                        {"mention_year": mention_years, "article_id": ["1", "2"]}
+                    ),
+                    "parquet",
+                    partition_column="mention_year",
+                )
+
+            self.assertEqual(
+                sorted(os.listdir(dataset_path)),
+                ["mention_year=2020", "mention_year=2021"],
+            )
+            self.assertEqual(
+                ds.dataset(dataset_path, partitioning="hive").to_table().num_rows, 2
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,106 @@
+# Built-in packages
+import unittest
+
+# My Custom packages
+from app.src.ad_hoc.graph_index import (
+    GraphIndexBuilder,
+    get_drugs_co_mentioned_with,
+    get_journals_citing_drug,
+    get_journals_with_most_drugs,
+)
+
+
+class TestGraphIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.journals = [
+            {
+                "title": "Journal A",
+                "referenced_in": {
+                    "pubmed_articles": [
+                        {
+                            "article_id": "1",
+                            "mentioned_drug_id": "D001",
+                            "mentioned_drug_name": "DrugB",
+                        },
+                        {
+                            "article_id": "1",
+                            "mentioned_drug_id": "D002",
+                            "mentioned_drug_name": "DrugC",
+                        },
+                    ],
+                    "clinical_trials": [
+                        {
+                            "article_id": "NCT1",
+                            "mentioned_drug_id": "D001",
+                            "mentioned_drug_name": "DrugB",
+                        }
+                    ],
+                },
+            },
+            {
+                "title": "Journal B",
+                "referenced_in": {
+                    "pubmed_articles": [
+                        {
+                            "article_id": "2",
+                            "mentioned_drug_id": "D003",
+                            "mentioned_drug_name": "DrugD",
+                        },
+                        {
+                            "article_id": "3",
+                            "mentioned_drug_id": "D001",
+                            "mentioned_drug_name": "DrugB",
+                        },
+                    ],
+                    "clinical_trials": [],
+                },
+            },
+            {
+                "title": "Journal C",
+                "referenced_in": {"pubmed_articles": [], "clinical_trials": []},
+            },
+        ]
+
+        graph_index_builder = GraphIndexBuilder()
+        cls.indexed_journals = list(graph_index_builder.index_journals(cls.journals))
+        cls.graph_index = graph_index_builder.to_dict()
+
+    def test_journals_are_yielded_unchanged(self):
+        self.assertEqual(self.indexed_journals, self.journals)
+
+    def test_journals_with_most_drugs_handles_ties(self):
+        result = get_journals_with_most_drugs(self.graph_index)
+        self.assertEqual(result, [["Journal A", "Journal B"], 2])
+
+    def test_journals_with_most_drugs_of_empty_graph(self):
+        graph_index = GraphIndexBuilder().to_dict()
+
+        self.assertEqual(get_journals_with_most_drugs(graph_index), [[], 0])
+
+    def test_journals_citing_drug_by_id_or_name(self):
+        self.assertEqual(
+            get_journals_citing_drug(self.graph_index, "D001"),
+            ["Journal A", "Journal B"],
+        )
+        self.assertEqual(
+            get_journals_citing_drug(self.graph_index, "drugd"), ["Journal B"]
+        )
+
+        with self.assertRaises(KeyError):
+            get_journals_citing_drug(self.graph_index, "Unknown Drug")
+
+    def test_drugs_found_with_positions_stored_in_index(self):
+        self.assertEqual(self.graph_index["drug_positions"]["D003"], 2)
+        self.assertEqual(self.graph_index["drug_name_positions"]["drugc"], 1)
+
+    def test_drugs_co_mentioned_in_same_articles(self):
+        self.assertEqual(
+            get_drugs_co_mentioned_with(self.graph_index, "DrugB"), ["DrugC"]
+        )
+        self.assertEqual(get_drugs_co_mentioned_with(self.graph_index, "D003"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+# Built-in packages
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.incremental import (
+    get_files_to_process,
+    get_removed_files,
+    iter_link_graph_journals_from_file_results,
+    save_file_results,
+)
+from app.src.data_processing.pipeline import generate_graph_incremental
+
+
+class TestIncremental(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.previous_manifest = {
+            "drugs": {"data/drugs/drugs.csv": "hash_drugs"},
+            "pubmed": {
+                "data/pubmed/pubmed.csv": "hash_1",
+                "data/pubmed/pubmed.json": "hash_2",
+            },
+            "clinical_trials": {"data/clinical_trials/clinical_trials.csv": "hash_3"},
+        }
+
+    def test_only_new_and_changed_files_are_processed(self):
+        current_manifest = {
+            "drugs": {"data/drugs/drugs.csv": "hash_drugs"},
+            "pubmed": {
+                "data/pubmed/pubmed.csv": "hash_1",
+                "data/pubmed/pubmed_update.csv": "hash_4",
+            },
+            "clinical_trials": {
+                "data/clinical_trials/clinical_trials.csv": "hash_3_changed"
+            },
+        }
+
+        result = get_files_to_process(self.previous_manifest, current_manifest)
+
+        self.assertEqual(
+            result,
+            [
+                "data/pubmed/pubmed_update.csv",
+                "data/clinical_trials/clinical_trials.csv",
+            ],
+        )
+        self.assertEqual(
+            get_removed_files(self.previous_manifest, current_manifest),
+            ["data/pubmed/pubmed.json"],
+        )
+
+    def test_all_files_are_processed_when_drugs_change(self):
+        current_manifest = dict(
+            self.previous_manifest, drugs={"data/drugs/drugs.csv": "hash_drugs_2"}
+        )
+
+        result = get_files_to_process(self.previous_manifest, current_manifest)
+
+        self.assertEqual(
+            result,
+            [
+                "data/pubmed/pubmed.csv",
+                "data/pubmed/pubmed.json",
+                "data/clinical_trials/clinical_trials.csv",
+            ],
+        )
+
+    def test_file_results_merged_in_files_order(self):
+        articles_df = pd.DataFrame(
+            {"journal": ["Journal B", "Journal A"]},
+            index=pd.Index(["1", "2"], name="id"),
+        )
+        mentions_df = pd.DataFrame(
+            {
+                "article_id": ["1"],
+                "article_title": ["Epinephrine Study"],
+                "mention_date": [pd.Timestamp("2020-01-01")],
+                "mentioned_drug_id": ["A01AD"],
+                "mentioned_drug_name": ["Epinephrine"],
+                "journal": ["Journal B"],
+                "article_type": ["PubMed"],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as state_path:
+            save_file_results(state_path, "pubmed_1.csv", articles_df, mentions_df)
+            # The same article ID in a later file is ignored
+            save_file_results(
+                state_path,
+                "pubmed_2.csv",
+                articles_df.iloc[[0]],
+                mentions_df.assign(mentioned_drug_id="S03AA"),
+            )
+
+            result = list(
+                iter_link_graph_journals_from_file_results(
+                    state_path, ["pubmed_1.csv", "pubmed_2.csv"]
+                )
+            )
+
+        self.assertEqual(
+            [journal["title"] for journal in result], ["Journal B", "Journal A"]
+        )
+        self.assertEqual(
+            result[0]["referenced_in"]["pubmed_articles"],
+            [
+                {
+                    "article_id": "1",
+                    "article_title": "Epinephrine Study",
+                    "mention_date": "2020-01-01",
+                    "mentioned_drug_id": "A01AD",
+                    "mentioned_drug_name": "Epinephrine",
+                }
+            ],
+        )
+        self.assertEqual(result[1]["referenced_in"]["pubmed_articles"], [])
+
+    def test_generated_id_of_unchanged_file_renumbered(self):
+        with tempfile.TemporaryDirectory() as temp_path:
+            data_path = os.path.join(temp_path, "data")
+            state_path = os.path.join(temp_path, "state")
+            output_path = os.path.join(temp_path, "graph.json")
+            input_files = {
+                "drugs/drugs.csv": "atccode,drug\nA03BA,ATROPINE\n",
+                "clinical_trials/clinical_trials.csv": "id,scientific_title,date,journal\n",
+                "pubmed/pubmed.csv": "id,title,date,journal\n"
+                "1,Atropine study,01/01/2020,Journal A\n",
+                "pubmed/pubmed.json": '[{"id": "", "title": "Atropine use", '
+                '"date": "01/01/2020", "journal": "Journal B"}]',
+            }
+            for filepath, content in input_files.items():
+                os.makedirs(
+                    os.path.dirname(os.path.join(data_path, filepath)), exist_ok=True
+                )
+                with open(
+                    os.path.join(data_path, filepath), "w", encoding="utf-8"
+                ) as hd:
+                    hd.write(content)
+
+            generate_graph_incremental(data_path, output_path, state_path)
+
+            # The real ID of the new article is the one generated for pubmed.json
+            with open(
+                os.path.join(data_path, "pubmed/pubmed.csv"), "a", encoding="utf-8"
+            ) as hd:
+                hd.write("2,Atropine collision study,01/01/2021,Journal A\n")
+            generate_graph_incremental(data_path, output_path, state_path)
+
+            with open(output_path, "r", encoding="utf-8") as hd:
+                result = json.load(hd)["journals"]
+
+        self.assertEqual(
+            sorted(
+                (mention["article_id"], mention["article_title"])
+                for journal in result
+                for mention in journal["referenced_in"]["pubmed_articles"]
+            ),
+            [
+                ("1", "Atropine Study"),
+                ("2", "Atropine Collision Study"),
+                ("3", "Atropine Use"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
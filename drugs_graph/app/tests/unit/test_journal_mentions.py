@@ -0,0 +1,73 @@
+# Built-in packages
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+# My Custom packages
+from app.src.graph_link.journal_mentions import JournalMentions
+
+
+class TestJournalMentions(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.drugs_df = pd.DataFrame(
+            {"name": ["Tetracycline", "Epinephrine"]},
+            index=pd.Index(["S03AA", "A01AD"], name="atccode"),
+        )
+        cls.articles_df = pd.DataFrame(
+            {
+                "title": [
+                    "Epinephrine In Children",
+                    "Tetracycline And Epinephrine",
+                    "Title Without Drugs",
+                ],
+                "date": [
+                    datetime(2020, 1, 1),
+                    datetime(2020, 2, 1),
+                    datetime(2020, 3, 1),
+                ],
+                "journal": ["Journal A"] * 3,
+                "article_type": pd.Categorical(["PubMed", "ClinicalTrial", "PubMed"]),
+            },
+            index=pd.Index(["1", "NCT1", "2"], name="id"),
+        )
+
+    def test_articles_information_same_as_lookup_by_id(self):
+        journal_instance = JournalMentions("Journal A", self.drugs_df, self.articles_df)
+
+        for article_id, article_info in journal_instance.iter_articles_information():
+            self.assertEqual(
+                article_info,
+                journal_instance.get_article_information_from_id(article_id),
+            )
+
+    def test_links_split_between_pubmed_and_clinical_trials(self):
+        journal_instance = JournalMentions("Journal A", self.drugs_df, self.articles_df)
+
+        result = journal_instance.generate_article_link_graph_dict()
+
+        self.assertEqual(
+            result["referenced_in"]["pubmed_articles"],
+            [
+                {
+                    "article_id": "1",
+                    "article_title": "Epinephrine In Children",
+                    "mention_date": "2020-01-01",
+                    "mentioned_drug_id": "A01AD",
+                    "mentioned_drug_name": "Epinephrine",
+                }
+            ],
+        )
+        self.assertEqual(
+            [
+                mention["mentioned_drug_id"]
+                for mention in result["referenced_in"]["clinical_trials"]
+            ],
+            ["S03AA", "A01AD"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,16 @@
 # Built-in packages
+import os
+import tempfile
 import unittest
 
 # My Custom packages
-from app.src.ad_hoc.json_processing import (get_all_articles_from_journal,
-                                            get_drugs_mentioned_by_journal)
+from app.src.ad_hoc.json_processing import (
+    get_all_articles_from_journal,
+    get_drugs_mentioned_by_journal,
+    get_journals_with_most_drugs,
+    iter_graph_journals,
+)
+from app.src.files_processing.files_processing import write_journals_to_file
 
 
 class TestJsonProcessing(unittest.TestCase):
@@ -160,6 +167,25 @@ class TestJsonProcessing(unittest.TestCase):
         get_all_articles_from_journal(self.journal_dict_clinical_only)
         get_all_articles_from_journal(self.journal_dict_empty)
 
+    def test_journals_with_most_drugs_from_streamed_graph(self):
+        journals = [
+            self.journal_dict_pubmed_only,
+            dict(self.journal_dict_clinical_only, title="Other Journal"),
+            dict(self.journal_dict_complete, title="Complete Journal"),
+            dict(self.journal_dict_complete, title="Tied Journal"),
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for compact in [False, True]:
+                graph_path = os.path.join(temp_dir, "graph.json")
+                write_journals_to_file(graph_path, journals, compact=compact)
+
+                self.assertEqual(list(iter_graph_journals(graph_path)), journals)
+                self.assertEqual(
+                    get_journals_with_most_drugs(iter_graph_journals(graph_path)),
+                    [["Complete Journal", "Tied Journal"], 4],
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,138 @@
+# Built-in packages
+import json
+import os
+import tempfile
+import unittest
+
+# My Custom packages
+from app.src.files_processing.json_repair import (
+    JsonRepairer,
+    JsonTextReader,
+    NotAJsonArrayError,
+    iter_json_array,
+    iter_repaired_json_array,
+    load_repaired_json,
+)
+
+
+class TestJsonRepair(unittest.TestCase):
+    def setUp(self):
+        """Run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.broken_json_content = (
+            '[{"title": "A null, true ] \\"title\\",", "ids": [1, 2,,], "date": "01/03/2020",},'
+            '\n {"title": "Épinéphrine", "id": 12},\n]'
+        )
+        self.expected_records = [
+            {"title": 'A null, true ] "title",', "ids": [1, 2], "date": "01/03/2020"},
+            {"title": "Épinéphrine", "id": 12},
+        ]
+
+    def tearDown(self):
+        """Run after each test"""
+        self.temp_dir.cleanup()
+
+    def write_file(self, content: str) -> str:
+        filepath = os.path.join(self.temp_dir.name, "broken.json")
+        with open(filepath, "w", encoding="utf-8") as hd:
+            hd.write(content)
+
+        return filepath
+
+    def test_repair_is_independent_of_block_boundaries(self):
+        filepath = self.write_file(self.broken_json_content)
+
+        for block_size in [1, 2, 5, 1 << 20]:
+            json_repairer = JsonRepairer()
+            result = list(iter_repaired_json_array(filepath, json_repairer, block_size))
+
+            self.assertEqual(result, self.expected_records)
+            self.assertEqual(len(json_repairer.repairs), 4)
+
+    def test_repairs_report_byte_offsets_of_removed_commas(self):
+        filepath = self.write_file(self.broken_json_content)
+        json_repairer = JsonRepairer()
+        load_repaired_json(filepath, json_repairer)
+
+        with open(filepath, "rb") as hd:
+            content = hd.read()
+
+        self.assertTrue(
+            all(
+                content[offset : offset + 1] == b"," for offset in json_repairer.repairs
+            )
+        )
+        self.assertEqual(json_repairer.repairs[-1], content.rindex(b","))
+
+    def test_valid_json_is_left_untouched(self):
+        valid_json_content = json.dumps(self.expected_records)
+        filepath = self.write_file(valid_json_content)
+        json_repairer = JsonRepairer()
+
+        self.assertEqual(
+            load_repaired_json(filepath, json_repairer), self.expected_records
+        )
+        self.assertEqual(json_repairer.repairs, [])
+
+    def test_not_an_array_raises_before_any_record(self):
+        filepath = self.write_file('{"key1": "value1",}')
+
+        with self.assertRaises(NotAJsonArrayError):
+            next(iter_repaired_json_array(filepath, JsonRepairer()))
+
+    def test_array_of_a_member_is_read_one_element_at_a_time(self):
+        filepath = self.write_file(
+            json.dumps(
+                {
+                    "version": [1, {"journals": []}],
+                    "journals": self.expected_records,
+                    "drugs": {},
+                },
+                indent=4,
+            )
+        )
+
+        for block_size in [1, 3, 1 << 20]:
+            self.assertEqual(
+                list(iter_json_array(filepath, "journals", block_size)),
+                self.expected_records,
+            )
+
+        with self.assertRaises(NotAJsonArrayError):
+            next(iter_json_array(filepath, "articles"))
+        with self.assertRaises(NotAJsonArrayError):
+            next(iter_json_array(filepath, "drugs"))
+
+    def test_value_spanning_many_texts_decoded_a_few_times(self):
+        class CountingDecoder(json.JSONDecoder):
+            nb_decodings = 0
+
+            def raw_decode(self, s, idx=0):
+                CountingDecoder.nb_decodings += 1
+                return super().raw_decode(s, idx)
+
+        records = [{"title": "t" * 1000, "ids": list(range(1000))}]
+        text = json.dumps(records)
+        texts = (text[i : i + 3] for i in range(0, len(text), 3))
+
+        reader = JsonTextReader(texts, "records.json", decoder=CountingDecoder())
+
+        self.assertEqual(list(reader.iter_array()), records)
+        self.assertLess(CountingDecoder.nb_decodings, 30)
+
+    def test_syntax_error_raised_without_reading_the_rest(self):
+        nb_texts_read = 0
+
+        def iter_texts():
+            nonlocal nb_texts_read
+            for text in ['[{"id": 1}, {"id": 2 3}, ', *['{"id": 4}, '] * 100, "]"]:
+                nb_texts_read += 1
+                yield text
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(JsonTextReader(iter_texts(), "records.json").iter_array())
+        self.assertLess(nb_texts_read, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# Built-in packages
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.load import (
+    ParallelFilesLoader,
+    load_drugs_input_data,
+    load_input_data,
+)
+from app.src.data_processing.pipeline import load_and_clean_pubmed_mentioning_drugs
+from app.src.graph_link.drug_matcher import DrugMatcher
+from pandas.testing import assert_frame_equal
+
+
+class TestLoad(unittest.TestCase):
+    def setUp(self):
+        """Run before each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filepaths = []
+
+        for position in range(6):
+            filepath = os.path.join(self.temp_dir.name, f"pubmed_{position}.csv")
+            pd.DataFrame(
+                {
+                    "id": [2 * position, 2 * position + 1],
+                    "title": [f"Title {2 * position}", f"Title {2 * position + 1}"],
+                }
+            ).to_csv(filepath, index=False)
+            self.filepaths.append(filepath)
+
+    def tearDown(self):
+        """Run after each test"""
+        self.temp_dir.cleanup()
+
+    def test_parallel_loading_same_as_sequential_loading(self):
+        expected_df = load_input_data(self.filepaths, source_column="source_file")
+
+        with ParallelFilesLoader(workers=3, max_pending_files=2) as files_loader:
+            files_loader.queue_files(self.filepaths)
+            self.assertEqual(len(files_loader.pending_files), 2)
+
+            result_df = load_input_data(
+                self.filepaths,
+                source_column="source_file",
+                load_file=files_loader.load_file,
+            )
+
+        assert_frame_equal(result_df, expected_df)
+        self.assertEqual(result_df["id"].tolist(), list(range(12)))
+
+    def test_files_not_queued_or_out_of_order_are_loaded(self):
+        with ParallelFilesLoader(workers=2, max_pending_files=1) as files_loader:
+            files_loader.queue_files(self.filepaths[:3])
+
+            result_df = load_input_data(
+                self.filepaths[::-1], load_file=files_loader.load_file
+            )
+
+        self.assertEqual(
+            result_df["id"].tolist(), [10, 11, 8, 9, 6, 7, 4, 5, 2, 3, 0, 1]
+        )
+        self.assertEqual(len(files_loader.pending_files), 0)
+
+    def test_drug_synonyms_file_is_not_loaded_as_drugs(self):
+        drugs_filepath = os.path.join(self.temp_dir.name, "drugs.csv")
+        synonyms_filepath = os.path.join(self.temp_dir.name, "drug_synonyms.csv")
+        pd.DataFrame(
+            {"atccode": ["A04AD", "A01AD"], "drug": ["DIPHENHYDRAMINE", "EPINEPHRINE"]}
+        ).to_csv(drugs_filepath, index=False)
+        pd.DataFrame(
+            {"atccode": ["A04AD", "A04AD"], "synonym": ["Benadryl", "Unisom"]}
+        ).to_csv(synonyms_filepath, index=False)
+
+        result_df = load_drugs_input_data([synonyms_filepath, drugs_filepath])
+
+        self.assertEqual(result_df["drug"].tolist(), ["DIPHENHYDRAMINE", "EPINEPHRINE"])
+        self.assertEqual(result_df["synonyms"].tolist(), [["Benadryl", "Unisom"], []])
+
+    def test_missing_ids_given_after_ids_of_filtered_out_articles(self):
+        pubmed_filepath = os.path.join(self.temp_dir.name, "pubmed.csv")
+        pd.DataFrame(
+            {
+                "id": ["1", None, "7"],
+                "title": ["Epinephrine study", "Epinephrine use", "Unrelated study"],
+                "date": ["01/01/2020", "02/01/2020", "03/01/2020"],
+                "journal": ["Journal A", "Journal A", "Journal B"],
+            }
+        ).to_csv(pubmed_filepath, index=False)
+        drug_matcher = DrugMatcher(
+            drugs_dataFrame=pd.DataFrame(
+                {"name": ["Epinephrine"], "synonyms": [[]]},
+                index=pd.Index(["A01AD"], name="atccode"),
+            )
+        )
+
+        # The article with the highest ID doesn't mention any drug, so it is filtered out
+        result_df = load_and_clean_pubmed_mentioning_drugs(
+            [pubmed_filepath], 2, drug_matcher
+        )
+
+        self.assertEqual(result_df["id"].tolist(), ["1", "8"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,19 @@ from datetime import datetime
 
 import numpy as np
 import pandas as pd
+
 # My Custom packages
-from app.src.data_processing.preprocess import (clean_titles,
-                                                drop_empty_titles_and_journals,
-                                                fill_in_missing_ids_int,
-                                                normalize_dates_format)
+from app.src.data_processing.preprocess import (
+    clean_distinct_titles_column,
+    clean_drug_names,
+    clean_titles,
+    clean_titles_column,
+    drop_empty_titles_and_journals,
+    fill_in_missing_ids_int,
+    intern_columns_as_categories,
+    normalize_dates_format,
+    normalize_dates_format_cached,
+)
 from pandas.testing import assert_frame_equal, assert_series_equal
 
 
@@ -102,6 +110,22 @@ class TestPreprocess(unittest.TestCase):
         # Assertions
         assert_series_equal(result_df["date"], self.expected_df["date"])
 
+    def test_cached_date_format_normalization(self):
+        self.expected_df["date"] = self.expected_df["date"].apply(
+            lambda x: datetime.strptime(x, "%Y-%m-%d")
+        )
+        # Repeated and missing raw dates
+        self.input_df.loc[1, "date"] = "01/04/2020"
+        self.expected_df.loc[1, "date"] = datetime(2020, 4, 1)
+        self.input_df.loc[5, "date"] = np.nan
+        self.expected_df.loc[5, "date"] = pd.NaT
+
+        # Run the function
+        result_df = normalize_dates_format_cached(self.input_df, "date")
+
+        # Assertions
+        assert_series_equal(result_df["date"], self.expected_df["date"])
+
     def test_cleaning_strings(self):
         # Run the function
         result_df = self.input_df.copy()
@@ -112,6 +136,72 @@ class TestPreprocess(unittest.TestCase):
         assert_series_equal(result_df["title"], self.expected_df["title"])
         assert_series_equal(result_df["journal"], self.expected_df["journal"])
 
+    def test_cleaning_strings_column_same_as_cleaning_each_string(self):
+        # Run the function
+        result_title = clean_titles_column(self.input_df["title"])
+        result_journal = clean_titles_column(self.input_df["journal"])
+
+        # Assertions
+        assert_series_equal(result_title, self.expected_df["title"])
+        assert_series_equal(result_journal, self.expected_df["journal"])
+        assert_series_equal(
+            clean_titles_column(pd.Series([np.nan, np.nan])), pd.Series(["", ""])
+        )
+
+    def test_cleaning_strings_keeps_slash_separated_names_apart(self):
+        titles = pd.Series(["Epinephrine/ADRENALINE in children", "01/04/2020"])
+        expected_titles = pd.Series(
+            ["Epinephrine Adrenaline In Children", "01 04 2020"]
+        )
+
+        assert_series_equal(clean_titles_column(titles), expected_titles)
+        assert_series_equal(titles.apply(clean_titles), expected_titles)
+
+    def test_cleaning_distinct_strings_same_as_cleaning_each_string(self):
+        journals = pd.Series(
+            ["MY  JOURNAL ", np.nan, "journal (A)", "MY  JOURNAL ", "journal (A)"],
+            index=[3, 5, 7, 9, 11],
+        )
+        # Values already cleaned are not cleaned again
+        cleaned_values = {"journal (A)": "Already Cleaned"}
+
+        result = clean_distinct_titles_column(journals, cleaned_values)
+
+        assert_series_equal(
+            result,
+            pd.Series(
+                ["My Journal", "", "Already Cleaned", "My Journal", "Already Cleaned"],
+                index=[3, 5, 7, 9, 11],
+            ),
+        )
+        self.assertEqual(
+            cleaned_values,
+            {"journal (A)": "Already Cleaned", "MY  JOURNAL ": "My Journal"},
+        )
+        assert_series_equal(
+            clean_distinct_titles_column(self.input_df["journal"]),
+            self.expected_df["journal"],
+        )
+
+    def test_cleaning_drug_names_and_synonyms(self):
+        drugs_df = pd.DataFrame(
+            {
+                "atccode": ["A01AD", "A10AE", "S03AA"],
+                "name": ["EPINEPHRINE/ADRENALINE", "INSULIN GLARGINE", "TETRACYCLINE"],
+                "synonyms": [[], ["LANTUS", "insulin glargine", " "], []],
+            }
+        )
+
+        result_df = clean_drug_names(drugs_df)
+
+        self.assertEqual(
+            result_df["name"].tolist(),
+            ["Epinephrine", "Insulin Glargine", "Tetracycline"],
+        )
+        self.assertEqual(
+            result_df["synonyms"].tolist(), [["Adrenaline"], ["Lantus"], []]
+        )
+
     def test_filling_missing_ids_no_overrides(self):
         """Check that the original IDs are not overwritten."""
         # Run the function
@@ -151,6 +241,19 @@ class TestPreprocess(unittest.TestCase):
         # Assertions
         assert_frame_equal(result_df, expected_df)
 
+    def test_interning_columns_keeps_values_and_order(self):
+        input_df = pd.DataFrame(
+            {"journal": ["Journal B", "Journal A", np.nan, "Journal B"]}
+        )
+
+        result_df = intern_columns_as_categories(input_df.copy(), ["journal"])
+
+        self.assertIsInstance(result_df["journal"].dtype, pd.CategoricalDtype)
+        self.assertEqual(
+            result_df["journal"].cat.categories.tolist(), ["Journal B", "Journal A"]
+        )
+        assert_series_equal(result_df["journal"].astype(object), input_df["journal"])
+
 
 if __name__ == "__main__":
     unittest.main()
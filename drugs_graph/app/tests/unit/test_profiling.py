@@ -0,0 +1,90 @@
+# Built-in packages
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# My Custom packages
+from app.src.monitoring.profiling import StageProfiler, reset_peak_rss
+
+
+class TestStageProfiler(unittest.TestCase):
+    def test_stage_records_metrics_and_rows(self):
+        cloud_logger = MagicMock()
+        profiler = StageProfiler(cloud_logger=cloud_logger)
+
+        with profiler.stage("dedup_pubmed", rows_in=13) as stage:
+            stage["rows_out"] = 12
+
+        stage_record = profiler.stages[0]
+        self.assertEqual(stage_record["stage"], "dedup_pubmed")
+        self.assertEqual((stage_record["rows_in"], stage_record["rows_out"]), (13, 12))
+        self.assertGreaterEqual(stage_record["wall_time_s"], 0)
+        self.assertGreaterEqual(stage_record["cpu_time_s"], 0)
+
+        logged_struct = cloud_logger.log_struct.call_args.args[0]
+        self.assertEqual(logged_struct["stage"], "dedup_pubmed")
+
+    def test_failed_stage_is_still_recorded(self):
+        profiler = StageProfiler()
+
+        with self.assertRaises(ValueError):
+            with profiler.stage("load_pubmed"):
+                raise ValueError("Broken file")
+
+        self.assertEqual([stage["stage"] for stage in profiler.stages], ["load_pubmed"])
+
+    def test_unreachable_cloud_logging_does_not_fail_the_run(self):
+        cloud_logger = MagicMock()
+        cloud_logger.log_struct.side_effect = RuntimeError("No credentials")
+        profiler = StageProfiler(cloud_logger=cloud_logger)
+
+        for stage_name in ["load_drugs", "clean_drugs"]:
+            with profiler.stage(stage_name):
+                pass
+
+        # Cloud logging is given up after the first failure
+        self.assertEqual(cloud_logger.log_struct.call_count, 1)
+        self.assertEqual(len(profiler.stages), 2)
+
+    @unittest.skipIf(not reset_peak_rss(), "the peak RSS can't be reset")
+    def test_peak_rss_of_each_stage(self):
+        profiler = StageProfiler()
+
+        with profiler.stage("build_graph"):
+            with profiler.stage("load_pubmed"):
+                data = b"x" * (200 * 1024 * 1024)
+                del data
+        with profiler.stage("write_graph"):
+            pass
+
+        peaks_rss_mb = {
+            stage["stage"]: stage["peak_rss_mb"] for stage in profiler.stages
+        }
+        # The memory of the nested stage is included in the enclosing one, not in the next stages
+        self.assertGreaterEqual(
+            peaks_rss_mb["build_graph"], peaks_rss_mb["load_pubmed"]
+        )
+        self.assertLess(peaks_rss_mb["write_graph"], peaks_rss_mb["load_pubmed"] - 100)
+        self.assertGreaterEqual(
+            profiler.get_report()["peak_rss_mb"], peaks_rss_mb["load_pubmed"]
+        )
+
+    def test_write_report(self):
+        profiler = StageProfiler()
+        with profiler.stage("build_graph"):
+            pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_path = os.path.join(temp_dir, "report.json")
+            profiler.write_report(report_path)
+
+            with open(report_path, encoding="utf-8") as hd:
+                report = json.load(hd)
+
+        self.assertEqual(report["stages"][0]["stage"], "build_graph")
+
+
+if __name__ == "__main__":
+    unittest.main()
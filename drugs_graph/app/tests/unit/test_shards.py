@@ -0,0 +1,135 @@
+# Built-in packages
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.incremental import merge_file_results, save_file_results
+from app.src.data_processing.shards import (
+    get_files_of_shard,
+    load_shards_files,
+    save_shard_manifest,
+)
+
+
+class TestShards(unittest.TestCase):
+    def test_each_file_in_exactly_one_shard(self):
+        filepaths = [f"data/pubmed/pubmed_{position}.csv" for position in range(20)]
+
+        files_of_shards = [
+            get_files_of_shard("data", filepaths, shard, 3) for shard in range(3)
+        ]
+
+        self.assertEqual(
+            sorted(sum(files_of_shards, [])),
+            sorted(filepaths),
+        )
+        # The shard of a file only depends on its path in the data folder
+        self.assertEqual(
+            get_files_of_shard(
+                "/mnt/data",
+                [os.path.join("/mnt", filepath) for filepath in filepaths],
+                1,
+                3,
+            ),
+            [os.path.join("/mnt", filepath) for filepath in files_of_shards[1]],
+        )
+
+    def test_shards_files_in_single_run_order(self):
+        with tempfile.TemporaryDirectory() as shards_path:
+            save_shard_manifest(
+                shards_path,
+                1,
+                2,
+                {"pubmed": ["b.csv"], "clinical_trials": ["c.csv"]},
+                {"drugs.csv": "hash"},
+            )
+            with self.assertRaises(FileNotFoundError):
+                load_shards_files(shards_path)
+
+            save_shard_manifest(
+                shards_path,
+                0,
+                2,
+                {"pubmed": ["a.csv", "c.csv"], "clinical_trials": []},
+                {"drugs.csv": "hash"},
+            )
+            pubmed_path, clinical_trials_path = load_shards_files(shards_path)
+
+        self.assertEqual(pubmed_path, ["a.csv", "b.csv", "c.csv"])
+        self.assertEqual(clinical_trials_path, ["c.csv"])
+
+    def test_shards_of_previous_layout_replaced(self):
+        with tempfile.TemporaryDirectory() as shards_path:
+            for shard in range(3):
+                save_shard_manifest(
+                    shards_path,
+                    shard,
+                    3,
+                    {"pubmed": [f"{shard}.csv"], "clinical_trials": []},
+                    {"drugs.csv": "hash"},
+                )
+
+            save_shard_manifest(
+                shards_path,
+                0,
+                2,
+                {"pubmed": ["0.csv", "2.csv"], "clinical_trials": []},
+                {"drugs.csv": "hash"},
+            )
+            # The shard 1 of the new layout didn't run yet
+            with self.assertRaises(FileNotFoundError):
+                load_shards_files(shards_path)
+
+            save_shard_manifest(
+                shards_path,
+                1,
+                2,
+                {"pubmed": ["1.csv"], "clinical_trials": []},
+                {"drugs.csv": "hash"},
+            )
+            pubmed_path, _ = load_shards_files(shards_path)
+
+        self.assertEqual(pubmed_path, ["0.csv", "1.csv", "2.csv"])
+
+    def test_generated_ids_renumbered_when_merged(self):
+        mentions_df = pd.DataFrame(
+            {
+                "article_id": ["3"],
+                "article_title": ["Epinephrine Study"],
+                "mention_date": [pd.Timestamp("2020-01-01")],
+                "mentioned_drug_id": ["A01AD"],
+                "mentioned_drug_name": ["Epinephrine"],
+                "journal": ["Journal A"],
+                "article_type": ["PubMed"],
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as shards_path:
+            # Both shards gave the ID 3 to an article missing one
+            for filepath, article_ids in [
+                ("pubmed_1.csv", ["1", "3"]),
+                ("pubmed_2.csv", ["2", "3"]),
+            ]:
+                save_file_results(
+                    shards_path,
+                    filepath,
+                    pd.DataFrame(
+                        {"journal": ["Journal A"] * 2},
+                        index=pd.Index(article_ids, name="id"),
+                    ),
+                    mentions_df,
+                    generated_article_ids=["3"],
+                )
+
+            _, result = merge_file_results(
+                shards_path, ["pubmed_1.csv", "pubmed_2.csv"]
+            )
+
+        self.assertEqual(result["article_id"].tolist(), ["3", "4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# Built-in packages
+import copy
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+# My Custom packages
+from app.src.data_processing.transform import build_link_graph_vectorized
+from app.src.graph_link.title_index import TitleIndex, get_drugs_names
+
+
+class TestTitleIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.articles_df = pd.DataFrame(
+            {
+                "title": [
+                    "Insulin Glargine And Tetracycline",
+                    "Glargine Insulin Study",
+                    "Benadryl In Children",
+                    "Tetracycline Use",
+                ],
+                "date": [
+                    datetime(2020, 1, 1),
+                    datetime(2020, 2, 1),
+                    datetime(2020, 3, 1),
+                    datetime(2020, 4, 1),
+                ],
+                "journal": ["Journal A", "Journal A", "Journal B", "Journal C"],
+                "article_type": ["PubMed", "ClinicalTrial", "PubMed", "PubMed"],
+            },
+            index=pd.Index(["1", "NCT1", "2", "3"], name="id"),
+        )
+        cls.drugs_df = pd.DataFrame(
+            {"name": ["Tetracycline", "Diphenhydramine"], "synonyms": [[], []]},
+            index=pd.Index(["S03AA", "A04AD"], name="atccode"),
+        )
+        cls.new_drugs_df = pd.DataFrame(
+            {
+                "name": ["Insulin Glargine", "Diphenhydramine"],
+                "synonyms": [[], ["Benadryl"]],
+            },
+            index=pd.Index(["A10AE", "A04AD"], name="atccode"),
+        )
+
+    def test_find_articles_on_consecutive_tokens(self):
+        title_index = TitleIndex.from_dataframes(self.articles_df, self.drugs_df)
+
+        self.assertEqual(title_index.find_articles("Insulin Glargine").tolist(), [0])
+        self.assertEqual(title_index.find_articles("Tetracycline").tolist(), [0, 3])
+        self.assertEqual(title_index.find_articles("Insulin Aspart").tolist(), [])
+
+    def test_drugs_changes(self):
+        title_index = TitleIndex.from_dataframes(self.articles_df, self.drugs_df)
+
+        added_drug_ids, removed_drug_ids = title_index.get_drugs_changes(
+            get_drugs_names(self.new_drugs_df)
+        )
+
+        self.assertEqual(added_drug_ids, ["A10AE", "A04AD"])
+        self.assertEqual(removed_drug_ids, ["S03AA", "A04AD"])
+
+    def test_patched_graph_same_as_generated_graph(self):
+        graph = build_link_graph_vectorized(self.articles_df, self.drugs_df)
+        title_index = TitleIndex.from_dataframes(self.articles_df, self.drugs_df)
+        new_drugs = get_drugs_names(self.new_drugs_df)
+
+        result = list(
+            title_index.patch_journals(copy.deepcopy(graph["journals"]), new_drugs)
+        )
+
+        self.assertEqual(
+            result,
+            build_link_graph_vectorized(self.articles_df, self.new_drugs_df)[
+                "journals"
+            ],
+        )
+        self.assertEqual(title_index.drugs, new_drugs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,25 @@
 # Third-party packages
 # Built-in packages
 import unittest
+from datetime import datetime
 
 import numpy as np
 import pandas as pd
+
 # My custom packages
-from app.src.data_processing.transform import merge_rows
+from app.src.data_processing.transform import (
+    build_edge_table_from_mentions,
+    build_link_graph_from_df,
+    build_link_graph_vectorized,
+    extract_mentions_from_df,
+    filter_articles_mentioning_drugs,
+    format_dates_as_categories,
+    iter_link_graph_journals_parallel,
+    merge_duplicate_rows,
+    merge_rows,
+    split_articles_by_journal,
+)
+from app.src.graph_link.drug_matcher import DrugMatcher
 from pandas.testing import assert_frame_equal
 
 
@@ -93,6 +107,223 @@ class TestTransform(unittest.TestCase):
         # Assertions
         assert_frame_equal(result_df, self.expected_df)
 
+    def test_merge_duplicate_rows_same_as_merge_rows(self):
+        articles_group = self.input_df.groupby(["title", "date"], group_keys=False)[
+            self.input_df.columns.tolist()
+        ]
+        expected_df = articles_group.apply(merge_rows).reset_index(drop=True)
+
+        # Run the function
+        result_df = merge_duplicate_rows(self.input_df, ["title", "date"])
+
+        # Assertions
+        assert_frame_equal(result_df, expected_df)
+
+
+class TestLinkGraphBuilders(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Run once per class instance"""
+        cls.articles_df = pd.DataFrame(
+            {
+                "title": [
+                    "Diphenhydramine And Epinephrine In Children",
+                    "Efficacy Of Insulin Glargine",
+                    "Title Without Drugs",
+                    "Tetracycline Resistance",
+                    "Epinephrine Insulin",
+                ],
+                "date": [
+                    datetime(2020, 1, 1),
+                    datetime(2020, 2, 1),
+                    datetime(2020, 3, 1),
+                    datetime(2020, 4, 1),
+                    datetime(2020, 5, 1),
+                ],
+                "journal": [
+                    "Journal A",
+                    "Journal B",
+                    "Journal C",
+                    "Journal A",
+                    "Journal B",
+                ],
+                "article_type": [
+                    "PubMed",
+                    "ClinicalTrial",
+                    "PubMed",
+                    "ClinicalTrial",
+                    "PubMed",
+                ],
+            },
+            index=pd.Index(["1", "NCT1", "2", "NCT2", "3"], name="id"),
+        )
+        cls.drugs_df = pd.DataFrame(
+            {
+                "name": [
+                    "Tetracycline",
+                    "Insulin Glargine",
+                    "Epinephrine",
+                    "Diphenhydramine",
+                ]
+            },
+            index=pd.Index(["S03AA", "A10AE", "A01AD", "A04AD"], name="atccode"),
+        )
+
+    def test_extract_mentions_in_articles_then_drugs_order(self):
+        result_df = extract_mentions_from_df(self.articles_df, self.drugs_df)
+
+        self.assertEqual(
+            result_df["article_id"].tolist(), ["1", "1", "NCT1", "NCT2", "3"]
+        )
+        self.assertEqual(
+            result_df["mentioned_drug_id"].tolist(),
+            ["A01AD", "A04AD", "A10AE", "S03AA", "A01AD"],
+        )
+
+    def test_extract_mentions_interns_repeated_columns(self):
+        result_df = extract_mentions_from_df(self.articles_df, self.drugs_df)
+
+        for column_name in [
+            "mentioned_drug_id",
+            "mentioned_drug_name",
+            "journal",
+            "article_type",
+        ]:
+            self.assertIsInstance(result_df[column_name].dtype, pd.CategoricalDtype)
+        self.assertEqual(
+            result_df["journal"].tolist(),
+            ["Journal A", "Journal A", "Journal B", "Journal A", "Journal B"],
+        )
+
+    def test_format_dates_as_categories_once_per_day(self):
+        dates = pd.Series(
+            [
+                datetime(2020, 1, 1),
+                pd.NaT,
+                datetime(2020, 1, 1, 12),
+                datetime(2021, 5, 3),
+            ]
+        )
+
+        result = format_dates_as_categories(dates)
+
+        self.assertEqual(result.categories.tolist(), ["2020-01-01", "2021-05-03"])
+        self.assertEqual(
+            result.tolist(), ["2020-01-01", np.nan, "2020-01-01", "2021-05-03"]
+        )
+
+    def test_vectorized_builder_same_graph_with_interned_articles(self):
+        interned_articles_df = self.articles_df.astype(
+            {"journal": "category", "article_type": "category"}
+        )
+
+        result = build_link_graph_vectorized(interned_articles_df, self.drugs_df)
+        expected_result = build_link_graph_from_df(self.articles_df, self.drugs_df)
+
+        self.assertEqual(result, expected_result)
+
+    def test_edge_table_flattens_mentions_with_year(self):
+        mentions_df = extract_mentions_from_df(self.articles_df, self.drugs_df)
+        mentions_df.loc[0, "mention_date"] = pd.NaT
+
+        result_df = build_edge_table_from_mentions(mentions_df)
+
+        self.assertEqual(
+            result_df.columns.tolist(),
+            [
+                "journal",
+                "article_id",
+                "article_type",
+                "mention_date",
+                "drug_id",
+                "drug_name",
+                "mention_year",
+            ],
+        )
+        self.assertEqual(
+            result_df["drug_id"].tolist(), mentions_df["mentioned_drug_id"].tolist()
+        )
+        self.assertTrue(pd.isna(result_df.loc[0, "mention_year"]))
+        self.assertEqual(result_df["mention_year"].iloc[1:].tolist(), [2020] * 4)
+
+    def test_filter_raw_articles_mentioning_drugs(self):
+        raw_articles_df = pd.DataFrame(
+            {
+                "title": [
+                    "Use of EPINEPHRINE, in children",
+                    "Title without drugs",
+                    np.nan,
+                    "insulin glargine; efficacy",
+                ]
+            }
+        )
+        drug_matcher = DrugMatcher(drugs_dataFrame=self.drugs_df)
+
+        result_df = filter_articles_mentioning_drugs(raw_articles_df, drug_matcher)
+
+        # The raw titles are kept untouched
+        assert_frame_equal(result_df, raw_articles_df.iloc[[0, 3]])
+
+    def test_vectorized_builder_matches_journal_builder(self):
+        result = build_link_graph_vectorized(self.articles_df, self.drugs_df)
+        expected_result = build_link_graph_from_df(self.articles_df, self.drugs_df)
+
+        self.assertEqual(result, expected_result)
+        self.assertEqual(
+            [journal["title"] for journal in result["journals"]],
+            ["Journal A", "Journal B", "Journal C"],
+        )
+
+    def test_vectorized_builder_matches_journal_builder_with_synonyms(self):
+        drugs_df = self.drugs_df.assign(
+            synonyms=[[], ["Lantus Solostar"], ["Adrenaline"], ["Benadryl"]]
+        )
+        articles_df = self.articles_df.assign(
+            title=[
+                "Benadryl And Adrenaline In Children",
+                "Efficacy Of Lantus Solostar",
+                "Title Without Drugs",
+                "Tetracycline Resistance",
+                "Epinephrine Insulin",
+            ]
+        )
+
+        result = build_link_graph_vectorized(articles_df, drugs_df)
+        expected_result = build_link_graph_from_df(articles_df, drugs_df)
+
+        self.assertEqual(result, expected_result)
+        self.assertEqual(
+            [
+                mention["mentioned_drug_name"]
+                for mention in result["journals"][0]["referenced_in"]["pubmed_articles"]
+            ],
+            ["Epinephrine", "Diphenhydramine"],
+        )
+
+    def test_split_articles_keeps_journals_whole_and_ordered(self):
+        partitions = split_articles_by_journal(self.articles_df, 2)
+        journals_of_partitions = [
+            partition_df["journal"].unique().tolist() for partition_df in partitions
+        ]
+
+        self.assertEqual(
+            journals_of_partitions, [["Journal A", "Journal B"], ["Journal C"]]
+        )
+        assert_frame_equal(
+            pd.concat(partitions).sort_index(), self.articles_df.sort_index()
+        )
+
+    def test_parallel_builder_matches_serial_builder(self):
+        expected_result = build_link_graph_vectorized(self.articles_df, self.drugs_df)
+
+        for graph_builder in ["vectorized", "journal"]:
+            result = list(
+                iter_link_graph_journals_parallel(
+                    self.articles_df, self.drugs_df, graph_builder, workers=2
+                )
+            )
+            self.assertEqual(result, expected_result["journals"])
+
 
 if __name__ == "__main__":
     unittest.main()